@@ -26,19 +26,14 @@ qemu-img convert -O vmdk -o subformat=streamOptimized "$image".raw "$image".vmdk
 echo "INFO: Generate $image.ovf"
 scripts/generate-ovf.sh "$image".vmdk
 
-echo "INFO: Generate $image.mf"
-scripts/generate-mf.sh "$image".ovf "$image".vmdk
-
-cd "$(dirname "$image")"
-image=$(basename "$image")
-
 # An OVA is simply a tar archive. The .ovf must come first,
 # then the .mf comes either second or last. For details,
 # refer to the OVF spec: https://www.dmtf.org/dsp/DSP0243.
+# The disk is hashed while it is archived, so the .mf goes last.
 echo "INFO: Generate $image.ova"
-tar -cvf "$image".ova "$image".ovf "$image".vmdk "$image".mf
+scripts/generate-ova.py "$image".ovf "$image".vmdk
 
-[ $keep -eq 1 ] || rm -f "$image".ovf "$image".vmdk "$image".mf
+[ $keep -eq 1 ] || rm -f "$image".ovf "$image".vmdk
 
 # Since the disk is already compressed (streamOptimized means
 # deflate compression with zlib),  there's nothing to gain by
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# ============================================================
+# Build an OVA (OVF + VMDK + manifest) in a single pass
+#
+# An OVA is a tar archive: the .ovf comes first, then the disk,
+# and the .mf either second or last (DSP0243, section 5.3). The
+# digests are computed while the files are copied into the
+# archive, so the multi-GB disk is read exactly once and the .mf
+# is appended as the last member. export-ova.sh uses this instead
+# of generate-mf.sh followed by tar.
+# ============================================================
+
+import argparse
+import hashlib
+import mmap
+import os
+import sys
+import tarfile
+import time
+
+BUFFER_SIZE = 8 << 20        # page-aligned copy buffer
+RECORD_SIZE = 20 * 512       # pad the archive like tar's default blocking factor
+USTAR_MAX_SIZE = 8 ** 11     # larger members need GNU base-256 size fields
+
+ALGORITHMS = {"sha1": "SHA1", "sha256": "SHA256"}
+
+
+def fail(msg):
+    print(f"{os.path.basename(sys.argv[0])}: {msg}", file=sys.stderr)
+    sys.exit(1)
+
+
+def header(name, size, mtime):
+    info = tarfile.TarInfo(name)
+    info.size = size
+    info.mtime = int(mtime)
+    info.mode = 0o644
+    info.uname = info.gname = "root"
+    fmt = tarfile.USTAR_FORMAT if size < USTAR_MAX_SIZE else tarfile.GNU_FORMAT
+    return info.tobuf(format=fmt)
+
+
+def write_all(fd, data):
+    while data:
+        data = data[os.write(fd, data):]
+
+
+def pad(fd, size, block=512):
+    if size % block:
+        write_all(fd, bytes(block - size % block))
+
+
+def add_file(out, path, algorithm, buf):
+    """Copy one file into the archive; returns its hex digest."""
+    digest = hashlib.new(algorithm)
+    view = memoryview(buf)
+    with open(path, "rb", buffering=0) as f:
+        st = os.fstat(f.fileno())
+        os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        write_all(out, header(os.path.basename(path), st.st_size, st.st_mtime))
+        copied = 0
+        while True:
+            n = f.readinto(buf)
+            if not n:
+                break
+            chunk = view[:n]
+            digest.update(chunk)
+            write_all(out, chunk)
+            copied += n
+    if copied != st.st_size:
+        fail(f"'{path}' changed while it was being archived")
+    pad(out, copied)
+    return digest.hexdigest()
+
+
+def build(ova, files, algorithm):
+    tmp = ova + ".tmp"
+    buf = mmap.mmap(-1, BUFFER_SIZE)
+    out = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    done = False
+    try:
+        lines = []
+        for path in files:
+            print(os.path.basename(path))
+            lines.append(f"{ALGORITHMS[algorithm]} ({os.path.basename(path)}) = "
+                         f"{add_file(out, path, algorithm, buf)}\n")
+        mf = "".join(lines).encode()
+        name = os.path.splitext(os.path.basename(files[0]))[0] + ".mf"
+        print(name)
+        write_all(out, header(name, len(mf), time.time()))
+        write_all(out, mf)
+        pad(out, len(mf))
+        end = os.lseek(out, 0, os.SEEK_CUR) + 1024   # two zero blocks end the archive
+        write_all(out, bytes(1024 + (-end) % RECORD_SIZE))
+        os.close(out)
+        out = None
+        os.replace(tmp, ova)
+        done = True
+    finally:
+        if out is not None:
+            os.close(out)
+        if not done:
+            os.unlink(tmp)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Package an OVF and its disks into an OVA.")
+    parser.add_argument("ovf")
+    parser.add_argument("disks", nargs="+", metavar="vmdk")
+    parser.add_argument("-o", "--output", help="OVA path (default: OVF path with .ova)")
+    parser.add_argument("-a", "--algorithm", choices=sorted(ALGORITHMS), default="sha1",
+                        help="manifest digest (default: sha1)")
+    args = parser.parse_args()
+
+    if not args.ovf.endswith(".ovf"):
+        fail(f"Invalid input file '{args.ovf}'")
+    for disk in args.disks:
+        if not disk.endswith(".vmdk"):
+            fail(f"Invalid input file '{disk}'")
+    ova = args.output or args.ovf[:-len(".ovf")] + ".ova"
+    try:
+        build(ova, [args.ovf] + args.disks, args.algorithm)
+    except OSError as e:
+        fail(str(e))
+
+
+if __name__ == "__main__":
+    main()
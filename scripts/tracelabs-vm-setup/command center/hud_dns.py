@@ -0,0 +1,198 @@
+"""SEC-HUD DNS posture: which resolvers really answer, and over which interface.
+
+Probes go out over asyncio UDP with one deadline for all upstreams.
+systemd-resolved is asked over D-Bus (gi is imported only then), so the
+engine itself runs without GTK.
+"""
+
+import asyncio
+import os
+import re
+import socket
+import struct
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
+
+
+RESOLV_CONF = "/etc/resolv.conf"
+RESOLVED_UPSTREAM_CONF = "/run/systemd/resolve/resolv.conf"
+RESOLVED_STUBS = ("127.0.0.53", "127.0.0.54")
+DNS_PROBE_NAME = "example.com"
+DNS_PROBE_DEADLINE = 1.5  # seconds for all upstreams together
+
+
+def parse_nameservers(text: str) -> List[str]:
+    return re.findall(r"nameserver\s+(\S+)", text)
+
+
+class DnsUpstream(NamedTuple):
+    address: str
+    link: Optional[str]       # interface systemd-resolved assigns it to, if known
+    egress: Optional[str]     # interface the probe query actually left on
+    rtt_ms: Optional[float]   # None: no answer before the deadline
+
+
+class DnsPosture(NamedTuple):
+    source: str               # "resolv.conf", "resolved" (upstream file) or "resolved-dbus"
+    upstreams: Tuple[DnsUpstream, ...]
+
+
+def _dns_query(name: str, qid: int) -> bytes:
+    """A minimal recursive A/IN query."""
+    header = struct.pack("!HHHHHH", qid, 0x0100, 1, 0, 0, 0)
+    qname = b"".join(bytes([len(label)]) + label.encode() for label in name.split(".")) + b"\0"
+    return header + qname + struct.pack("!HH", 1, 1)
+
+
+def _resolved_upstreams_dbus() -> List[Tuple[str, Optional[str]]]:
+    """(address, link) of every DNS server systemd-resolved knows, global ones without link."""
+    from gi.repository import Gio, GLib
+
+    bus = Gio.bus_get_sync(Gio.BusType.SYSTEM, None)
+    reply = bus.call_sync(
+        "org.freedesktop.resolve1", "/org/freedesktop/resolve1",
+        "org.freedesktop.DBus.Properties", "Get",
+        GLib.Variant("(ss)", ("org.freedesktop.resolve1.Manager", "DNS")),
+        GLib.VariantType.new("(v)"), Gio.DBusCallFlags.NONE, 2000, None,
+    )
+    servers = []
+    for ifindex, family, raw in reply.unpack()[0]:
+        try:
+            link = socket.if_indextoname(ifindex) if ifindex else None
+        except OSError:
+            link = None
+        servers.append((socket.inet_ntop(family, bytes(raw)), link))
+    return servers
+
+
+class _DnsProbeProtocol(asyncio.DatagramProtocol):
+    def __init__(self, qid: int, answered: "asyncio.Future"):
+        self.qid = qid
+        self.answered = answered
+
+    def datagram_received(self, data, addr):
+        if len(data) >= 12 and struct.unpack("!H", data[:2])[0] == self.qid and data[2] & 0x80:
+            if not self.answered.done():
+                self.answered.set_result(time.perf_counter())
+
+    def error_received(self, exc):
+        if not self.answered.done():
+            self.answered.set_exception(exc)
+
+
+async def _probe_resolvers(servers: List[str], port: int, name: str,
+                           deadline: float) -> List[Tuple[str, Optional[str], Optional[float]]]:
+    """Query every server at once; (server, local source address, rtt ms or None)."""
+    loop = asyncio.get_running_loop()
+    probes = []
+    for n, server in enumerate(servers):
+        answered = loop.create_future()
+        qid = (os.getpid() + n * 7919 + int(time.monotonic() * 1000)) & 0xFFFF
+        try:
+            transport, _ = await loop.create_datagram_endpoint(
+                lambda: _DnsProbeProtocol(qid, answered), remote_addr=(server, port))
+        except OSError:
+            probes.append((server, None, None, None, None))
+            continue
+        # the connected socket's source address is the kernel's routing decision
+        source = transport.get_extra_info("sockname")[0]
+        start = time.perf_counter()
+        transport.sendto(_dns_query(name, qid))
+        probes.append((server, source, transport, answered, start))
+    pending = [p[3] for p in probes if p[3] is not None]
+    if pending:
+        await asyncio.wait(pending, timeout=deadline)
+    results = []
+    for server, source, transport, answered, start in probes:
+        rtt = None
+        if answered is not None:
+            if answered.done() and not answered.cancelled() and answered.exception() is None:
+                rtt = round((answered.result() - start) * 1000, 1)
+            else:
+                answered.cancel()
+            transport.close()
+        results.append((server, source, rtt))
+    return results
+
+
+class DnsPostureEngine:
+    """Which resolvers really answer, and over which interface.
+
+    Behind the systemd-resolved stub (127.0.0.53) the real upstreams are
+    read from resolved over D-Bus, or from its generated upstream
+    resolv.conf.  All upstreams are probed concurrently with one deadline.
+    The result is cached until a resolver file changes or rtnetlink reports
+    a route/address change.
+
+    ``system`` is one of the HUD's system backends (live, recording or
+    replay) and ``route_engine`` its RouteLeakEngine.
+    """
+
+    def __init__(self, system, route_engine,
+                 port: int = 53, deadline: float = DNS_PROBE_DEADLINE):
+        self.system = system
+        self.route_engine = route_engine
+        self.port = port
+        self.deadline = deadline
+        self._key: Optional[tuple] = None
+        self._posture: Optional[DnsPosture] = None
+        self._lock = threading.Lock()
+
+    def _sig(self, path: str) -> tuple:
+        st = self.system.stat(path)
+        return (st.st_ino, st.st_mtime_ns, st.st_size) if st is not None else ()
+
+    def _upstreams(self) -> Optional[Tuple[str, List[Tuple[str, Optional[str]]]]]:
+        text = self.system.read(RESOLV_CONF)
+        if text is None:
+            return None
+        nameservers = parse_nameservers(text)
+        if not nameservers or any(ns not in RESOLVED_STUBS for ns in nameservers):
+            return "resolv.conf", [(ns, None) for ns in nameservers]
+        try:
+            servers = self.system.call("resolved_dns", _resolved_upstreams_dbus)
+            if servers:
+                return "resolved-dbus", [tuple(s) for s in servers]
+        except Exception:
+            pass
+        text = self.system.read(RESOLVED_UPSTREAM_CONF)
+        return "resolved", [(ns, None) for ns in parse_nameservers(text or "")]
+
+    def _current_key(self) -> tuple:
+        return (self._sig(RESOLV_CONF), self._sig(RESOLVED_UPSTREAM_CONF), self.route_engine.snapshot())
+
+    def _cached(self, key: tuple) -> bool:
+        return self._key is not None and self._key[:2] == key[:2] and self._key[2] is key[2]
+
+    def fresh(self) -> bool:
+        """Whether ``snapshot()`` would be served from cache (no probe)."""
+        key = self._current_key()
+        with self._lock:
+            return self._cached(key)
+
+    def snapshot(self) -> Optional[DnsPosture]:
+        key = self._current_key()
+        state = key[2]
+        with self._lock:
+            if self._cached(key):
+                return self._posture
+            found = self._upstreams()
+            if found is None:
+                posture = None
+            else:
+                source, servers = found
+                addresses = list(dict.fromkeys(addr for addr, _link in servers))
+                links = dict(servers)
+                try:
+                    probed = self.system.call(
+                        "dns_probe", lambda *a: asyncio.run(_probe_resolvers(*a)),
+                        addresses, self.port, DNS_PROBE_NAME, self.deadline)
+                except Exception:
+                    probed = [(addr, None, None) for addr in addresses]
+                posture = DnsPosture(source, tuple(
+                    # resolved pins per-link servers to their link; others follow the routes
+                    DnsUpstream(addr, links.get(addr), links.get(addr) or (state.iface_of(src) if src else None), rtt)
+                    for addr, src, rtt in probed))
+            self._key, self._posture = key, posture
+            return posture
@@ -0,0 +1,362 @@
+"""SEC-HUD fleet posture streaming.
+
+Scanners push one NDJSON posture record per scan to a collector
+(``tracelab-hud.py --collect``), which keeps the latest posture and a
+bounded status history per host in a FleetIndex. No GTK imports: the
+collector's window lives in the HUD script.
+"""
+
+import json
+import os
+import random
+import selectors
+import socket
+import threading
+import time
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from hud_model import HUDStats, ResultHistory, SecurityCheck, Section, Status, threat_level
+
+
+def parse_address(value: str) -> Tuple[int, Any]:
+    """"unix:/path" -> (AF_UNIX, path); "[host]:port" / ":port" -> (AF_INET/6, (host, port))."""
+    if value.startswith("unix:"):
+        return socket.AF_UNIX, os.path.expanduser(value[5:])
+    host, _, port = value.rpartition(":")
+    host = host.strip("[]") or "127.0.0.1"
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    return family, (host, int(port))
+
+
+# Set to "host:port" or "unix:/path" to push one NDJSON posture record per
+# scan to a collector started with ``--collect``.
+FLEET_ENV = "TRACELABS_HUD_FLEET"
+
+FLEET_HISTORY = 64           # scans of status history kept per host
+FLEET_STALE_AFTER = 180      # seconds without a record before a host is "stale"
+FLEET_FORGET_AFTER = 3600    # ... and before it is dropped from the index
+FLEET_MAX_HOSTS = 4096
+FLEET_MAX_STRINGS = 16384    # interned check ids, names, sections and hosts
+FLEET_MAX_LINE = 1 << 20
+FLEET_REFRESH_MS = 500
+
+
+def posture_record(scanner, host: str) -> Dict[str, Any]:
+    """The NDJSON wire form of one scan."""
+    return {
+        "v": 1,
+        "host": host,
+        "ts": round(time.time(), 3),
+        "score": scanner.score,
+        "threat": scanner.stats.threat_level,
+        "checks": [c.to_dict() for c in scanner.checks],
+        "resources": scanner.resources,
+    }
+
+
+class PostureStreamer:
+    """Sends the latest posture record to a collector from a background thread.
+
+    Only the newest record is kept: if the collector is slow or down, older
+    scans are superseded rather than queued, and reconnects back off up to
+    a minute.
+    """
+
+    def __init__(self, address: str, host: Optional[str] = None):
+        self.family, self.addr = parse_address(address)
+        self.host = host or socket.gethostname()
+        self._pending: Optional[bytes] = None
+        self._wake = threading.Event()
+        self._sock: Optional[socket.socket] = None
+        threading.Thread(target=self._loop, daemon=True, name="hud-fleet").start()
+
+    def publish(self, scanner):
+        self._pending = (json.dumps(posture_record(scanner, self.host), separators=(",", ":")) + "\n").encode()
+        self._wake.set()
+
+    def _connect(self) -> socket.socket:
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.settimeout(5)
+        try:
+            sock.connect(self.addr)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _loop(self):
+        backoff = 1
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            line, self._pending = self._pending, None
+            if line is None:
+                continue
+            try:
+                if self._sock is None:
+                    self._sock = self._connect()
+                self._sock.sendall(line)
+                backoff = 1
+            except OSError:
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+                if self._pending is None:
+                    self._pending = line
+                time.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+                self._wake.set()
+
+
+class HostState:
+    __slots__ = ("host", "score", "threat", "checks", "last_seen", "history")
+
+    def __init__(self, host: str, history: int):
+        self.host = host
+        self.score = 0
+        self.threat = "UNKNOWN"
+        self.checks: Tuple[SecurityCheck, ...] = ()
+        self.last_seen = 0.0
+        self.history = ResultHistory(history)
+
+
+class FleetSummary(NamedTuple):
+    # (host, score, threat, red count, stale), worst first
+    hosts: List[Tuple[str, int, str, int, bool]]
+    # (check name, green, yellow, red), most red first
+    checks: List[Tuple[str, int, int, int]]
+    stats: HUDStats
+    stale: int
+
+
+class FleetIndex:
+    """Latest posture and bounded status history per host.
+
+    Strings repeated across hosts (check ids, names, sections, host
+    names) are interned once, so hundreds of hosts share them. Details
+    vary per push (RTTs, addresses) and are not interned; the table stops
+    growing at FLEET_MAX_STRINGS so no sender can grow it at will.
+    """
+
+    def __init__(self, history: int = FLEET_HISTORY, stale_after: float = FLEET_STALE_AFTER,
+                 forget_after: float = FLEET_FORGET_AFTER, max_hosts: int = FLEET_MAX_HOSTS):
+        self.history = history
+        self.stale_after = stale_after
+        self.forget_after = forget_after
+        self.max_hosts = max_hosts
+        self.hosts: Dict[str, HostState] = {}
+        self.version = 0
+        self.rejected = 0
+        self._strings: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._summary: Optional[Tuple[tuple, FleetSummary]] = None
+
+    def _intern(self, value: str) -> str:
+        interned = self._strings.get(value)
+        if interned is None:
+            if len(self._strings) >= FLEET_MAX_STRINGS:
+                return value
+            interned = self._strings[value] = value
+        return interned
+
+    def reject(self) -> None:
+        """Count a malformed record or an oversized line."""
+        with self._lock:
+            self.rejected += 1
+
+    def ingest(self, record: Dict[str, Any], now: Optional[float] = None) -> None:
+        """Add one posture record; raises ValueError/KeyError/TypeError if malformed."""
+        host = str(record["host"])[:64]
+        checks = tuple(
+            SecurityCheck(
+                self._intern(c["name"]), Status.parse(c["status"]), str(c.get("detail", "")),
+                Section.parse(self._intern(c.get("section", "System"))), int(c.get("priority", 1)),
+                self._intern(c.get("id", c["name"])),
+            )
+            for c in record["checks"]
+        )
+        score = int(record["score"])
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self.hosts.get(host)
+            if state is None:
+                if len(self.hosts) >= self.max_hosts:
+                    raise ValueError("host limit reached")
+                state = self.hosts[host] = HostState(self._intern(host), self.history)
+            state.score = score
+            state.threat = str(record.get("threat") or threat_level(score))
+            state.checks = checks
+            state.last_seen = now
+            state.history.append(now, checks)
+            self.version += 1
+
+    def ingest_line(self, line: bytes, now: Optional[float] = None) -> bool:
+        try:
+            self.ingest(json.loads(line), now)
+            return True
+        except (ValueError, KeyError, TypeError):
+            self.reject()
+            return False
+
+    def summary(self, now: Optional[float] = None) -> FleetSummary:
+        """Ranked hosts and per-check status counts; cached until data changes."""
+        now = time.time() if now is None else now
+        key = (self.version, int(now // 5))
+        if self._summary is not None and self._summary[0] == key:
+            return self._summary[1]
+        with self._lock:
+            for host in [h for h, s in self.hosts.items() if now - s.last_seen > self.forget_after]:
+                del self.hosts[host]
+            states = list(self.hosts.values())
+        hosts = []
+        counts: Dict[str, list] = {}
+        threats = {"SECURE": 0, "CAUTION": 0, "COMPROMISED": 0}
+        stale = 0
+        for state in states:
+            red = 0
+            for c in state.checks:
+                row = counts.get(c.name)
+                if row is None:
+                    row = counts[c.name] = [0, 0, 0]
+                row[c.status] += 1
+                red += c.status == Status.RED
+            is_stale = now - state.last_seen > self.stale_after
+            stale += is_stale
+            threats[state.threat] = threats.get(state.threat, 0) + 1
+            hosts.append((state.host, state.score, state.threat, red, is_stale))
+        hosts.sort(key=lambda h: (h[1], -h[3], h[0]))
+        checks = sorted(((name, *row) for name, row in counts.items()),
+                        key=lambda c: (-c[3], -c[2], c[0]))
+        fleet_score = min((h[1] for h in hosts), default=0)
+        stats = HUDStats(
+            total_checks=len(hosts), green_count=threats["SECURE"],
+            yellow_count=threats["CAUTION"], red_count=threats["COMPROMISED"],
+            threat_level=threat_level(fleet_score) if hosts else "UNKNOWN",
+            last_scan=time.strftime("%H:%M:%S", time.localtime(now)),
+        )
+        summary = FleetSummary(hosts, checks, stats, stale)
+        self._summary = (key, summary)
+        return summary
+
+
+class FleetCollector:
+    """Accepts NDJSON posture streams on one socket and feeds a FleetIndex.
+
+    A single selector thread serves every sender; each connection only
+    keeps its unfinished line buffered.
+    """
+
+    def __init__(self, address: str, index: FleetIndex):
+        self.address = address
+        self.index = index
+        self._listener: Optional[socket.socket] = None
+        self._running = False
+
+    def start(self):
+        family, addr = parse_address(self.address)
+        listener = socket.socket(family, socket.SOCK_STREAM)
+        listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if family == socket.AF_UNIX:
+            try:
+                os.unlink(addr)
+            except FileNotFoundError:
+                pass
+        listener.bind(addr)
+        if family == socket.AF_UNIX:
+            os.chmod(addr, 0o660)
+        listener.listen(128)
+        listener.setblocking(False)
+        self._listener = listener
+        self._running = True
+        threading.Thread(target=self._serve, daemon=True, name="hud-collector").start()
+
+    def stop(self):
+        self._running = False
+
+    def _serve(self):
+        sel = selectors.DefaultSelector()
+        sel.register(self._listener, selectors.EVENT_READ, None)
+        while self._running:
+            for key, _mask in sel.select(timeout=1.0):
+                if key.data is None:
+                    try:
+                        conn, _peer = self._listener.accept()
+                    except OSError:
+                        continue
+                    conn.setblocking(False)
+                    sel.register(conn, selectors.EVENT_READ, bytearray())
+                    continue
+                conn, buf = key.fileobj, key.data
+                try:
+                    chunk = conn.recv(65536)
+                except (BlockingIOError, InterruptedError):
+                    continue
+                except OSError:
+                    chunk = b""
+                if not chunk:
+                    sel.unregister(conn)
+                    conn.close()
+                    continue
+                buf += chunk
+                end = buf.rfind(b"\n")
+                if end >= 0:
+                    now = time.time()
+                    for line in bytes(buf[:end]).split(b"\n"):
+                        if line.strip():
+                            self.index.ingest_line(line, now)
+                    del buf[:end + 1]
+                if len(buf) > FLEET_MAX_LINE:
+                    self.index.reject()
+                    sel.unregister(conn)
+                    conn.close()
+        for key in list(sel.get_map().values()):
+            key.fileobj.close()
+        sel.close()
+
+
+def simulate_senders(address: str, checks: List[Tuple[str, str, str]], count: int,
+                     interval: float = 1.0, seed: int = 0) -> threading.Event:
+    """Start ``count`` fake scanners streaming random posture to ``address``.
+
+    ``checks`` is a list of (id, name, section). Each sender keeps one
+    connection open and drifts a few checks per round, which is enough to
+    exercise ranking, counts and history. Setting the returned event stops
+    the senders.
+    """
+    names = list(checks)
+    weights = {0: 100, 1: 50, 2: 0}
+    stop = threading.Event()
+
+    def sender(n: int):
+        rng = random.Random(seed * 100003 + n)
+        statuses = [rng.choice((0, 0, 0, 1, 2)) for _ in names]
+        family, addr = parse_address(address)
+        sock = None
+        while not stop.is_set():
+            for i in rng.sample(range(len(names)), min(2, len(names))):
+                statuses[i] = rng.choice((0, 0, 1, 2))
+            score = round(sum(weights[s] for s in statuses) / len(statuses))
+            record = {
+                "v": 1, "host": f"sim-{n:03d}", "ts": time.time(), "score": score,
+                "checks": [
+                    {"id": cid, "name": name, "section": section, "status": ("green", "yellow", "red")[s],
+                     "detail": "simulated", "priority": 2}
+                    for (cid, name, section), s in zip(names, statuses)
+                ],
+            }
+            try:
+                if sock is None:
+                    sock = socket.socket(family, socket.SOCK_STREAM)
+                    sock.connect(addr)
+                sock.sendall((json.dumps(record) + "\n").encode())
+            except OSError:
+                if sock is not None:
+                    sock.close()
+                sock = None
+            stop.wait(interval * rng.uniform(0.5, 1.5))
+        if sock is not None:
+            sock.close()
+
+    for n in range(count):
+        threading.Thread(target=sender, args=(n,), daemon=True, name=f"hud-sim-{n}").start()
+    return stop
@@ -0,0 +1,151 @@
+"""SEC-HUD data model: check results, scan history and summary stats.
+
+Shared by the HUD and the fleet collector; no GTK imports, so it can be
+used headless and from tests.
+"""
+
+from array import array
+from dataclasses import dataclass
+from enum import IntEnum
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Union
+
+
+class Status(IntEnum):
+    """Check outcome, ordered by severity so ``max()`` picks the worst."""
+    GREEN = 0
+    YELLOW = 1
+    RED = 2
+
+    def __str__(self) -> str:
+        return self.name.lower()
+
+    def __format__(self, spec: str) -> str:
+        return format(str(self), spec)
+
+    @classmethod
+    def parse(cls, value: Union["Status", str, int]) -> "Status":
+        if isinstance(value, str):
+            return cls[value.upper()]
+        return cls(value)
+
+
+class Section(IntEnum):
+    NETWORK = 0
+    SYSTEM = 1
+    PRIVACY = 2
+
+    def __str__(self) -> str:
+        return self.name.capitalize()
+
+    def __format__(self, spec: str) -> str:
+        return format(str(self), spec)
+
+    @classmethod
+    def parse(cls, value: Union["Section", str, int]) -> Union["Section", str]:
+        """Known sections become members; plugin-defined names stay strings."""
+        if isinstance(value, str):
+            return cls.__members__.get(value.upper(), value)
+        return cls(value)
+
+
+class SecurityCheck(NamedTuple):
+    """One check result.
+
+    A tuple subclass: immutable, no per-instance ``__dict__``, and equality and
+    hashing run in C, which keeps change detection and history cheap.  Use
+    ``to_dict``/``from_dict`` for JSON, where status and section are the
+    lowercase/capitalized strings of the original format.
+    """
+    name: str
+    status: Status
+    detail: str
+    section: Union[Section, str]  # plugin checks may define their own sections
+    priority: int = 1  # 1=high, 2=medium, 3=low
+    id: str = ""  # registry id of the check that produced this result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "id": self.id, "name": self.name, "status": str(self.status),
+            "detail": self.detail, "section": str(self.section), "priority": self.priority,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "SecurityCheck":
+        return cls(
+            data["name"], Status.parse(data["status"]), data.get("detail", ""),
+            Section.parse(data.get("section", "System")), int(data.get("priority", 1)),
+            data.get("id", ""),
+        )
+
+
+class ResultHistory:
+    """Ring buffer of past scans stored as one status byte per check.
+
+    Check ids are interned to columns, each an ``array('b')`` of ``capacity``
+    slots (-1 = check absent from that scan), so a scan costs a few bytes
+    per check instead of a list of result objects.
+    """
+
+    def __init__(self, capacity: int = 256):
+        self.capacity = capacity
+        self.times = array("d", bytes(8 * capacity))
+        self._columns: Dict[str, array] = {}
+        self._head = 0   # next slot to write
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, checks: Iterable[SecurityCheck]):
+        slot = self._head
+        for column in self._columns.values():
+            column[slot] = -1
+        for check in checks:
+            column = self._columns.get(check.id)
+            if column is None:
+                column = self._columns[check.id] = array("b", b"\xff" * self.capacity)
+            column[slot] = check.status
+        self.times[slot] = timestamp
+        self._head = (slot + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def _order(self) -> range:
+        start = (self._head - self._count) % self.capacity
+        return range(start, start + self._count)
+
+    def series(self, check_id: str) -> List[Optional[Status]]:
+        """Statuses of one check, oldest first (None where it did not run)."""
+        column = self._columns.get(check_id)
+        if column is None:
+            return [None] * self._count
+        cap = self.capacity
+        return [Status(column[i % cap]) if column[i % cap] >= 0 else None for i in self._order()]
+
+    def flips(self, check_id: str) -> int:
+        """Number of status changes of one check within the retained window."""
+        values = [v for v in self.series(check_id) if v is not None]
+        return sum(1 for a, b in zip(values, values[1:]) if a != b)
+
+    def timestamps(self) -> List[float]:
+        cap = self.capacity
+        return [self.times[i % cap] for i in self._order()]
+
+
+@dataclass
+class HUDStats:
+    total_checks: int = 0
+    green_count: int = 0
+    yellow_count: int = 0
+    red_count: int = 0
+    threat_level: str = "UNKNOWN"
+    vpn_uptime: str = "N/A"
+    last_scan: str = ""
+    active_connections: int = 0
+
+
+def threat_level(score: int) -> str:
+    if score >= 80:
+        return "SECURE"
+    if score >= 50:
+        return "CAUTION"
+    return "COMPROMISED"
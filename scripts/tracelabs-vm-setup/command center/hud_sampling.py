@@ -0,0 +1,378 @@
+"""SEC-HUD samplers: interface throughput and VM resources.
+
+Both keep their /proc and /sys files open and re-read them into
+preallocated storage, so a sample allocates next to nothing. No GTK
+imports.
+"""
+
+import os
+import threading
+import time
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from hud_model import Status
+
+VPN_IFACE_PREFIXES = ("tun", "wg", "tap")
+
+
+THROUGHPUT_INTERVAL = 1.0       # seconds between counter samples
+THROUGHPUT_HISTORY = 120        # samples kept per interface (2 minutes)
+THROUGHPUT_RESCAN = 10          # samples between interface list rescans
+THROUGHPUT_STALL = 15           # seconds a tunnel may send without receiving
+THROUGHPUT_BYPASS_WINDOW = 10   # samples averaged for the bypass check
+THROUGHPUT_BYPASS_BYTES = 64 * 1024  # B/s on physical links beyond the tunnel's own
+TUNNEL_OVERHEAD = 1.15          # encapsulation + handshakes on the physical link
+
+
+class InterfaceCounters:
+    """Open counter files and rate history of one interface."""
+
+    __slots__ = ("name", "vpn", "rx_fd", "tx_fd", "rx_bytes", "tx_bytes", "rx", "tx", "quiet")
+
+    def __init__(self, net_dir: str, name: str, history: int):
+        self.name = name
+        self.vpn = name.startswith(VPN_IFACE_PREFIXES)
+        self.rx_fd = os.open(f"{net_dir}/{name}/statistics/rx_bytes", os.O_RDONLY | os.O_CLOEXEC)
+        try:
+            self.tx_fd = os.open(f"{net_dir}/{name}/statistics/tx_bytes", os.O_RDONLY | os.O_CLOEXEC)
+        except OSError:
+            os.close(self.rx_fd)
+            raise
+        self.rx_bytes = self.tx_bytes = -1
+        self.rx = array("f", bytes(4 * history))   # B/s, ring slot = sample number % history
+        self.tx = array("f", bytes(4 * history))
+        self.quiet = 0   # consecutive samples with tx but no rx
+
+    def close(self):
+        os.close(self.rx_fd)
+        os.close(self.tx_fd)
+
+
+class ThroughputSampler:
+    """Samples rx/tx byte counters of tunnel and physical interfaces.
+
+    Each counter file is opened once and re-read with ``os.pread`` (sysfs
+    regenerates the value on every read from offset 0), so a sample costs
+    two syscalls per interface and no allocation beyond the parsed int.
+    Rates go into fixed ``array`` rings; the scanner reads ``status()``
+    for stall/bypass flags and the expanded HUD graphs ``series()``.
+    """
+
+    def __init__(self, net_dir: str = "/sys/class/net", interval: float = THROUGHPUT_INTERVAL,
+                 history: int = THROUGHPUT_HISTORY):
+        self.net_dir = net_dir
+        self.interval = interval
+        self.history = history
+        self.ifaces: Dict[str, InterfaceCounters] = {}
+        self.samples = 0          # total samples taken; also the ring write position
+        self._last = 0.0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="hud-throughput")
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        self._wake.set()
+
+    def _tracked(self, name: str) -> bool:
+        # tunnels, plus anything backed by a device (skips lo, bridges, veths)
+        return name.startswith(VPN_IFACE_PREFIXES) or os.path.exists(f"{self.net_dir}/{name}/device")
+
+    def rescan(self):
+        """Open counters for new interfaces and close those that went away."""
+        try:
+            names = {n for n in os.listdir(self.net_dir) if self._tracked(n)}
+        except OSError:
+            names = set()
+        with self._lock:
+            for name in [n for n in self.ifaces if n not in names]:
+                self.ifaces.pop(name).close()
+            for name in names - self.ifaces.keys():
+                try:
+                    self.ifaces[name] = InterfaceCounters(self.net_dir, name, self.history)
+                except OSError:
+                    pass
+
+    def sample(self, now: Optional[float] = None):
+        now = time.monotonic() if now is None else now
+        dt = now - self._last if self._last else 0.0
+        self._last = now
+        pos = self.samples % self.history
+        with self._lock:
+            for name, c in list(self.ifaces.items()):
+                try:
+                    rx = int(os.pread(c.rx_fd, 32, 0))
+                    tx = int(os.pread(c.tx_fd, 32, 0))
+                except (OSError, ValueError):
+                    # interface removed between rescans
+                    self.ifaces.pop(name).close()
+                    continue
+                if c.rx_bytes < 0 or dt <= 0 or rx < c.rx_bytes or tx < c.tx_bytes:
+                    rx_rate = tx_rate = 0.0   # first sample or counter reset
+                else:
+                    rx_rate = (rx - c.rx_bytes) / dt
+                    tx_rate = (tx - c.tx_bytes) / dt
+                c.rx_bytes, c.tx_bytes = rx, tx
+                c.rx[pos], c.tx[pos] = rx_rate, tx_rate
+                c.quiet = c.quiet + 1 if tx_rate > 0 and rx_rate == 0 else 0
+            self.samples += 1
+
+    def _loop(self):
+        while self._running:
+            if self.samples % THROUGHPUT_RESCAN == 0:
+                self.rescan()
+            self.sample()
+            self._wake.wait(self.interval)
+        with self._lock:
+            for c in self.ifaces.values():
+                c.close()
+            self.ifaces.clear()
+
+    def series(self, name: str) -> Tuple[List[float], List[float]]:
+        """(rx, tx) rates of one interface, oldest first."""
+        with self._lock:
+            c = self.ifaces.get(name)
+            if c is None:
+                return [], []
+            n = min(self.samples, self.history)
+            start = (self.samples - n) % self.history
+            order = [(start + i) % self.history for i in range(n)]
+            return [c.rx[i] for i in order], [c.tx[i] for i in order]
+
+    def _average(self, ring: array, window: int) -> float:
+        n = min(self.samples, self.history, window)
+        if n == 0:
+            return 0.0
+        end = self.samples % self.history
+        return sum(ring[(end - 1 - i) % self.history] for i in range(n)) / n
+
+    def graph_iface(self) -> Optional[str]:
+        """The interface worth graphing: the busiest tunnel, else the busiest link."""
+        with self._lock:
+            ranked = sorted(self.ifaces.values(),
+                            key=lambda c: (c.vpn, self._average(c.rx, 5) + self._average(c.tx, 5)),
+                            reverse=True)
+        return ranked[0].name if ranked else None
+
+    def status(self) -> Dict[str, Any]:
+        """Current rates and flags as plain data (recordable through the system backend)."""
+        stall_samples = max(1, round(THROUGHPUT_STALL / self.interval))
+        with self._lock:
+            rates = {}
+            stalled = []
+            tunnel = physical = 0.0
+            busiest: Tuple[float, Optional[str]] = (0.0, None)
+            for name, c in sorted(self.ifaces.items()):
+                rx = self._average(c.rx, THROUGHPUT_BYPASS_WINDOW)
+                tx = self._average(c.tx, THROUGHPUT_BYPASS_WINDOW)
+                rates[name] = {"rx": round(rx), "tx": round(tx), "vpn": c.vpn}
+                if c.vpn:
+                    tunnel += rx + tx
+                    if c.quiet >= stall_samples:
+                        stalled.append(name)
+                else:
+                    physical += rx + tx
+                    busiest = max(busiest, (rx + tx, name))
+        has_tunnel = any(r["vpn"] for r in rates.values())
+        excess = physical - tunnel * TUNNEL_OVERHEAD
+        bypass = busiest[1] if has_tunnel and excess > THROUGHPUT_BYPASS_BYTES else None
+        return {
+            "samples": self.samples,
+            "ifaces": rates,
+            "stalled": stalled,
+            "bypass": bypass,
+            "excess": round(max(excess, 0.0)),
+        }
+
+
+def format_rate(rate: float) -> str:
+    for unit in ("B", "K", "M"):
+        if rate < 1000:
+            return f"{rate:.0f}{unit}" if unit == "B" or rate >= 10 else f"{rate:.1f}{unit}"
+        rate /= 1000
+    return f"{rate:.1f}G"
+
+
+# ---------------------------------------------------------------------------
+# VM resource sampler
+# ---------------------------------------------------------------------------
+
+RESOURCE_PSI = ("cpu", "memory", "io")
+RESOURCE_BUFFER = 8192        # /proc/stat on a 64-vCPU guest is ~6 KB
+RESOURCE_WARN = 85            # % CPU / memory / swap / disk used
+RESOURCE_CRIT = 95
+PSI_WARN = 10.0               # % of the last 10 s some task stalled
+PSI_CRIT = 40.0
+
+
+def _kb_field(buf: bytearray, end: int, key: bytes) -> int:
+    """Value in bytes of a "Key:   123 kB" line of a meminfo-style buffer (0 if absent)."""
+    i = buf.find(key, 0, end)
+    if i < 0:
+        return 0
+    j = buf.find(b"\n", i, end)
+    return int(buf[i + len(key):j if j >= 0 else end].split()[0]) * 1024
+
+
+class ResourceSampler:
+    """CPU, memory, pressure and disk usage of the VM.
+
+    /proc files are opened once and re-read with ``os.preadv`` into one
+    preallocated buffer; disks are queried with ``fstatvfs`` on a kept
+    directory fd. CPU utilisation is the busy share of the jiffies that
+    elapsed since the previous ``snapshot()``.
+    """
+
+    def __init__(self, proc: str = "/proc", disks: Tuple[str, ...] = ("/", "~")):
+        self.proc = proc
+        self._buf = bytearray(RESOURCE_BUFFER)
+        self._fds: Dict[str, Optional[int]] = {}
+        self._cpu_prev: Optional[Tuple[int, int]] = None
+        self._disks: List[Tuple[str, int]] = []
+        devices = set()
+        for label in disks:
+            try:
+                fd = os.open(os.path.expanduser(label), os.O_RDONLY | os.O_DIRECTORY | os.O_CLOEXEC)
+            except OSError:
+                continue
+            dev = os.fstat(fd).st_dev
+            if dev in devices:   # home on the root filesystem
+                os.close(fd)
+                continue
+            devices.add(dev)
+            self._disks.append((label, fd))
+        self._lock = threading.Lock()
+
+    def _read(self, name: str) -> int:
+        """Read /proc/<name> into the shared buffer; returns the length (-1 if unavailable)."""
+        fd = self._fds.get(name, -1)
+        if fd == -1:
+            try:
+                fd = os.open(f"{self.proc}/{name}", os.O_RDONLY | os.O_CLOEXEC)
+            except OSError:
+                fd = None   # e.g. no PSI in this kernel; don't retry
+            self._fds[name] = fd
+        if fd is None:
+            return -1
+        try:
+            return os.preadv(fd, [self._buf], 0)
+        except OSError:
+            return -1
+
+    def _cpu(self) -> Optional[float]:
+        n = self._read("stat")
+        if n <= 0:
+            return None
+        # "cpu  user nice system idle iowait irq softirq steal guest guest_nice"
+        fields = [int(v) for v in self._buf[:self._buf.find(b"\n", 0, n)].split()[1:9]]
+        idle = fields[3] + fields[4]
+        total = sum(fields)
+        prev, self._cpu_prev = self._cpu_prev, (total - idle, total)
+        if prev is None or total <= prev[1]:
+            return None
+        return 100.0 * (total - idle - prev[0]) / (total - prev[1])
+
+    def _psi(self, name: str) -> Optional[Tuple[float, float]]:
+        n = self._read(f"pressure/{name}")
+        if n <= 0:
+            return None
+        values = []
+        for kind in (b"some avg10=", b"full avg10="):
+            i = self._buf.find(kind, 0, n)
+            if i < 0:
+                values.append(0.0)
+                continue
+            i += len(kind)
+            values.append(float(self._buf[i:self._buf.find(b" ", i, n)]))
+        return values[0], values[1]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current usage as plain data (recordable through the system backend)."""
+        with self._lock:
+            state: Dict[str, Any] = {"cpu": self._cpu()}
+            n = self._read("meminfo")
+            if n > 0:
+                buf = self._buf
+                state["mem_total"] = _kb_field(buf, n, b"MemTotal:")
+                state["mem_available"] = _kb_field(buf, n, b"MemAvailable:")
+                state["swap_total"] = _kb_field(buf, n, b"SwapTotal:")
+                state["swap_free"] = _kb_field(buf, n, b"SwapFree:")
+            pressure = {}
+            for name in RESOURCE_PSI:
+                psi = self._psi(name)
+                if psi is not None:
+                    pressure[name] = psi
+            state["pressure"] = pressure
+            disks = []
+            for label, fd in self._disks:
+                try:
+                    st = os.fstatvfs(fd)
+                except OSError:
+                    continue
+                total = st.f_blocks * st.f_frsize
+                if total:
+                    disks.append([label, total, st.f_bavail * st.f_frsize])
+            state["disks"] = disks
+        return state
+
+    def close(self):
+        with self._lock:
+            for fd in self._fds.values():
+                if fd is not None:
+                    os.close(fd)
+            for _label, fd in self._disks:
+                os.close(fd)
+            self._fds.clear()
+            self._disks.clear()
+
+
+def resource_rows(state: Optional[Dict[str, Any]]) -> Tuple[Tuple[str, float, str, Status], ...]:
+    """(label, % used, detail, status) rows for the HUD and headless output."""
+    if not state:
+        return ()
+
+    def level(pct: float, psi: float = 0.0) -> Status:
+        if pct >= RESOURCE_CRIT or psi >= PSI_CRIT:
+            return Status.RED
+        if pct >= RESOURCE_WARN or psi >= PSI_WARN:
+            return Status.YELLOW
+        return Status.GREEN
+
+    def gib(n: int) -> str:
+        return f"{n / (1 << 30):.1f}G"
+
+    pressure = state.get("pressure", {})
+    rows = []
+    cpu = state.get("cpu")
+    cpu_psi = pressure.get("cpu", (0.0, 0.0))[0]
+    if cpu is not None:
+        rows.append(("CPU", cpu, f"{cpu:.0f}%" + (f" psi {cpu_psi:.0f}" if "cpu" in pressure else ""),
+                     level(cpu, cpu_psi)))
+    total = state.get("mem_total", 0)
+    if total:
+        used = total - state["mem_available"]
+        pct = 100.0 * used / total
+        mem_psi = pressure.get("memory", (0.0, 0.0))
+        detail = f"{gib(used)}/{gib(total)}" + (f" psi {mem_psi[0]:.0f}" if "memory" in pressure else "")
+        # "full" memory pressure means every task was stalled on reclaim
+        rows.append(("MEM", pct, detail, level(pct, max(mem_psi[0], mem_psi[1] * 4))))
+    swap = state.get("swap_total", 0)
+    if swap:
+        used = swap - state["swap_free"]
+        pct = 100.0 * used / swap
+        rows.append(("SWAP", pct, f"{gib(used)}/{gib(swap)}", level(pct)))
+    if "io" in pressure:
+        io = pressure["io"][0]
+        rows.append(("IO WAIT", io, f"psi {io:.0f}", level(0.0, io)))
+    for path, total, free in state.get("disks", ()):
+        pct = 100.0 * (total - free) / total
+        rows.append((f"DISK {path}", pct, f"{gib(free)} free", level(pct)))
+    return tuple(rows)
@@ -0,0 +1,246 @@
+"""SEC-HUD Tor status from one ControlPort session.
+
+TorMonitor authenticates (NULL, SAFECOOKIE, or COOKIE only when
+SAFECOOKIE is not offered), subscribes to bootstrap and circuit events
+and keeps the state in memory for the Tor check. No GTK imports.
+"""
+
+import hashlib
+import hmac
+import os
+import re
+import socket
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from hud_fleet import parse_address
+
+
+# ControlPort address ("host:port" or "unix:/run/tor/control")
+TOR_CONTROL_ENV = "TRACELABS_HUD_TOR_CONTROL"
+TOR_CONTROL_DEFAULT = "127.0.0.1:9051"
+TOR_FAILURE_WINDOW = 600   # seconds of circuit failures to remember
+TOR_FAILURE_WARN = 5
+
+_TOR_KV = re.compile(r'(\w+)=("(?:[^"\\]|\\.)*"|\S+)')
+
+
+def _tor_kv(text: str) -> Dict[str, str]:
+    return {k: v[1:-1] if v.startswith('"') else v for k, v in _TOR_KV.findall(text)}
+
+
+class TorMonitor:
+    """One authenticated ControlPort session, updated by pushed events.
+
+    After authenticating (NULL, COOKIE or SAFECOOKIE) the monitor reads
+    the bootstrap phase and circuit list once, then subscribes to
+    STATUS_CLIENT and CIRC events and keeps the state in memory: checks
+    read it without any I/O, and ``on_change`` fires as events arrive.
+    Reconnects back off up to a minute while Tor is down.
+    """
+
+    def __init__(self, address: Optional[str] = None,
+                 on_change: Optional[Callable[[], None]] = None):
+        self.address = address or os.environ.get(TOR_CONTROL_ENV) or TOR_CONTROL_DEFAULT
+        self.on_change = on_change
+        self.connected = False
+        self.error = ""
+        self.bootstrap = 0
+        self.bootstrap_tag = ""
+        self.circuits: Dict[str, str] = {}   # circuit id -> status
+        self.failures: List[float] = []       # times of FAILED circuits
+        self.events = 0
+        self._sock: Optional[socket.socket] = None
+        self._buf = b""
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._loop, daemon=True, name="hud-tor")
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if self._sock is not None:
+            try:
+                self._sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current state as plain data (recordable through the system backend)."""
+        cutoff = time.time() - TOR_FAILURE_WINDOW
+        return {
+            "connected": self.connected,
+            "error": self.error,
+            "bootstrap": self.bootstrap,
+            "tag": self.bootstrap_tag,
+            "built": sum(1 for status in list(self.circuits.values()) if status == "BUILT"),
+            "failures": sum(1 for t in self.failures if t >= cutoff),
+        }
+
+    # -- protocol -----------------------------------------------------------
+
+    def _readline(self) -> str:
+        while b"\r\n" not in self._buf:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("control connection closed")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line.decode("utf-8", "replace")
+
+    def _read_reply(self) -> List[str]:
+        """One reply (list of lines without status codes); events seen meanwhile are applied."""
+        lines = []
+        while True:
+            line = self._readline()
+            code, sep, rest = line[:3], line[3:4], line[4:]
+            if code == "650":
+                self._read_event(sep, rest)
+                continue
+            if not code.startswith("2"):
+                raise ConnectionError(line)
+            if sep == "+":
+                data = []
+                while True:
+                    part = self._readline()
+                    if part == ".":
+                        break
+                    data.append(part[1:] if part.startswith("..") else part)
+                lines.append(rest + "\n" + "\n".join(data))
+            else:
+                lines.append(rest)
+            if sep == " ":
+                return lines
+
+    def _command(self, line: str) -> List[str]:
+        self._sock.sendall(line.encode() + b"\r\n")
+        return self._read_reply()
+
+    def _read_event(self, sep: str, rest: str):
+        if sep == "+":  # multi-line events are not subscribed; skip the body
+            while self._readline() != ".":
+                pass
+            return
+        if sep == "-":
+            while True:
+                line = self._readline()
+                if line[3:4] == " ":
+                    break
+        self._apply_event(rest)
+
+    def _apply_event(self, event: str):
+        kind, _, body = event.partition(" ")
+        changed = False
+        if kind == "STATUS_CLIENT":
+            _severity, _, action_args = body.partition(" ")
+            action, _, args = action_args.partition(" ")
+            if action == "BOOTSTRAP":
+                kv = _tor_kv(args)
+                self.bootstrap = int(kv.get("PROGRESS", self.bootstrap))
+                self.bootstrap_tag = kv.get("TAG", self.bootstrap_tag)
+                changed = True
+            elif action in ("CIRCUIT_ESTABLISHED", "CIRCUIT_NOT_ESTABLISHED"):
+                changed = True
+        elif kind == "CIRC":
+            f = body.split()
+            if len(f) >= 2:
+                circ, status = f[0], f[1]
+                if status in ("CLOSED", "FAILED"):
+                    self.circuits.pop(circ, None)
+                    if status == "FAILED":
+                        self.failures.append(time.time())
+                        self.failures = self.failures[-64:]
+                else:
+                    self.circuits[circ] = status
+                changed = True
+        if changed:
+            self.events += 1
+            self._notify()
+
+    def _notify(self):
+        if self.on_change is not None:
+            try:
+                self.on_change()
+            except Exception:
+                pass
+
+    def _authenticate(self):
+        info = _tor_kv(" ".join(self._command("PROTOCOLINFO 1")))
+        methods = set(info.get("METHODS", "").split(","))
+        if "NULL" in methods:
+            self._command("AUTHENTICATE")
+            return
+        cookie_file = info.get("COOKIEFILE")
+        if not cookie_file or not methods & {"COOKIE", "SAFECOOKIE"}:
+            raise PermissionError("no usable ControlPort auth method " + ",".join(sorted(methods)))
+        with open(cookie_file, "rb") as f:
+            cookie = f.read()
+        # plain COOKIE sends the secret itself to whatever listens on the
+        # port; only fall back to it when SAFECOOKIE is not offered
+        if "SAFECOOKIE" not in methods:
+            self._command("AUTHENTICATE " + cookie.hex())
+            return
+        client_nonce = os.urandom(32)
+        reply = _tor_kv(" ".join(self._command("AUTHCHALLENGE SAFECOOKIE " + client_nonce.hex())))
+        server_nonce = bytes.fromhex(reply["SERVERNONCE"])
+        expected = hmac.new(b"Tor safe cookie authentication server-to-controller hash",
+                            cookie + client_nonce + server_nonce, hashlib.sha256).hexdigest()
+        if not hmac.compare_digest(expected.upper(), reply["SERVERHASH"].upper()):
+            raise PermissionError("ControlPort failed SAFECOOKIE server check")
+        digest = hmac.new(b"Tor safe cookie authentication controller-to-server hash",
+                          cookie + client_nonce + server_nonce, hashlib.sha256).hexdigest()
+        self._command("AUTHENTICATE " + digest)
+
+    def _session(self):
+        family, addr = parse_address(self.address)
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        sock.settimeout(10)
+        try:
+            sock.connect(addr)
+        except OSError:
+            sock.close()
+            raise
+        self._sock, self._buf = sock, b""
+        try:
+            self._authenticate()
+            self._command("SETEVENTS STATUS_CLIENT CIRC")
+            phase = self._command("GETINFO status/bootstrap-phase")[0]
+            kv = _tor_kv(phase)
+            self.bootstrap = int(kv.get("PROGRESS", 0))
+            self.bootstrap_tag = kv.get("TAG", "")
+            self.circuits = {}
+            for line in self._command("GETINFO circuit-status")[0].split("\n")[1:]:
+                f = line.split()
+                if len(f) >= 2:
+                    self.circuits[f[0]] = f[1]
+            self.connected, self.error = True, ""
+            self._notify()
+            sock.settimeout(None)  # from here on, block until Tor pushes something
+            while self._running:
+                line = self._readline()
+                if line.startswith("650"):
+                    self._read_event(line[3:4], line[4:])
+        finally:
+            self._sock = None
+            sock.close()
+
+    def _loop(self):
+        backoff = 1
+        while self._running:
+            started = time.monotonic()
+            try:
+                self._session()
+            except (OSError, ValueError, KeyError) as e:
+                self.error = str(e) or type(e).__name__
+            if self.connected:
+                self.connected = False
+                self._notify()
+            if time.monotonic() - started > 60:
+                backoff = 1
+            time.sleep(backoff)
+            backoff = min(backoff * 2, 60)
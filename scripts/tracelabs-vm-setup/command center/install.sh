@@ -127,6 +127,19 @@ else
     exit 1
 fi
 
+# Modules the HUD imports from its own directory
+for module in "$SCRIPT_DIR"/hud_*.py; do
+    cp "$module" "$INSTALL_DIR/"
+    echo "   ✓ $(basename "$module")"
+done
+
+# The --profile sampler, shared with the VM updater
+PROFILER="$SCRIPT_DIR/../../tracelabs-vm-updater/lib/tl_profile.py"
+if [ -f "$PROFILER" ]; then
+    cp "$PROFILER" "$INSTALL_DIR/"
+    echo "   ✓ tl_profile.py"
+fi
+
 if [ -f "$SCRIPT_DIR/tracelabs-hud.sh" ]; then
     cp "$SCRIPT_DIR/tracelabs-hud.sh" "$INSTALL_DIR/"
     chmod +x "$INSTALL_DIR/tracelabs-hud.sh"
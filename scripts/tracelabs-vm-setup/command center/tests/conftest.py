@@ -0,0 +1,24 @@
+import importlib.util
+import os
+import sys
+
+import pytest
+
+HUD_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HUD_DIR)
+
+
+@pytest.fixture(scope="session")
+def hud():
+    """The HUD script as a module; skipped where GTK 4 or cairo is missing."""
+    gi = pytest.importorskip("gi")
+    pytest.importorskip("cairo")
+    try:
+        gi.require_version("Gtk", "4.0")
+        gi.require_version("Gdk", "4.0")
+    except ValueError as e:
+        pytest.skip(str(e))
+    spec = importlib.util.spec_from_file_location("tracelab_hud", os.path.join(HUD_DIR, "tracelab-hud.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
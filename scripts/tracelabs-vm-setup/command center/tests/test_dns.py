@@ -0,0 +1,150 @@
+import asyncio
+import socket
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from hud_dns import RESOLV_CONF, DnsPostureEngine
+
+DEADLINE = 0.5
+
+
+class StubResolver(asyncio.DatagramProtocol):
+    """Answers (or ignores, or mis-answers) every query it receives."""
+
+    def __init__(self, mode: str):
+        self.mode = mode
+        self.queries = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.queries += 1
+        if self.mode == "silent":
+            return
+        qid = data[:2] if self.mode == "answer" else bytes([data[0] ^ 0xFF, data[1]])
+        self.transport.sendto(qid + bytes([data[2] | 0x80, data[3]]) + data[4:], addr)
+
+
+@pytest.fixture
+def resolvers():
+    """Start stub resolvers on one port of several loopback addresses."""
+    loop = asyncio.new_event_loop()
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    started = []
+
+    def start(modes):
+        port = 0
+        stubs = {}
+        for n, mode in enumerate(modes, 1):
+            address = f"127.0.0.{n}"
+            transport, stub = asyncio.run_coroutine_threadsafe(
+                loop.create_datagram_endpoint(lambda: StubResolver(mode), local_addr=(address, port)),
+                loop).result()
+            port = transport.get_extra_info("sockname")[1]
+            started.append(transport)
+            stubs[address] = stub
+        return port, stubs
+
+    yield start
+    for transport in started:
+        loop.call_soon_threadsafe(transport.close)
+    loop.call_soon_threadsafe(loop.stop)
+    thread.join()
+    loop.close()
+
+
+class FakeSystem:
+    def __init__(self, resolv_conf: str):
+        self.files = {RESOLV_CONF: resolv_conf}
+
+    def stat(self, path):
+        text = self.files.get(path)
+        if text is None:
+            return None
+        return SimpleNamespace(st_ino=1, st_mtime_ns=hash(text), st_size=len(text))
+
+    def read(self, path):
+        return self.files.get(path)
+
+    def call(self, name, func, *args):
+        return func(*args)
+
+
+class FakeRoutes:
+    def __init__(self):
+        self.state = SimpleNamespace(iface_of=lambda addr: "lo" if addr.startswith("127.") else None)
+
+    def snapshot(self):
+        return self.state
+
+
+def engine_for(servers, port):
+    resolv_conf = "".join(f"nameserver {s}\n" for s in servers)
+    return DnsPostureEngine(FakeSystem(resolv_conf), FakeRoutes(), port=port, deadline=DEADLINE)
+
+
+def test_answering_resolver_is_timed(resolvers):
+    port, stubs = resolvers(["answer"])
+    posture = engine_for(["127.0.0.1"], port).snapshot()
+    assert posture.source == "resolv.conf"
+    (upstream,) = posture.upstreams
+    assert upstream.address == "127.0.0.1"
+    assert upstream.egress == "lo"
+    assert upstream.rtt_ms is not None and upstream.rtt_ms < DEADLINE * 1000
+    assert stubs["127.0.0.1"].queries == 1
+
+
+def test_silent_and_mismatched_resolvers_time_out(resolvers):
+    port, stubs = resolvers(["answer", "silent", "wrong-id"])
+    engine = engine_for(list(stubs), port)
+    start = time.monotonic()
+    posture = engine.snapshot()
+    elapsed = time.monotonic() - start
+    rtts = {u.address: u.rtt_ms for u in posture.upstreams}
+    assert rtts["127.0.0.1"] is not None
+    assert rtts["127.0.0.2"] is None
+    assert rtts["127.0.0.3"] is None
+    # one deadline for all upstreams, not one each
+    assert DEADLINE <= elapsed < 2 * DEADLINE
+    assert all(stub.queries == 1 for stub in stubs.values())
+
+
+def test_posture_is_cached_until_resolv_conf_changes(resolvers):
+    port, stubs = resolvers(["answer", "answer"])
+    engine = engine_for(["127.0.0.1"], port)
+    first = engine.snapshot()
+    assert engine.snapshot() is first
+    assert stubs["127.0.0.1"].queries == 1
+    engine.system.files[RESOLV_CONF] = "nameserver 127.0.0.2\n"
+    second = engine.snapshot()
+    assert [u.address for u in second.upstreams] == ["127.0.0.2"]
+    assert second.upstreams[0].rtt_ms is not None
+
+
+def test_unreachable_port_reports_no_answer():
+    # nothing listens here: the ICMP error or the deadline ends the probe
+    posture = engine_for(["127.0.0.1"], _free_udp_port()).snapshot()
+    assert posture.upstreams[0].rtt_ms is None
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_fresh_reports_whether_a_probe_is_needed(resolvers):
+    port, stubs = resolvers(["answer"])
+    engine = engine_for(["127.0.0.1"], port)
+    assert not engine.fresh()
+    engine.snapshot()
+    assert engine.fresh()
+    assert stubs["127.0.0.1"].queries == 1
+    engine.system.files[RESOLV_CONF] = "nameserver 127.0.0.1\nnameserver 127.0.0.2\n"
+    assert not engine.fresh()
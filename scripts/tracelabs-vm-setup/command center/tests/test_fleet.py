@@ -0,0 +1,84 @@
+import time
+
+from hud_fleet import FleetCollector, FleetIndex, simulate_senders
+from hud_model import Status, threat_level
+
+CHECKS = [
+    ("vpn", "VPN", "Network"),
+    ("dns", "DNS", "Network"),
+    ("firewall", "Firewall", "System"),
+    ("webrtc", "WebRTC", "Privacy"),
+    ("history", "History", "Privacy"),
+]
+SENDERS = 8
+
+
+def wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_simulated_fleet_summary(tmp_path):
+    address = f"unix:{tmp_path / 'collector.sock'}"
+    index = FleetIndex()
+    collector = FleetCollector(address, index)
+    collector.start()
+    stop = simulate_senders(address, CHECKS, SENDERS, interval=0.02, seed=7)
+    try:
+        assert wait_for(lambda: len(index.hosts) == SENDERS
+                        and all(len(s.history) >= 3 for s in index.hosts.values()))
+    finally:
+        stop.set()
+        time.sleep(0.1)
+        collector.stop()
+
+    summary = index.summary()
+    assert index.rejected == 0
+    assert summary.stale == 0
+    assert sorted(h[0] for h in summary.hosts) == [f"sim-{n:03d}" for n in range(SENDERS)]
+
+    # worst score first, then most red checks, then host name
+    expected = []
+    for state in index.hosts.values():
+        red = sum(c.status == Status.RED for c in state.checks)
+        expected.append((state.host, state.score, state.threat, red, False))
+    expected.sort(key=lambda h: (h[1], -h[3], h[0]))
+    assert summary.hosts == expected
+
+    # every host reports every check exactly once
+    assert sorted(c[0] for c in summary.checks) == sorted(name for _, name, _ in CHECKS)
+    for name, green, yellow, red in summary.checks:
+        assert green + yellow + red == SENDERS
+        assert red == sum(
+            1 for s in index.hosts.values() for c in s.checks if c.name == name and c.status == Status.RED
+        )
+    reds = [c[3] for c in summary.checks]
+    assert reds == sorted(reds, reverse=True)
+
+    threats = [threat_level(h[1]) for h in summary.hosts]
+    assert summary.stats.total_checks == SENDERS
+    assert summary.stats.green_count == threats.count("SECURE")
+    assert summary.stats.yellow_count == threats.count("CAUTION")
+    assert summary.stats.red_count == threats.count("COMPROMISED")
+    assert summary.stats.threat_level == threat_level(summary.hosts[0][1])
+
+
+def test_malformed_lines_are_rejected():
+    index = FleetIndex()
+    assert not index.ingest_line(b"not json")
+    assert not index.ingest_line(b'{"host": "a"}')
+    assert index.ingest_line(b'{"host": "a", "score": 90, "checks": []}')
+    assert index.rejected == 2
+    assert index.summary().hosts == [("a", 90, "SECURE", 0, False)]
+
+
+def test_varying_details_do_not_grow_the_intern_table():
+    index = FleetIndex()
+    for n in range(500):
+        check = {"id": "dns", "name": "DNS", "section": "Network", "status": "green", "detail": f"Via tun0 {n}ms"}
+        index.ingest({"host": f"h{n % 5}", "score": 90, "checks": [check]})
+    assert len(index._strings) == 3 + 5
@@ -0,0 +1,65 @@
+from hud_model import Status
+from hud_sampling import ResourceSampler, ThroughputSampler, format_rate, resource_rows
+
+
+def set_counters(net, name, rx, tx):
+    stats = net / name / "statistics"
+    stats.mkdir(parents=True, exist_ok=True)
+    (stats / "rx_bytes").write_text(f"{rx}\n")
+    (stats / "tx_bytes").write_text(f"{tx}\n")
+
+
+def test_stalled_tunnel_and_bypass(tmp_path):
+    net = tmp_path / "net"
+    (net / "eth0" / "device").mkdir(parents=True)
+    (net / "veth0").mkdir(parents=True)   # no device: not tracked
+    for name in ("eth0", "tun0", "veth0"):
+        set_counters(net, name, 0, 0)
+    sampler = ThroughputSampler(str(net), interval=5.0, history=8)
+    sampler.rescan()
+    assert sorted(sampler.ifaces) == ["eth0", "tun0"]
+    try:
+        for n in range(5):
+            # the tunnel only sends; eth0 moves 1 MB/s outside it
+            set_counters(net, "tun0", 0, 1000 * n)
+            set_counters(net, "eth0", 1_000_000 * n, 0)
+            sampler.sample(now=100.0 + n)
+        status = sampler.status()
+        assert status["stalled"] == ["tun0"]
+        assert status["bypass"] == "eth0"
+        rx, tx = sampler.series("eth0")
+        assert rx == [0.0, 1e6, 1e6, 1e6, 1e6] and tx == [0.0] * 5
+        assert sampler.graph_iface() == "tun0"
+    finally:
+        sampler.stop()
+        for c in sampler.ifaces.values():
+            c.close()
+
+
+def test_resource_snapshot_from_proc(tmp_path):
+    proc = tmp_path / "proc"
+    (proc / "pressure").mkdir(parents=True)
+    (proc / "meminfo").write_text(
+        "MemTotal:        4194304 kB\nMemFree:          100000 kB\nMemAvailable:     524288 kB\n"
+        "SwapTotal:       1048576 kB\nSwapFree:         1048576 kB\n")
+    (proc / "pressure" / "cpu").write_text("some avg10=12.50 avg60=3.00 avg300=1.00 total=1\n")
+    sampler = ResourceSampler(str(proc), disks=(str(tmp_path),))
+    try:
+        (proc / "stat").write_text("cpu  100 0 100 800 0 0 0 0 0 0\ncpu0 1 2 3\n")
+        assert sampler.snapshot()["cpu"] is None   # needs two samples
+        (proc / "stat").write_text("cpu  150 0 150 900 0 0 0 0 0 0\ncpu0 1 2 3\n")
+        state = sampler.snapshot()
+    finally:
+        sampler.close()
+    assert state["cpu"] == 50.0
+    assert state["mem_total"] == 4 << 30 and state["mem_available"] == 512 << 20
+    assert state["pressure"] == {"cpu": (12.5, 0.0)}
+    assert len(state["disks"]) == 1
+    rows = {label: (pct, status) for label, pct, _detail, status in resource_rows(state)}
+    assert rows["CPU"] == (50.0, Status.YELLOW)     # psi 12.5 is past PSI_WARN
+    assert rows["MEM"] == (87.5, Status.YELLOW)
+    assert rows["SWAP"] == (0.0, Status.GREEN)
+
+
+def test_format_rate():
+    assert [format_rate(r) for r in (512, 2_500, 25_000, 3_200_000, 4e9)] == ["512B", "2.5K", "25K", "3.2M", "4.0G"]
@@ -0,0 +1,133 @@
+import gzip
+import json
+import os
+
+import pytest
+
+from hud_dns import DNS_PROBE_DEADLINE, DNS_PROBE_NAME, RESOLV_CONF
+
+SCANS = 12
+WARMUP = 40
+CYCLES = 160
+
+ROUTES = "Iface\tDestination\tGateway \tFlags\tRefCnt\tUse\tMetric\tMask\t\tMTU\tWindow\tIRTT\n"
+ROUTE_ETH0 = "eth0\t00000000\t0202000A\t0003\t0\t0\t100\t00000000\t0\t0\t0\n"
+ROUTE_TUN0 = "tun0\t00000000\t0100080A\t0003\t0\t0\t50\t00000000\t0\t0\t0\n"
+
+
+def synthetic_scan(n: int) -> list:
+    """(op, args, status, result) of scan ``n`` on a VM whose VPN, firewall and public IP come and go."""
+    vpn = n % 3 != 2
+    nameserver = "10.8.0.1" if vpn else "10.0.2.3"
+    addresses = {"lo": ["127.0.0.1"], "eth0": ["10.0.2.15"]}
+    if vpn:
+        addresses["tun0"] = ["10.8.0.2"]
+    resources = {
+        "cpu": 5.0 * (n % 20), "mem_total": 4 << 30, "mem_available": (2 << 30) - n * (16 << 20),
+        "swap_total": 0, "swap_free": 0,
+        "pressure": {"cpu": [0.5 * n, 0.0], "memory": [0.0, 0.0], "io": [0.0, 0.0]},
+        "disks": [["/", 64 << 30, (32 << 30) - n * (1 << 20)]],
+    }
+    # the tunnel stalls on scan 4 and eth0 carries traffic around it on scan 7
+    flow = {
+        "samples": 10 * n,
+        "ifaces": {"eth0": {"rx": 2000, "tx": 800, "vpn": False},
+                   "tun0": {"rx": 1500, "tx": 600, "vpn": True}},
+        "stalled": ["tun0"] if n == 4 else [],
+        "bypass": "eth0" if n == 7 else None,
+        "excess": 250000 if n == 7 else 0,
+    }
+    tor = {"connected": False, "error": "[Errno 111] Connection refused",
+           "bootstrap": 0, "tag": "", "built": 0, "failures": 0}
+    scan = [
+        ("hostname", (), "ok", "tl-osint"),
+        ("call:home", ("~",), "ok", "/home/osint"),
+        ("stat", ("/sys/class/net",), "ok", (0o40755, 1, 0, n)),
+        ("listdir", ("/sys/class/net",), "ok", sorted(addresses)),
+        ("read", ("/proc/net/route",), "ok", ROUTES + (ROUTE_TUN0 if vpn else "") + ROUTE_ETH0),
+        ("call:ifaddrs_v4", (), "ok", addresses),
+        ("stat", (RESOLV_CONF,), "ok", (0o100644, 2, 30, n // 3)),
+        ("read", (RESOLV_CONF,), "ok", f"nameserver {nameserver}\n"),
+        ("call:dns_probe", ([nameserver], 53, DNS_PROBE_NAME, DNS_PROBE_DEADLINE),
+         "ok", [[nameserver, addresses["tun0" if vpn else "eth0"][0], 8.0 + n]]),
+        ("run", ("ufw status 2>/dev/null",), "ok", "Status: active" if n % 4 else "Status: inactive"),
+        ("call:public_ip", (5.0,), *(("ok", f"198.51.100.{n + 1}") if vpn
+                                     else ("err", "URLError: <urlopen error timed out>"))),
+        ("call:tor_state", (), "ok", tor),
+        ("call:resources", (), "ok", resources),
+    ]
+    if vpn:
+        scan += [
+            ("read", ("/sys/class/net/tun0/operstate",), "ok", "up\n"),
+            ("call:throughput", (), "ok", flow),
+        ]
+    return scan
+
+
+def write_archive(hud, path, scans: int = SCANS):
+    """Write ``scans`` synthetic scans as a ReplaySystem archive; other probes replay as misses."""
+    blobs, blob_ids, frames = [], {}, []
+    for n in range(scans):
+        ops = {}
+        for op, args, status, value in synthetic_scan(n):
+            encode = hud._ARCHIVE_CODECS.get(op, (lambda v: v, None))[0]
+            blob = json.dumps([status, encode(value) if status == "ok" else value], separators=(",", ":"))
+            idx = blob_ids.get(blob)
+            if idx is None:
+                idx = blob_ids[blob] = len(blobs)
+                blobs.append(blob)
+            ops[hud._op_key(op, args)] = idx
+        frames.append({"time": 1_700_000_000.0 + 5 * n, "clock": 100.0 + 5 * n, "ops": ops})
+    archive = {"version": hud.ARCHIVE_VERSION, "hud_version": hud.VERSION, "frames": frames, "blobs": blobs}
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(archive, f)
+    return str(path)
+
+
+@pytest.fixture
+def archive(hud, tmp_path):
+    return write_archive(hud, tmp_path / "synthetic.json.gz")
+
+
+def test_archive_replays(hud, archive):
+    system = hud.ReplaySystem(archive)
+    assert len(system) == SCANS
+    system.begin_scan()
+    assert system.hostname() == "tl-osint"
+    assert system.read(RESOLV_CONF) == "nameserver 10.8.0.1\n"
+
+
+def test_replayed_vpn_comes_and_goes(hud, archive):
+    scanner = hud.SecurityScanner(hud.ReplaySystem(archive))
+    details = []
+    try:
+        for _ in range(SCANS):
+            scanner.scan_local()
+            details += [c.detail for c in scanner.checks if c.name == "VPN Status"]
+    finally:
+        scanner.close()
+    assert details.count("tun0 UP") == 6
+    assert "tun0 UP, no replies" in details
+    assert any(d.startswith("tun0 UP, ") and d.endswith("/s via eth0") for d in details)
+    assert details.count("No VPN found") == 4
+
+
+def test_soak_stays_within_growth_limits(hud, archive):
+    # fails on growth in RSS, fds, threads or traced allocations
+    assert hud.soak(archive, CYCLES, report_every=CYCLES, warmup=WARMUP)
+
+
+def test_soak_catches_an_fd_leak(hud, archive, monkeypatch):
+    leaked = []
+    resource_rows = hud.resource_rows
+
+    def leaky_rows(state):
+        leaked.append(os.open(os.devnull, os.O_RDONLY))
+        return resource_rows(state)
+
+    monkeypatch.setattr(hud, "resource_rows", leaky_rows)
+    try:
+        assert not hud.soak(archive, WARMUP + 5, report_every=CYCLES, warmup=WARMUP)
+    finally:
+        for fd in leaked:
+            os.close(fd)
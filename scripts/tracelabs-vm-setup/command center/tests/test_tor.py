@@ -0,0 +1,129 @@
+import hashlib
+import hmac
+import os
+import socket
+import threading
+import time
+
+import pytest
+
+from hud_tor import TorMonitor
+
+SERVER_KEY = b"Tor safe cookie authentication server-to-controller hash"
+CONTROLLER_KEY = b"Tor safe cookie authentication controller-to-server hash"
+
+
+def wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+class StubControlPort:
+    """Answers a controller's PROTOCOLINFO / AUTHCHALLENGE / AUTHENTICATE the way Tor does."""
+
+    def __init__(self, path: str, cookie_file: str, cookie: bytes, methods: str, forge_hash: bool = False):
+        self.cookie_file = cookie_file
+        self.cookie = cookie
+        self.methods = methods
+        self.forge_hash = forge_hash
+        self.commands = []
+        self.authenticated = threading.Event()
+        self._client_nonce = self._server_nonce = b""
+        self._listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self._listener.bind(path)
+        self._listener.listen(4)
+        threading.Thread(target=self._serve, daemon=True).start()
+
+    def close(self):
+        self._listener.close()
+
+    def _serve(self):
+        while True:
+            try:
+                conn, _ = self._listener.accept()
+            except OSError:
+                return
+            with conn, conn.makefile("rwb", buffering=0) as f:
+                for raw in f:
+                    reply = self._handle(raw.decode().strip())
+                    f.write(reply.encode())
+
+    def _handle(self, line: str) -> str:
+        self.commands.append(line)
+        command, _, arg = line.partition(" ")
+        if command == "PROTOCOLINFO":
+            return (f'250-PROTOCOLINFO 1\r\n250-AUTH METHODS={self.methods} COOKIEFILE="{self.cookie_file}"\r\n'
+                    '250-VERSION Tor="0.4.8.9"\r\n250 OK\r\n')
+        if command == "AUTHCHALLENGE":
+            self._client_nonce = bytes.fromhex(arg.split()[1])
+            self._server_nonce = os.urandom(32)
+            server_hash = hmac.new(SERVER_KEY, self.cookie + self._client_nonce + self._server_nonce,
+                                   hashlib.sha256).hexdigest()
+            if self.forge_hash:
+                server_hash = "00" * 32
+            return f"250 AUTHCHALLENGE SERVERHASH={server_hash} SERVERNONCE={self._server_nonce.hex()}\r\n"
+        if command == "AUTHENTICATE":
+            if self._client_nonce:
+                expected = hmac.new(CONTROLLER_KEY, self.cookie + self._client_nonce + self._server_nonce,
+                                    hashlib.sha256).hexdigest()
+            else:
+                expected = self.cookie.hex()
+            if arg.lower() != expected:
+                return "515 Authentication failed\r\n"
+            self.authenticated.set()
+            return "250 OK\r\n"
+        if line == "GETINFO status/bootstrap-phase":
+            return ('250-status/bootstrap-phase=NOTICE BOOTSTRAP PROGRESS=100 TAG=done SUMMARY="Done"\r\n'
+                    "250 OK\r\n")
+        if line == "GETINFO circuit-status":
+            return "250+circuit-status=\r\n1 BUILT\r\n2 EXTENDED\r\n.\r\n250 OK\r\n"
+        return "250 OK\r\n"
+
+
+@pytest.fixture
+def control_port(tmp_path):
+    cookie = os.urandom(32)
+    cookie_file = tmp_path / "control_auth_cookie"
+    cookie_file.write_bytes(cookie)
+    stubs = []
+
+    def start(methods: str, forge_hash: bool = False):
+        path = str(tmp_path / f"control-{len(stubs)}")
+        stubs.append(StubControlPort(path, str(cookie_file), cookie, methods, forge_hash))
+        monitor = TorMonitor(f"unix:{path}")
+        monitor.start()
+        stubs[-1].monitor = monitor
+        return stubs[-1], monitor
+
+    yield start
+    for stub in stubs:
+        stub.monitor.stop()
+        stub.close()
+
+
+def test_safecookie_is_preferred_over_cookie(control_port):
+    stub, monitor = control_port("COOKIE,SAFECOOKIE")
+    assert wait_for(lambda: monitor.connected)
+    assert stub.authenticated.is_set()
+    assert stub.commands[1].startswith("AUTHCHALLENGE SAFECOOKIE ")
+    # the cookie itself never crosses the socket
+    assert not any(stub.cookie.hex() in c.lower() for c in stub.commands)
+    snapshot = monitor.snapshot()
+    assert (snapshot["bootstrap"], snapshot["tag"], snapshot["built"]) == (100, "done", 1)
+
+
+def test_cookie_only_when_safecookie_is_not_offered(control_port):
+    stub, monitor = control_port("COOKIE")
+    assert wait_for(lambda: monitor.connected)
+    assert stub.commands[1] == "AUTHENTICATE " + stub.cookie.hex()
+
+
+def test_forged_server_hash_is_refused(control_port):
+    stub, monitor = control_port("SAFECOOKIE", forge_hash=True)
+    assert wait_for(lambda: "SAFECOOKIE server check" in monitor.error)
+    assert not monitor.connected
+    assert not any(c.startswith("AUTHENTICATE") for c in stub.commands)
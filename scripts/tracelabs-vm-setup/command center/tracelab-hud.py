@@ -6,24 +6,52 @@ Powered by HowsMyPrivacy.
 Compact rectangle when collapsed, comprehensive security dashboard when expanded.
 """
 
+import argparse
+import base64
+import fcntl
+import gzip
+import http.server
+import importlib.util
+import ipaddress
+import json
 import math
 import os
 import re
+import shutil
+import signal
 import socket
+import socketserver
+import sqlite3
+import stat
+import struct
 import subprocess
+import sys
 import threading
 import time
-from dataclasses import dataclass
+import tracemalloc
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import astuple, dataclass, field
 from datetime import datetime
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
 
 import gi
 gi.require_version("Gtk", "4.0")
 gi.require_version("Gdk", "4.0")
-from gi.repository import Gdk, GLib, Gtk
+from gi.repository import Gdk, Gio, GLib, Gtk
 
 import cairo
 
+from hud_dns import DnsPostureEngine
+from hud_fleet import (FLEET_ENV, FLEET_REFRESH_MS, FleetCollector, FleetIndex, FleetSummary,
+                       PostureStreamer, parse_address, posture_record, simulate_senders)
+from hud_model import HUDStats, ResultHistory, SecurityCheck, Section, Status, threat_level
+from hud_sampling import (THROUGHPUT_HISTORY, VPN_IFACE_PREFIXES, ResourceSampler, ThroughputSampler,
+                          format_rate, resource_rows)
+from hud_tor import TOR_FAILURE_WARN, TorMonitor
+
 
 # ---------------------------------------------------------------------------
 # Version
@@ -32,54 +60,1714 @@ VERSION = "2.0.0"
 POWERED_BY = "HowsMyPrivacy"
 
 
-# ---------------------------------------------------------------------------
-# Data model
-# ---------------------------------------------------------------------------
+# ---------------------------------------------------------------------------
+# Trace Labs Cyberpunk Color Palette (Enhanced)
+# ---------------------------------------------------------------------------
+
+COLORS = {
+    "bg_dark":      (0x0a / 255, 0x0a / 255, 0x0a / 255),    # Pure black
+    "bg_panel":     (0x15 / 255, 0x15 / 255, 0x15 / 255),    # Dark panel
+    "accent":       (0x00 / 255, 0xff / 255, 0xd9 / 255),    # Trace Labs cyan/teal
+    "accent_bright": (0x00 / 255, 0xff / 255, 0xff / 255),   # Bright cyan
+    "green":        (0x00 / 255, 0xff / 255, 0x41 / 255),    # Matrix green
+    "yellow":       (0xfc / 255, 0xc8 / 255, 0x00 / 255),    # Warning yellow
+    "red":          (0xff / 255, 0x00 / 255, 0x40 / 255),    # Alert red
+    "dim":          (0.40, 0.40, 0.35),
+    "text":         (0.85, 0.85, 0.80),
+    "text_bright":  (0.95, 0.95, 0.90),
+    "grid":         (0.15, 0.25, 0.25),
+}
+
+# Indexed by Status
+STATUS_COLORS = (
+    COLORS["green"],
+    COLORS["yellow"],
+    COLORS["red"],
+)
+
+# Score contribution of each Status (indexed by Status)
+STATUS_SCORES = (100, 50, 0)
+
+
+# ---------------------------------------------------------------------------
+# System access backends (live / record / replay)
+# ---------------------------------------------------------------------------
+
+ARCHIVE_VERSION = 1
+
+
+class StatRecord(NamedTuple):
+    """The part of ``os.stat_result`` the scanner uses (replayable)."""
+    st_mode: int
+    st_ino: int
+    st_size: int
+    st_mtime_ns: int
+
+    @property
+    def st_mtime(self) -> float:
+        return self.st_mtime_ns / 1e9
+
+
+class DirEntryRecord(NamedTuple):
+    name: str
+    path: str
+    is_dir: bool   # not following symlinks
+    is_file: bool
+
+
+class LiveSystem:
+    """Every file read, directory listing and command the scanner performs.
+
+    Checks and auditors go through this object instead of calling ``open``,
+    ``os.*`` or ``subprocess`` directly, so a scan can be recorded
+    (RecordingSystem) and replayed bit-for-bit (ReplaySystem).
+    """
+
+    live = True
+
+    def begin_scan(self):
+        """Mark the start of a local scan pass."""
+
+    def clock(self) -> Optional[float]:
+        """Monotonic time for check intervals; None means the real clock."""
+        return None
+
+    def checkpoint(self):
+        pass
+
+    def stat(self, path: str) -> Optional[StatRecord]:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return StatRecord(st.st_mode, st.st_ino, st.st_size, st.st_mtime_ns)
+
+    def read(self, path: str) -> Optional[str]:
+        try:
+            with open(path, errors="replace") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def read_bytes(self, path: str, offset: int = 0, size: int = -1) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                if offset:
+                    f.seek(offset)
+                return f.read(size)
+        except OSError:
+            return None
+
+    def listdir(self, path: str) -> List[str]:
+        return os.listdir(path)
+
+    def scandir(self, path: str) -> List[DirEntryRecord]:
+        with os.scandir(path) as it:
+            return [DirEntryRecord(e.name, e.path, e.is_dir(follow_symlinks=False), e.is_file()) for e in it]
+
+    def run(self, cmd: str, timeout: float = 5,
+            generation: Optional["ScanGeneration"] = None) -> Optional[str]:
+        if generation is None:
+            try:
+                r = subprocess.run(
+                    cmd, shell=True, capture_output=True, text=True, timeout=timeout
+                )
+                return r.stdout.strip()
+            except Exception:
+                return None
+        # own process group, so cancelling the scan also kills the shell's children
+        try:
+            proc = subprocess.Popen(
+                cmd, shell=True, stdin=subprocess.DEVNULL, stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL, text=True, start_new_session=True,
+            )
+        except OSError:
+            return None
+        if not generation.track(proc):
+            return None
+        try:
+            out, _ = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill_group(proc)
+            proc.communicate()
+            return None
+        finally:
+            generation.untrack(proc)
+        if generation.cancelled:
+            return None
+        return out.strip()
+
+    def which(self, name: str) -> Optional[str]:
+        return shutil.which(name)
+
+    def hostname(self) -> str:
+        return socket.gethostname()
+
+    def call(self, name: str, func: Callable, *args) -> Any:
+        """Any other probe (sockets, ioctls, sqlite); result must be JSON-serializable."""
+        return func(*args)
+
+
+def _op_key(op: str, args: tuple) -> str:
+    return op + "\0" + json.dumps(args, separators=(",", ":"))
+
+
+# (encode for the archive, decode on replay) for results that are not plain JSON
+_ARCHIVE_CODECS = {
+    "stat": (lambda v: list(v) if v is not None else None,
+             lambda v: StatRecord(*v) if v is not None else None),
+    "read_bytes": (lambda v: base64.b64encode(v).decode() if v is not None else None,
+                   lambda v: base64.b64decode(v) if v is not None else None),
+    "scandir": (lambda v: [list(e) for e in v],
+                lambda v: [DirEntryRecord(*e) for e in v]),
+}
+
+
+class RecordingSystem(LiveSystem):
+    """LiveSystem that also stores every result, one frame per scan.
+
+    The archive is gzip-compressed JSON; identical results (e.g. a config
+    file that did not change between scans) are stored once in a blob table.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.frames: List[Dict[str, Any]] = []
+        self._frame: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def begin_scan(self):
+        with self._lock:
+            self._frame = {}
+            self.frames.append({"time": time.time(), "clock": time.monotonic(), "ops": self._frame})
+
+    def _capture(self, op: str, args: tuple, func: Callable) -> Any:
+        encode = _ARCHIVE_CODECS.get(op, (lambda v: v, None))[0]
+        try:
+            value = func()
+        except Exception as e:
+            entry = ["err", f"{type(e).__name__}: {e}"]
+            raise
+        else:
+            entry = ["ok", encode(value)]
+            return value
+        finally:
+            with self._lock:
+                self._frame.setdefault(_op_key(op, args), entry)
+
+    def stat(self, path):
+        return self._capture("stat", (path,), lambda: super(RecordingSystem, self).stat(path))
+
+    def read(self, path):
+        return self._capture("read", (path,), lambda: super(RecordingSystem, self).read(path))
+
+    def read_bytes(self, path, offset=0, size=-1):
+        return self._capture("read_bytes", (path, offset, size),
+                             lambda: super(RecordingSystem, self).read_bytes(path, offset, size))
+
+    def listdir(self, path):
+        return self._capture("listdir", (path,), lambda: super(RecordingSystem, self).listdir(path))
+
+    def scandir(self, path):
+        return self._capture("scandir", (path,), lambda: super(RecordingSystem, self).scandir(path))
+
+    def run(self, cmd, timeout=5, generation=None):
+        return self._capture("run", (cmd,), lambda: super(RecordingSystem, self).run(cmd, timeout, generation))
+
+    def which(self, name):
+        return self._capture("which", (name,), lambda: super(RecordingSystem, self).which(name))
+
+    def hostname(self):
+        return self._capture("hostname", (), lambda: super(RecordingSystem, self).hostname())
+
+    def call(self, name, func, *args):
+        return self._capture("call:" + name, args, lambda: func(*args))
+
+    def checkpoint(self):
+        """Write the archive (atomically) with everything recorded so far."""
+        blobs: List[str] = []
+        blob_ids: Dict[str, int] = {}
+        frames = []
+        with self._lock:
+            for frame in self.frames:
+                ops = {}
+                for key, entry in frame["ops"].items():
+                    blob = json.dumps(entry, separators=(",", ":"))
+                    idx = blob_ids.get(blob)
+                    if idx is None:
+                        idx = blob_ids[blob] = len(blobs)
+                        blobs.append(blob)
+                    ops[key] = idx
+                frames.append({"time": frame["time"], "clock": frame["clock"], "ops": ops})
+        archive = {"version": ARCHIVE_VERSION, "hud_version": VERSION, "frames": frames, "blobs": blobs}
+        tmp = self.path + ".tmp"
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(archive, f, separators=(",", ":"))
+        os.replace(tmp, self.path)
+
+
+class ReplaySystem(LiveSystem):
+    """Serves a recorded archive frame by frame, at full speed.
+
+    Each ``begin_scan`` advances one frame (the last frame repeats, or the
+    session restarts with ``loop``).  A probe the recorded scan answered from
+    a cache is served from the latest earlier frame that made it; lookups
+    the recording never made count as ``misses`` and behave like a missing
+    file or failed command.
+    """
+
+    live = False
+
+    def __init__(self, path: str, loop: bool = False):
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            archive = json.load(f)
+        if archive.get("version") != ARCHIVE_VERSION:
+            raise ValueError(f"unsupported archive version {archive.get('version')}")
+        self.path = path
+        self.loop = loop
+        self.frames = archive["frames"]
+        # decoded per lookup: callers may mutate what they get back
+        self._blobs: List[str] = archive["blobs"]
+        self.index = -1
+        self.misses = 0
+        if not self.frames:
+            raise ValueError("archive contains no scans")
+
+    def __len__(self) -> int:
+        return len(self.frames)
+
+    def begin_scan(self):
+        if self.index + 1 < len(self.frames):
+            self.index += 1
+        elif self.loop:
+            self.index = 0
+
+    def clock(self) -> float:
+        return self.frames[max(self.index, 0)]["clock"]
+
+    def _lookup(self, op: str, args: tuple, default: Any) -> Any:
+        key = _op_key(op, args)
+        idx = None
+        for i in range(max(self.index, 0), -1, -1):
+            idx = self.frames[i]["ops"].get(key)
+            if idx is not None:
+                break
+        if idx is None:
+            self.misses += 1
+            if isinstance(default, BaseException):
+                raise default
+            return default
+        status, value = json.loads(self._blobs[idx])
+        if status == "err":
+            raise OSError(value)
+        codec = _ARCHIVE_CODECS.get(op)
+        return codec[1](value) if codec else value
+
+    def stat(self, path):
+        return self._lookup("stat", (path,), None)
+
+    def read(self, path):
+        return self._lookup("read", (path,), None)
+
+    def read_bytes(self, path, offset=0, size=-1):
+        return self._lookup("read_bytes", (path, offset, size), None)
+
+    def listdir(self, path):
+        return self._lookup("listdir", (path,), FileNotFoundError(path))
+
+    def scandir(self, path):
+        return self._lookup("scandir", (path,), FileNotFoundError(path))
+
+    def run(self, cmd, timeout=5, generation=None):
+        return self._lookup("run", (cmd,), None)
+
+    def which(self, name):
+        return self._lookup("which", (name,), None)
+
+    def hostname(self):
+        return self._lookup("hostname", (), "replay")
+
+    def call(self, name, func, *args):
+        return self._lookup("call:" + name, args, OSError(f"{name} not recorded"))
+
+
+# ---------------------------------------------------------------------------
+# File probe cache
+# ---------------------------------------------------------------------------
+
+class FileProbeCache:
+    """LRU cache of small config files, keyed by inode, mtime and size.
+
+    An unchanged file costs a single ``stat()``; content is only re-read
+    (and parsers only re-run) when the (path, st_ino, st_mtime_ns, st_size)
+    key changes.  Pseudo-filesystems (/proc, /sys) do not maintain a
+    meaningful mtime, so those paths are always read directly.  Checks run
+    on worker threads, so lookups are serialized by a lock.
+    """
+
+    UNCACHED_PREFIXES = ("/proc/", "/sys/", "/dev/")
+
+    def __init__(self, maxsize: int = 64, system: Optional[LiveSystem] = None):
+        self.maxsize = maxsize
+        self.system = system or LiveSystem()
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.RLock()
+        # path -> (key, content, {parser: parsed result})
+        self._entries: "OrderedDict[str, Tuple[tuple, str, Dict[Callable, Any]]]" = OrderedDict()
+
+    def stat(self, path: str) -> Optional[StatRecord]:
+        return self.system.stat(path)
+
+    @staticmethod
+    def _key(path: str, st: StatRecord) -> tuple:
+        return (path, st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _entry(self, path: str):
+        with self._lock:
+            return self._lookup(path)
+
+    def _lookup(self, path: str):
+        st = self.stat(path)
+        if st is None or not stat.S_ISREG(st.st_mode):
+            self._entries.pop(path, None)
+            return None
+        key = self._key(path, st)
+        entry = self._entries.get(path)
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            self._entries.move_to_end(path)
+            return entry
+        self.misses += 1
+        content = self.system.read(path)
+        if content is None:
+            self._entries.pop(path, None)
+            return None
+        entry = (key, content, {})
+        self._entries[path] = entry
+        self._entries.move_to_end(path)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def read(self, path: str) -> Optional[str]:
+        if path.startswith(self.UNCACHED_PREFIXES):
+            return self.system.read(path)
+        entry = self._entry(path)
+        return entry[1] if entry else None
+
+    def parsed(self, path: str, parser: Callable[[str], Any]) -> Any:
+        """Return ``parser(content)``, memoized alongside the raw content."""
+        if path.startswith(self.UNCACHED_PREFIXES):
+            content = self.read(path)
+            return parser(content) if content is not None else None
+        with self._lock:
+            entry = self._lookup(path)
+            if entry is None:
+                return None
+            results = entry[2]
+            if parser not in results:
+                results[parser] = parser(entry[1])
+            return results[parser]
+
+    def counters(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+
+# ---------------------------------------------------------------------------
+# Browser privacy audit
+# ---------------------------------------------------------------------------
+
+FIREFOX_POLICY_FILES = (
+    "/etc/firefox/policies/policies.json",
+    "/etc/firefox-esr/policies/policies.json",
+    "/usr/lib/firefox-esr/distribution/policies.json",
+    "/usr/lib/firefox/distribution/policies.json",
+    "/usr/share/firefox-esr/distribution/policies.json",
+)
+
+CHROMIUM_POLICY_DIRS = {
+    "chromium": ("/etc/chromium/policies/managed", "/etc/chromium/policies/recommended"),
+    "google-chrome": ("/etc/opt/chrome/policies/managed", "/etc/opt/chrome/policies/recommended"),
+}
+
+FIREFOX_PREF_RE = re.compile(r'user_pref\("([^"]+)",\s*(.+?)\);\s*$', re.MULTILINE)
+
+FIREFOX_AUDIT_PREFS = {
+    "media.peerconnection.enabled",
+    "media.peerconnection.ice.default_address_only",
+    "media.peerconnection.ice.no_host",
+    "toolkit.telemetry.enabled",
+    "toolkit.telemetry.unified",
+    "datareporting.healthreport.uploadEnabled",
+    "datareporting.policy.dataSubmissionEnabled",
+    "network.cookie.cookieBehavior",
+    "network.cookie.lifetimePolicy",
+    "privacy.sanitize.sanitizeOnShutdown",
+    "privacy.clearOnShutdown.cookies",
+}
+
+CHROMIUM_SAFE_WEBRTC = {"disable_non_proxied_udp", "default_public_interface_only"}
+
+TRAILING_COMMA_RE = re.compile(r",(\s*[}\]])")
+
+# History/cookie DB row counts above which a profile is flagged as carrying data
+BROWSER_HISTORY_ROWS_WARN = 500
+BROWSER_COOKIE_ROWS_WARN = 200
+
+
+def _parse_json_lenient(text: str) -> Dict[str, Any]:
+    """Parse JSON, tolerating the trailing commas hand-edited policy files pick up."""
+    try:
+        data = json.loads(text)
+    except ValueError:
+        try:
+            data = json.loads(TRAILING_COMMA_RE.sub(r"\1", text))
+        except ValueError:
+            return {}
+    return data if isinstance(data, dict) else {}
+
+
+def _parse_firefox_policies(text: str) -> Dict[str, Any]:
+    return _parse_json_lenient(text).get("policies", {})
+
+
+def _parse_firefox_prefs(text: str) -> Dict[str, Any]:
+    prefs = {}
+    for name, raw in FIREFOX_PREF_RE.findall(text):
+        if name not in FIREFOX_AUDIT_PREFS:
+            continue
+        try:
+            prefs[name] = json.loads(raw)
+        except ValueError:
+            prefs[name] = raw
+    return prefs
+
+
+def _dig(data: Dict[str, Any], dotted: str, default=None):
+    for part in dotted.split("."):
+        if not isinstance(data, dict) or part not in data:
+            return default
+        data = data[part]
+    return data
+
+
+def _sqlite_rows(path: str, table: str) -> Optional[int]:
+    """Count rows via a read-only, immutable open (no locks, safe while the browser runs)."""
+    try:
+        uri = "file:" + urllib.parse.quote(path) + "?mode=ro&immutable=1"
+        conn = sqlite3.connect(uri, uri=True, timeout=0.2)
+        try:
+            return conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        finally:
+            conn.close()
+    except Exception:
+        return None
+
+
+@dataclass
+class BrowserProfileAudit:
+    browser: str
+    profile: str
+    webrtc_leak: bool = False
+    telemetry: bool = False
+    third_party_cookies: bool = False
+    history_rows: Optional[int] = None
+    cookie_rows: Optional[int] = None
+    db_bytes: int = 0
+
+
+class BrowserPrivacyAuditor:
+    """Audits Firefox and Chromium-family profiles for WebRTC, telemetry and cookie leaks.
+
+    Each profile result is cached against the (mtime_ns, size) of every file it
+    was derived from, plus the effective policy set, so an unchanged profile
+    costs a handful of ``stat()`` calls per scan.
+    """
+
+    CHROMIUM_ROOTS = (
+        ("google-chrome", ".config/google-chrome"),
+        ("chromium", ".config/chromium"),
+    )
+
+    def __init__(self, probe_cache: FileProbeCache):
+        self.probe_cache = probe_cache
+        self.system = probe_cache.system
+        self._profiles: Dict[str, Tuple[tuple, BrowserProfileAudit]] = {}
+        self._listings: Dict[str, Tuple[int, List[str]]] = {}
+
+    def _sig(self, path: str) -> Tuple[int, int]:
+        st = self.system.stat(path)
+        return (st.st_mtime_ns, st.st_size) if st is not None else (0, -1)
+
+    def _list_dirs(self, root: str) -> List[str]:
+        """Subdirectories of ``root``, re-listed only when its mtime changes."""
+        st = self.system.stat(root)
+        if st is None:
+            self._listings.pop(root, None)
+            return []
+        mtime = st.st_mtime_ns
+        cached = self._listings.get(root)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        try:
+            dirs = sorted(e.path for e in self.system.scandir(root) if e.is_dir)
+        except OSError:
+            dirs = []
+        self._listings[root] = (mtime, dirs)
+        return dirs
+
+    def _cached(self, profile: str, key: tuple, build: Callable[[], BrowserProfileAudit]) -> BrowserProfileAudit:
+        hit = self._profiles.get(profile)
+        if hit and hit[0] == key:
+            return hit[1]
+        audit = build()
+        self._profiles[profile] = (key, audit)
+        return audit
+
+    # -- firefox ----------------------------------------------------------
+
+    def _firefox_policies(self) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for path in FIREFOX_POLICY_FILES:
+            policies = self.probe_cache.parsed(path, _parse_firefox_policies)
+            if policies:
+                for name, value in policies.items():
+                    merged.setdefault(name, value)
+        return merged
+
+    def _audit_firefox(self, profile: str, policies: Dict[str, Any], policy_sig: int) -> BrowserProfileAudit:
+        prefs_js = os.path.join(profile, "prefs.js")
+        places = os.path.join(profile, "places.sqlite")
+        cookies = os.path.join(profile, "cookies.sqlite")
+        key = (policy_sig,) + tuple(
+            self._sig(p) for p in (prefs_js, places, places + "-wal", cookies, cookies + "-wal")
+        )
+
+        def build() -> BrowserProfileAudit:
+            text = self.system.read(prefs_js)
+            prefs = _parse_firefox_prefs(text) if text is not None else {}
+            policy_prefs = policies.get("Preferences", {})
+
+            def pref(name, default):
+                if name in prefs:
+                    return prefs[name]
+                value = policy_prefs.get(name, default)
+                return value.get("Value", default) if isinstance(value, dict) else value
+
+            audit = BrowserProfileAudit("firefox", os.path.basename(profile))
+            audit.webrtc_leak = bool(pref("media.peerconnection.enabled", True)) and not (
+                pref("media.peerconnection.ice.default_address_only", False)
+                or pref("media.peerconnection.ice.no_host", False)
+            )
+            audit.telemetry = not policies.get("DisableTelemetry", False) and bool(
+                pref("datareporting.healthreport.uploadEnabled", True)
+                or pref("toolkit.telemetry.enabled", False)
+            )
+            cookie_policy = policies.get("Cookies", {})
+            sanitized = (
+                policies.get("SanitizeOnShutdown") is True
+                or pref("network.cookie.lifetimePolicy", 0) == 2
+                or (pref("privacy.sanitize.sanitizeOnShutdown", False)
+                    and pref("privacy.clearOnShutdown.cookies", True))
+            )
+            behavior = pref("network.cookie.cookieBehavior", 5)
+            audit.third_party_cookies = (
+                behavior == 0 and not cookie_policy.get("RejectTracker") and not sanitized
+            )
+            audit.history_rows = self.system.call("sqlite_rows", _sqlite_rows, places, "moz_places")
+            audit.cookie_rows = self.system.call("sqlite_rows", _sqlite_rows, cookies, "moz_cookies")
+            audit.db_bytes = sum(max(self._sig(p)[1], 0) for p in (places, cookies))
+            return audit
+
+        return self._cached(profile, key, build)
+
+    # -- chromium family ----------------------------------------------------
+
+    def _chromium_policies(self, browser: str) -> Dict[str, Any]:
+        merged: Dict[str, Any] = {}
+        for policy_dir in CHROMIUM_POLICY_DIRS.get(browser, ()):
+            for path in self._list_files(policy_dir, ".json"):
+                for name, value in (self.probe_cache.parsed(path, _parse_json_lenient) or {}).items():
+                    merged.setdefault(name, value)
+        return merged
+
+    def _list_files(self, root: str, suffix: str) -> List[str]:
+        try:
+            return sorted(e.path for e in self.system.scandir(root) if e.name.endswith(suffix) and e.is_file)
+        except OSError:
+            return []
+
+    def _audit_chromium(self, browser: str, profile: str, local_state: Dict[str, Any],
+                        policies: Dict[str, Any], policy_sig: int) -> BrowserProfileAudit:
+        prefs_path = os.path.join(profile, "Preferences")
+        history = os.path.join(profile, "History")
+        cookies = os.path.join(profile, "Network", "Cookies")
+        if self.system.stat(cookies) is None:
+            cookies = os.path.join(profile, "Cookies")
+        key = (policy_sig, bool(_dig(local_state, "user_experience_metrics.reporting_enabled"))) + tuple(
+            self._sig(p) for p in (prefs_path, history, history + "-wal", cookies, cookies + "-wal")
+        )
+
+        def build() -> BrowserProfileAudit:
+            text = self.system.read(prefs_path)
+            prefs = _parse_json_lenient(text) if text is not None else {}
+            audit = BrowserProfileAudit(browser, os.path.basename(profile))
+            webrtc = policies.get("WebRtcIPHandling") or _dig(prefs, "webrtc.ip_handling_policy", "default")
+            audit.webrtc_leak = webrtc not in CHROMIUM_SAFE_WEBRTC
+            metrics = policies.get("MetricsReportingEnabled")
+            if metrics is None:
+                metrics = bool(_dig(local_state, "user_experience_metrics.reporting_enabled", False))
+            audit.telemetry = bool(metrics)
+            blocked = policies.get("BlockThirdPartyCookies")
+            if blocked is None:
+                blocked = (
+                    bool(_dig(prefs, "profile.block_third_party_cookies", False))
+                    or _dig(prefs, "profile.cookie_controls_mode", 0) == 1
+                )
+            cleared = policies.get("ClearSiteDataOnExit") or \
+                _dig(prefs, "profile.default_content_setting_values.cookies") == 4
+            audit.third_party_cookies = not blocked and not cleared
+            audit.history_rows = self.system.call("sqlite_rows", _sqlite_rows, history, "urls")
+            audit.cookie_rows = self.system.call("sqlite_rows", _sqlite_rows, cookies, "cookies")
+            audit.db_bytes = sum(max(self._sig(p)[1], 0) for p in (history, cookies))
+            return audit
+
+        return self._cached(profile, key, build)
+
+    # -- entry point --------------------------------------------------------
+
+    def audit(self, home: str) -> List[BrowserProfileAudit]:
+        results: List[BrowserProfileAudit] = []
+        seen = set()
+
+        ff_root = os.path.join(home, ".mozilla/firefox")
+        ff_dirs = self._list_dirs(ff_root)
+        if ff_dirs:
+            policies = self._firefox_policies()
+            policy_sig = hash(json.dumps(policies, sort_keys=True, default=str))
+            for profile in ff_dirs:
+                st = self.system.stat(os.path.join(profile, "prefs.js"))
+                if st is not None and stat.S_ISREG(st.st_mode):
+                    seen.add(profile)
+                    results.append(self._audit_firefox(profile, policies, policy_sig))
+
+        for browser, rel in self.CHROMIUM_ROOTS:
+            root = os.path.join(home, rel)
+            dirs = self._list_dirs(root)
+            if not dirs:
+                continue
+            local_state = self.probe_cache.parsed(os.path.join(root, "Local State"), _parse_json_lenient) or {}
+            policies = self._chromium_policies(browser)
+            policy_sig = hash(json.dumps(policies, sort_keys=True, default=str))
+            for profile in dirs:
+                name = os.path.basename(profile)
+                if name == "Default" or name.startswith("Profile "):
+                    seen.add(profile)
+                    results.append(self._audit_chromium(browser, profile, local_state, policies, policy_sig))
+
+        for stale in set(self._profiles) - seen:
+            del self._profiles[stale]
+        return results
+
+
+# ---------------------------------------------------------------------------
+# Routing-aware egress / leak engine
+# ---------------------------------------------------------------------------
+
+# rtnetlink multicast groups whose messages invalidate the egress snapshot
+RTMGRP_LINK = 0x1
+RTMGRP_IPV4_IFADDR = 0x10
+RTMGRP_IPV4_ROUTE = 0x40
+RTMGRP_IPV6_IFADDR = 0x100
+RTMGRP_IPV6_ROUTE = 0x400
+
+SIOCGIFADDR = 0x8915
+RTF_UP = 0x0001
+RTF_REJECT = 0x0200
+
+# Destinations whose route lookup tells us where "the internet" egresses.
+# Two probes catch OpenVPN/WireGuard style 0.0.0.0/1 + 128.0.0.0/1 splits.
+EGRESS_PROBES_V4 = ("1.1.1.1", "149.112.112.112")
+EGRESS_PROBE_V6 = "2606:4700:4700::1111"
+
+
+class PrefixSet:
+    """Precompiled set of IP networks with O(#prefix lengths) membership tests."""
+
+    def __init__(self, networks):
+        self._by_len: Dict[int, Dict[int, set]] = {}
+        for net in networks:
+            net = ipaddress.ip_network(net)
+            self._by_len.setdefault(net.version, {}).setdefault(net.prefixlen, set()).add(
+                int(net.network_address)
+            )
+        self._masks = {
+            version: [(plen, ((1 << bits) - 1) ^ ((1 << (bits - plen)) - 1), nets)
+                      for plen, nets in sorted(lens.items())]
+            for version, lens in self._by_len.items()
+            for bits in [32 if version == 4 else 128]
+        }
+
+    def __contains__(self, addr) -> bool:
+        addr = ipaddress.ip_address(addr)
+        value = int(addr)
+        for _plen, mask, nets in self._masks.get(addr.version, ()):
+            if value & mask in nets:
+                return True
+        return False
+
+
+NON_PUBLIC_NETS = PrefixSet([
+    "0.0.0.0/8", "10.0.0.0/8", "100.64.0.0/10", "127.0.0.0/8", "169.254.0.0/16",
+    "172.16.0.0/12", "192.168.0.0/16", "198.18.0.0/15",
+    "::1/128", "fc00::/7", "fe80::/10",
+])
+
+
+@dataclass
+class EgressState:
+    vpn_ifaces: List[str]
+    egress_v4: List[str]              # interfaces carrying the probe destinations
+    egress_v6: Optional[str]
+    public_addrs: Dict[str, List[str]]  # iface -> public addresses on non-VPN ifaces
+    has_global_v6: bool
+    addrs: Dict[str, List[str]] = field(default_factory=dict)  # every iface -> addresses
+
+    def iface_of(self, addr: str) -> Optional[str]:
+        """Interface that owns a local address."""
+        for iface, iface_addrs in self.addrs.items():
+            if addr in iface_addrs:
+                return iface
+        return "lo" if addr.startswith("127.") or addr == "::1" else None
+
+
+class RouteLeakEngine:
+    """Reads routes and addresses from /proc once, cached until rtnetlink reports a change."""
+
+    def __init__(self, proc: str = "/proc/net", system: Optional[LiveSystem] = None):
+        self.proc = proc
+        self.system = system or LiveSystem()
+        self._state: Optional[EgressState] = None
+        self._nl: Optional[socket.socket] = None
+        if not self.system.live:
+            return  # replayed state: recollect every scan
+        try:
+            self._nl = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, socket.NETLINK_ROUTE)
+            self._nl.bind((0, RTMGRP_LINK | RTMGRP_IPV4_IFADDR | RTMGRP_IPV4_ROUTE
+                           | RTMGRP_IPV6_IFADDR | RTMGRP_IPV6_ROUTE))
+            self._nl.setblocking(False)
+        except (OSError, AttributeError):
+            self._nl = None
+
+    def _changed(self) -> bool:
+        """Drain pending netlink notifications; True if anything changed."""
+        if self._nl is None:
+            return True
+        changed = False
+        while True:
+            try:
+                if not self._nl.recv(65536):
+                    break
+                changed = True
+            except BlockingIOError:
+                break
+            except OSError:
+                # ENOBUFS: we missed events, so treat as changed
+                changed = True
+                break
+        return changed
+
+    def snapshot(self) -> EgressState:
+        if self._changed() or self._state is None:
+            self._state = self._collect()
+        return self._state
+
+    def invalidate(self):
+        self._state = None
+
+    # -- collection ---------------------------------------------------------
+
+    def _lines(self, name: str) -> List[str]:
+        text = self.system.read(os.path.join(self.proc, name))
+        return text.splitlines() if text is not None else []
+
+    def _routes_v4(self) -> List[Tuple[int, int, int, str]]:
+        """(dest, mask, metric, iface) from /proc/net/route (values are little-endian hex)."""
+        routes = []
+        for line in self._lines("route")[1:]:
+            f = line.split()
+            if len(f) < 8 or not int(f[3], 16) & RTF_UP:
+                continue
+            dest = int.from_bytes(bytes.fromhex(f[1]), "little")
+            mask = int.from_bytes(bytes.fromhex(f[7]), "little")
+            routes.append((dest, mask, int(f[6]), f[0]))
+        return routes
+
+    def _routes_v6(self) -> List[Tuple[int, int, int, str]]:
+        routes = []
+        for line in self._lines("ipv6_route"):
+            f = line.split()
+            if len(f) < 10:
+                continue
+            flags = int(f[8], 16)
+            if not flags & RTF_UP or flags & RTF_REJECT or f[9] == "lo":
+                continue
+            routes.append((int(f[0], 16), int(f[1], 16), int(f[5], 16), f[9]))
+        return routes
+
+    @staticmethod
+    def _lookup_v4(routes, addr: int) -> Optional[str]:
+        best = None
+        for dest, mask, metric, iface in routes:
+            if addr & mask == dest:
+                rank = (bin(mask).count("1"), -metric)
+                if best is None or rank > best[0]:
+                    best = (rank, iface)
+        return best[1] if best else None
+
+    @staticmethod
+    def _lookup_v6(routes, addr: int) -> Optional[str]:
+        best = None
+        for dest, plen, metric, iface in routes:
+            shift = 128 - plen
+            if plen == 0 or (addr >> shift) == (dest >> shift):
+                rank = (plen, -metric)
+                if best is None or rank > best[0]:
+                    best = (rank, iface)
+        return best[1] if best else None
+
+    def _addrs_v4(self) -> Dict[str, List[str]]:
+        try:
+            return self.system.call("ifaddrs_v4", self._ioctl_addrs_v4)
+        except OSError:
+            return {}
+
+    @staticmethod
+    def _ioctl_addrs_v4() -> Dict[str, List[str]]:
+        addrs: Dict[str, List[str]] = {}
+        try:
+            ifaces = [name for _idx, name in socket.if_nameindex()]
+        except OSError:
+            return addrs
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            for name in ifaces:
+                try:
+                    raw = fcntl.ioctl(s.fileno(), SIOCGIFADDR, struct.pack("256s", name[:15].encode()))
+                except OSError:
+                    continue
+                addrs.setdefault(name, []).append(socket.inet_ntoa(raw[20:24]))
+        finally:
+            s.close()
+        return addrs
+
+    def _addrs_v6(self) -> Dict[str, List[str]]:
+        addrs: Dict[str, List[str]] = {}
+        for line in self._lines("if_inet6"):
+            f = line.split()
+            if len(f) < 6:
+                continue
+            addr = str(ipaddress.IPv6Address(int(f[0], 16)))
+            addrs.setdefault(f[5], []).append(addr)
+        return addrs
+
+    def _collect(self) -> EgressState:
+        routes_v4 = self._routes_v4()
+        routes_v6 = self._routes_v6()
+        addrs = self._addrs_v4()
+        for iface, v6 in self._addrs_v6().items():
+            addrs.setdefault(iface, []).extend(v6)
+
+        vpn_ifaces = sorted(i for i in addrs if i.startswith(VPN_IFACE_PREFIXES))
+        egress_v4 = []
+        for probe in EGRESS_PROBES_V4:
+            iface = self._lookup_v4(routes_v4, int(ipaddress.IPv4Address(probe)))
+            if iface and iface not in egress_v4:
+                egress_v4.append(iface)
+
+        public: Dict[str, List[str]] = {}
+        has_global_v6 = False
+        for iface, iface_addrs in addrs.items():
+            for a in iface_addrs:
+                if a in NON_PUBLIC_NETS:
+                    continue
+                if ":" in a:
+                    has_global_v6 = True
+                if not iface.startswith(VPN_IFACE_PREFIXES):
+                    public.setdefault(iface, []).append(a)
+
+        egress_v6 = None
+        if has_global_v6:
+            egress_v6 = self._lookup_v6(routes_v6, int(ipaddress.IPv6Address(EGRESS_PROBE_V6)))
+        return EgressState(vpn_ifaces, egress_v4, egress_v6, public, has_global_v6, addrs)
+
+
+# ---------------------------------------------------------------------------
+# Shell history auditor
+# ---------------------------------------------------------------------------
+
+HISTORY_FILES = (".bash_history", ".zsh_history", ".python_history", ".sqlite_history")
+
+# Optional list of investigation targets (one name per line) to watch for
+HISTORY_TARGETS_FILE = "~/.config/tracelabs-hud/targets"
+
+# (category, pattern, match against lowercased text).  Every pattern leads with
+# a literal or a small literal alternation so ``re`` can skip ahead quickly on
+# multi-MB histories; case-insensitive matching is done by lowercasing the
+# chunk once rather than with (?i), which defeats that optimisation.
+SENSITIVE_PATTERNS = (
+    ("email", r"@[\w-]+\.[A-Za-z]{2,}", False),
+    ("api_key", (
+        r"AKIA[0-9A-Z]{16}|gh[pousr]_[A-Za-z0-9]{36,}|sk-[A-Za-z0-9_-]{20,}"
+        r"|xox[baprs]-[A-Za-z0-9-]{10,}|AIza[0-9A-Za-z_-]{35}"
+    ), False),
+    ("api_key", r"(?:api[_-]?key|token|secret|bearer)[=: ]+['\"]?[a-z0-9_\-./+]{16,}", True),
+    ("password", r"(?:--password[= ]|password=|sshpass -p |mysql[^\n]*? -p)\S+", True),
+)
+
+# Histories larger than this are reported as "not cleared"
+HISTORY_SIZE_WARN = 10000
+
+
+def _compile_sensitive_index(targets: Tuple[str, ...]) -> List[Tuple[str, "re.Pattern", bool]]:
+    index = [(name, re.compile(pattern), lower) for name, pattern, lower in SENSITIVE_PATTERNS]
+    if targets:
+        names = "|".join(re.escape(t.lower()) for t in sorted(targets, key=len, reverse=True))
+        index.append(("target", re.compile(names), True))
+    return index
+
+
+def _parse_targets(text: str) -> Tuple[str, ...]:
+    return tuple(
+        line.strip() for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("#")
+    )
+
+
+class HistoryAuditor:
+    """Tail-reads shell/REPL histories from a remembered offset and indexes sensitive terms.
+
+    Only bytes appended since the previous scan are read; the offset is reset
+    when a file is truncated or replaced (new inode), and all offsets are reset
+    when the target list changes.
+    """
+
+    def __init__(self, probe_cache: FileProbeCache, chunk_size: int = 1 << 20):
+        self.probe_cache = probe_cache
+        self.system = probe_cache.system
+        self.chunk_size = chunk_size
+        self._targets: Optional[Tuple[str, ...]] = None
+        self._index = _compile_sensitive_index(())
+        # path -> [st_ino, offset, {category: count}]
+        self._files: Dict[str, list] = {}
+
+    def _refresh_index(self, home: str):
+        targets = self.probe_cache.parsed(HISTORY_TARGETS_FILE.replace("~", home, 1), _parse_targets) or ()
+        if targets != self._targets:
+            self._targets = targets
+            self._index = _compile_sensitive_index(targets)
+            self._files.clear()
+
+    def _scan_file(self, path: str) -> Optional[Tuple[int, Dict[str, int]]]:
+        st = self.system.stat(path)
+        if st is None:
+            self._files.pop(path, None)
+            return None
+        state = self._files.get(path)
+        if state is None or state[0] != st.st_ino or st.st_size < state[1]:
+            state = [st.st_ino, 0, {}]
+            self._files[path] = state
+        if st.st_size > state[1]:
+            counts = state[2]
+            while True:
+                chunk = self.system.read_bytes(path, state[1], self.chunk_size)
+                if not chunk:
+                    break
+                # only consume complete lines; a partial tail is re-read next scan
+                end = chunk.rfind(b"\n") + 1
+                if end == 0:
+                    if len(chunk) < self.chunk_size:
+                        break
+                    end = len(chunk)
+                text = chunk[:end].decode("utf-8", errors="replace")
+                lowered = text.lower()
+                for category, pattern, lower in self._index:
+                    n = sum(1 for _ in pattern.finditer(lowered if lower else text))
+                    if n:
+                        counts[category] = counts.get(category, 0) + n
+                state[1] += end
+        return st.st_size, state[2]
+
+    def scan(self, home: str) -> Tuple[int, Dict[str, int]]:
+        """Return (total history bytes, sensitive hit counts by category)."""
+        self._refresh_index(home)
+        total = 0
+        counts: Dict[str, int] = {}
+        for name in HISTORY_FILES:
+            result = self._scan_file(os.path.join(home, name))
+            if result is None:
+                continue
+            total += result[0]
+            for category, n in result[1].items():
+                counts[category] = counts.get(category, 0) + n
+        return total, counts
+
+
+# ---------------------------------------------------------------------------
+# Check registry
+# ---------------------------------------------------------------------------
+
+# Cost classes: "cheap" checks only read files/procfs and run inline on the
+# scan thread; "exec" checks spawn subprocesses or block on sockets and are
+# spread over the worker pool; "network" checks leave the host and run from
+# the background network thread.
+CHECK_COSTS = ("cheap", "exec", "network")
+
+
+# Drop-in check modules, loaded in order (later files may override an id)
+CHECK_PLUGIN_DIRS = ("/etc/tracelabs-hud/checks.d", "~/.config/tracelabs-hud/checks")
+
+MAX_CHECK_WORKERS = 6
+
+
+@dataclass(frozen=True)
+class CheckSpec:
+    """Declarative description of one security check.
+
+    ``func(scanner, probe)`` returns ``(status, detail)`` or
+    ``(status, detail, priority)``; name, section and the default priority
+    come from the spec.  Any exception becomes the ``on_error`` result.
+    """
+    id: str
+    name: str
+    section: Union[Section, str]
+    func: Callable
+    priority: int = 2
+    cost: str = "cheap"
+    needs: Tuple[str, ...] = ()   # DATA_PROVIDERS this check reads
+    interval: int = 0             # min seconds between runs (0 = every scan)
+    timeout: float = 5.0          # per-subprocess and overall deadline
+    thresholds: Tuple[int, ...] = ()  # (green_max, yellow_max) for probe.grade()
+    on_error: Tuple = ("yellow", "Error")
+    seq: int = 0
+
+
+CHECK_REGISTRY: Dict[str, CheckSpec] = {}
+
+
+def register_check(id: str, name: str, section: str, **options):
+    """Decorator registering ``func(scanner, probe)`` as a check.
+
+    Works on SecurityScanner methods and on plain functions in plugin modules.
+    """
+    def decorator(func):
+        previous = CHECK_REGISTRY.get(id)
+        seq = previous.seq if previous else len(CHECK_REGISTRY)
+        spec = CheckSpec(id, name, Section.parse(section), func, seq=seq, **options)
+        if spec.cost not in CHECK_COSTS:
+            raise ValueError(f"check {id}: unknown cost class {spec.cost!r}")
+        for need in spec.needs:
+            if need not in DATA_PROVIDERS:
+                raise ValueError(f"check {id}: unknown data provider {need!r}")
+        CHECK_REGISTRY[id] = spec
+        return func
+    return decorator
+
+
+def load_check_plugins(dirs=CHECK_PLUGIN_DIRS) -> List[str]:
+    """Import ``*.py`` drop-ins; returns "path: error" strings for failures.
+
+    Plugins get ``register_check``, ``data_provider`` and ``SecurityCheck`` as
+    module globals, so they need no import of this (hyphenated) script.
+    """
+    errors = []
+    for d in dirs:
+        d = os.path.expanduser(d)
+        try:
+            paths = sorted(e.path for e in os.scandir(d) if e.name.endswith(".py") and e.is_file())
+        except OSError:
+            continue
+        for path in paths:
+            name = "tracelabs_hud_check_" + re.sub(r"\W", "_", os.path.basename(path)[:-3])
+            try:
+                spec = importlib.util.spec_from_file_location(name, path)
+                module = importlib.util.module_from_spec(spec)
+                module.register_check = register_check
+                module.data_provider = data_provider
+                module.SecurityCheck = SecurityCheck
+                spec.loader.exec_module(module)
+            except Exception as e:
+                errors.append(f"{path}: {e}")
+    return errors
+
+
+_plugin_errors: Optional[List[str]] = None
+
+
+def check_plugin_errors() -> List[str]:
+    """Load the drop-ins once per process; every scanner gets that load's errors."""
+    global _plugin_errors
+    if _plugin_errors is None:
+        _plugin_errors = load_check_plugins()
+    return _plugin_errors
+
+
+# Shared per-scan data.  A provider runs at most once per scan, however many
+# checks declare it in ``needs``.
+DATA_PROVIDERS: Dict[str, Callable] = {}
+
+# systemd units whose state is fetched with a single `systemctl is-active`
+SYSTEMD_UNITS = ("tor", "ssh", "geoclue.service")
+
+TCP_STATES = {"01": "established", "0A": "listen"}
+
+# Root-only facts come from one polkit-authorized helper (tracelabs-vm-updater)
+PRIVILEGED_HELPER = "/usr/local/bin/tl-hud-facts"
+PRIVILEGED_FACTS_TTL = 300
+PRIVILEGED_FACTS_TIMEOUT = 20   # pkexec may wait on an authentication agent
+PRIVILEGED_FACTS_VERSION = 1
+
+
+def data_provider(name: str):
+    def decorator(func):
+        DATA_PROVIDERS[name] = func
+        return func
+    return decorator
+
+
+@data_provider("processes")
+def _collect_processes(scanner) -> List[str]:
+    """Command lines of all user-space processes (argv joined by spaces)."""
+    cmdlines = []
+    system = scanner.system
+    for name in system.listdir("/proc"):
+        if not name.isdigit():
+            continue
+        raw = system.read_bytes(f"/proc/{name}/cmdline")
+        if raw:
+            cmdlines.append(raw.rstrip(b"\0").replace(b"\0", b" ").decode("utf-8", "replace"))
+    return cmdlines
+
+
+@data_provider("sockets")
+def _collect_sockets(scanner) -> Dict[str, int]:
+    """TCP socket counts by state ("listen", "established") from /proc/net/tcp{,6}."""
+    counts = {state: 0 for state in TCP_STATES.values()}
+    for path in ("/proc/net/tcp", "/proc/net/tcp6"):
+        text = scanner._read(path)
+        if not text:
+            continue
+        for line in text.splitlines()[1:]:
+            fields = line.split(None, 4)
+            state = TCP_STATES.get(fields[3]) if len(fields) > 3 else None
+            if state:
+                counts[state] += 1
+    return counts
+
+
+@data_provider("units")
+def _collect_units(scanner) -> Dict[str, str]:
+    out = scanner._run("systemctl is-active " + " ".join(SYSTEMD_UNITS) + " 2>/dev/null")
+    states = (out or "").splitlines()
+    return {unit: states[i] if i < len(states) else "unknown" for i, unit in enumerate(SYSTEMD_UNITS)}
+
+
+class PrivilegedFacts:
+    """Caches the tl-hud-facts blob (firewall, dm-crypt, AppArmor, socket
+    owners) for PRIVILEGED_FACTS_TTL, so root-only state costs one pkexec
+    round trip per interval instead of several degraded subprocesses.
+
+    Failures (helper not installed, not authorized) are cached too, so a
+    missing helper never turns into a stream of pkexec attempts.
+
+    The helper runs outside the lock, which only guards publishing the
+    result, so a polkit prompt never blocks the other checks on it. With
+    ``background`` (live scans) every fetch, the first included, runs on
+    its own thread and the last blob (None at first) is served meanwhile;
+    otherwise (recording, replay) callers wait for the fetch in progress.
+    A fetch that raises keeps the previous blob and is retried next scan.
+    """
+
+    def __init__(self, scanner, ttl: float = PRIVILEGED_FACTS_TTL,
+                 timeout: float = PRIVILEGED_FACTS_TIMEOUT, background: bool = False):
+        self.scanner = scanner
+        self.ttl = ttl
+        self.timeout = timeout
+        self.background = background
+        self._lock = threading.Lock()
+        self._pending: Optional[threading.Event] = None   # set when the fetch in progress ends
+        self._fetched: Optional[float] = None
+        self._facts: Optional[Dict[str, Any]] = None
+
+    def get(self) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            now = self.scanner.system.clock() or time.monotonic()
+            if self._fetched is not None and now - self._fetched < self.ttl:
+                return self._facts
+            pending, owner = self._pending, self._pending is None
+            if owner:
+                pending = self._pending = threading.Event()
+            if self.background:
+                if owner:
+                    threading.Thread(target=self._refresh, args=(pending,), daemon=True,
+                                     name="hud-privileged").start()
+                return self._facts
+        if owner:
+            self._refresh(pending)
+        else:
+            pending.wait(self.timeout + 1)   # another check is fetching
+        with self._lock:
+            return self._facts
+
+    def _refresh(self, pending: threading.Event):
+        system = self.scanner.system
+        facts, fresh = None, False
+        try:
+            facts = self._fetch(system)
+            generation = getattr(_scan_thread, "generation", None)
+            fresh = generation is None or not generation.cancelled  # killed mid-run: try again next scan
+        except Exception:
+            fresh = False   # keep the previous blob and try again next scan
+        finally:
+            with self._lock:
+                if fresh:
+                    self._fetched, self._facts = system.clock() or time.monotonic(), facts
+                self._pending = None
+            pending.set()
+
+    def _fetch(self, system) -> Optional[Dict[str, Any]]:
+        if system.stat(PRIVILEGED_HELPER) is None:
+            return None
+        if system.call("euid", os.geteuid) == 0:
+            cmd = PRIVILEGED_HELPER
+        elif system.which("pkexec"):
+            cmd = "pkexec " + PRIVILEGED_HELPER
+        else:
+            return None
+        out = self.scanner._run(cmd + " 2>/dev/null", timeout=self.timeout)
+        try:
+            blob = json.loads(out or "")
+        except ValueError:
+            return None
+        if not isinstance(blob, dict) or blob.get("version") != PRIVILEGED_FACTS_VERSION:
+            return None
+        return blob.get("facts")
 
-@dataclass
-class SecurityCheck:
-    name: str
-    status: str  # "green", "yellow", "red"
-    detail: str
-    section: str  # "Network", "System", "Privacy"
-    priority: int = 1  # 1=high, 2=medium, 3=low
 
+@data_provider("privileged")
+def _collect_privileged(scanner) -> Optional[Dict[str, Any]]:
+    return scanner.privileged.get()
 
-@dataclass
-class HUDStats:
-    total_checks: int = 0
-    green_count: int = 0
-    yellow_count: int = 0
-    red_count: int = 0
-    threat_level: str = "UNKNOWN"
-    vpn_uptime: str = "N/A"
-    last_scan: str = ""
-    active_connections: int = 0
+
+def _kill_group(proc: subprocess.Popen):
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except OSError:
+        pass
+
+
+class ScanGeneration:
+    """One scan pass.  Starting the next pass cancels this one: its running
+    subprocesses are killed and whatever it still produces is discarded.
+    """
+
+    def __init__(self, number: int):
+        self.number = number
+        self._cancelled = threading.Event()
+        self._procs: set = set()
+        self._lock = threading.Lock()
+
+    def __repr__(self) -> str:
+        return f"<ScanGeneration {self.number}{' cancelled' if self.cancelled else ''}>"
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled.set()
+            procs = list(self._procs)
+        for proc in procs:
+            _kill_group(proc)
+
+    def track(self, proc: subprocess.Popen) -> bool:
+        """Register a child; kills it right away (False) if already cancelled."""
+        with self._lock:
+            if not self._cancelled.is_set():
+                self._procs.add(proc)
+                return True
+        _kill_group(proc)
+        proc.communicate()
+        return False
+
+    def untrack(self, proc: subprocess.Popen):
+        with self._lock:
+            self._procs.discard(proc)
+
+
+# generation of the scan work running on the current thread (checks, providers)
+_scan_thread = threading.local()
+
+
+class ScanContext:
+    """Shared data for one scan; providers are computed lazily and only once."""
+
+    def __init__(self, scanner, generation: Optional[ScanGeneration] = None):
+        self.scanner = scanner
+        self.generation = generation
+        self._values: Dict[str, Any] = {}
+        self._locks = {name: threading.Lock() for name in DATA_PROVIDERS}
+
+    def data(self, name: str) -> Any:
+        with self._locks[name]:
+            if name not in self._values:
+                previous = getattr(_scan_thread, "generation", None)
+                _scan_thread.generation = self.generation
+                try:
+                    self._values[name] = DATA_PROVIDERS[name](self.scanner)
+                except Exception:
+                    self._values[name] = None
+                finally:
+                    _scan_thread.generation = previous
+            return self._values[name]
+
+
+class CheckProbe:
+    """What a check function sees besides the scanner: its spec and the scan data."""
+
+    __slots__ = ("spec", "context")
+
+    def __init__(self, spec: CheckSpec, context: ScanContext):
+        self.spec = spec
+        self.context = context
+
+    def data(self, name: str) -> Any:
+        if name not in self.spec.needs:
+            raise KeyError(f"check {self.spec.id} did not declare {name!r}")
+        return self.context.data(name)
+
+    def run(self, cmd: str) -> Optional[str]:
+        return self.context.scanner._run(cmd, timeout=self.spec.timeout)
+
+    def grade(self, value: float) -> Status:
+        green_max, yellow_max = self.spec.thresholds
+        if value <= green_max:
+            return Status.GREEN
+        return Status.YELLOW if value <= yellow_max else Status.RED
+
+
+class CheckEngine:
+    """Runs registered checks: shared data is planned up front, cheap checks run
+    inline, subprocess-bound checks run concurrently, and checks with an
+    ``interval`` reuse their previous result until they are due again.
+    """
+
+    def __init__(self, scanner, workers: int = MAX_CHECK_WORKERS):
+        self.scanner = scanner
+        self.workers = workers
+        self._pool = None
+        self._last: Dict[str, Tuple[float, SecurityCheck]] = {}
+        self._running: Dict[str, Any] = {}   # check id -> its latest pooled future
+
+    def _executor(self):
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="hud-check")
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+    @staticmethod
+    def specs(costs: Tuple[str, ...]) -> List[CheckSpec]:
+        selected = [s for s in CHECK_REGISTRY.values() if s.cost in costs]
+        # plugin-defined (string) sections sort after the built-in ones
+        return sorted(selected, key=lambda s: (
+            s.section if isinstance(s.section, Section) else len(Section), s.priority, s.seq))
+
+    def _evaluate(self, spec: CheckSpec, context: ScanContext) -> SecurityCheck:
+        start = time.perf_counter()
+        previous = getattr(_scan_thread, "generation", None)
+        _scan_thread.generation = context.generation
+        try:
+            if context.generation is not None and context.generation.cancelled:
+                result = spec.on_error  # superseded before it started
+            else:
+                result = spec.func(self.scanner, CheckProbe(spec, context))
+        except Exception:
+            result = spec.on_error
+        finally:
+            _scan_thread.generation = previous
+        self.scanner.metrics.observe_check(spec.id, time.perf_counter() - start)
+        status, detail = Status.parse(result[0]), result[1]
+        priority = result[2] if len(result) > 2 else spec.priority
+        return SecurityCheck(spec.name, status, detail, spec.section, priority, spec.id)
+
+    def run_one(self, check_id: str, generation: Optional[ScanGeneration] = None) -> SecurityCheck:
+        """Re-evaluate a single check now (e.g. when a pushed event changed its input)."""
+        spec = CHECK_REGISTRY[check_id]
+        result = self._evaluate(spec, ScanContext(self.scanner, generation))
+        self._last[spec.id] = (time.monotonic(), result)
+        return result
+
+    def run(self, costs: Tuple[str, ...], now: Optional[float] = None,
+            generation: Optional[ScanGeneration] = None) -> Optional[List[SecurityCheck]]:
+        """Run the selected checks; ``now`` overrides the clock (replayed scans).
+
+        Returns None if ``generation`` was cancelled while the checks ran.
+        """
+        specs = self.specs(costs)
+        live = now is None
+        if live:
+            now = time.monotonic()
+        results: Dict[str, SecurityCheck] = {}
+        due = []
+        for spec in specs:
+            last = self._last.get(spec.id)
+            if last is not None and spec.interval and now - last[0] < spec.interval:
+                results[spec.id] = last[1]
+            else:
+                due.append(spec)
+
+        context = ScanContext(self.scanner, generation)
+        # a check that outlived an earlier deadline is not submitted again
+        # while it still holds a worker, so a wedged probe pins one at most
+        pooled, busy = [], []
+        for spec in due:
+            if spec.cost != "cheap":
+                previous = self._running.get(spec.id)
+                (busy if previous is not None and not previous.done() else pooled).append(spec)
+        futures = {}
+        if pooled:
+            pool = self._executor()
+            # start every needed provider before the checks that wait on it
+            for name in sorted({n for s in due for n in s.needs}):
+                pool.submit(context.data, name)
+            futures = {s.id: pool.submit(self._evaluate, s, context) for s in pooled}
+            self._running.update(futures)
+        for spec in due:
+            if spec.cost == "cheap":
+                results[spec.id] = self._evaluate(spec, context)
+        if pooled:
+            # the checks run concurrently, so they share one deadline
+            # rather than each waiting out its own timeout in turn
+            wait(futures.values(), timeout=max(s.timeout for s in pooled) + 1)
+        for spec in pooled:
+            future = futures[spec.id]
+            try:
+                if not future.done():
+                    raise TimeoutError
+                results[spec.id] = future.result()
+            except Exception:
+                results[spec.id] = SecurityCheck(spec.name, Status.YELLOW, "Timed out", spec.section, spec.priority, spec.id)
+        for spec in busy:
+            results[spec.id] = SecurityCheck(spec.name, Status.YELLOW, "Still running", spec.section, spec.priority, spec.id)
+        if generation is not None and generation.cancelled:
+            return None  # keep _last: these results may come from killed commands
+
+        # replayed scans gate intervals on the recorded clock only
+        finished = time.monotonic() if live else now
+        for spec in due:
+            self._last[spec.id] = (finished, results[spec.id])
+        return [results[s.id] for s in specs]
 
 
 # ---------------------------------------------------------------------------
-# Trace Labs Cyberpunk Color Palette (Enhanced)
+# Metrics exporter
 # ---------------------------------------------------------------------------
 
-COLORS = {
-    "bg_dark":      (0x0a / 255, 0x0a / 255, 0x0a / 255),    # Pure black
-    "bg_panel":     (0x15 / 255, 0x15 / 255, 0x15 / 255),    # Dark panel
-    "accent":       (0x00 / 255, 0xff / 255, 0xd9 / 255),    # Trace Labs cyan/teal
-    "accent_bright": (0x00 / 255, 0xff / 255, 0xff / 255),   # Bright cyan
-    "green":        (0x00 / 255, 0xff / 255, 0x41 / 255),    # Matrix green
-    "yellow":       (0xfc / 255, 0xc8 / 255, 0x00 / 255),    # Warning yellow
-    "red":          (0xff / 255, 0x00 / 255, 0x40 / 255),    # Alert red
-    "dim":          (0.40, 0.40, 0.35),
-    "text":         (0.85, 0.85, 0.80),
-    "text_bright":  (0.95, 0.95, 0.90),
-    "grid":         (0.15, 0.25, 0.25),
-}
+# Set to "127.0.0.1:9477", ":9477" (localhost) or "unix:/path/to.sock" to serve
+# Prometheus/OpenMetrics text.  Unset (the default) means no listener at all.
+METRICS_ENV = "TRACELABS_HUD_METRICS"
 
-STATUS_COLORS = {
-    "green":  COLORS["green"],
-    "yellow": COLORS["yellow"],
-    "red":    COLORS["red"],
-}
+CHECK_LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SCAN_DURATION_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+OPENMETRICS_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+PROMETHEUS_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+    def samples(self, name: str, labels: str) -> List[str]:
+        sep = "," if labels else ""
+        lines = []
+        cumulative = 0
+        for bound, n in zip(self.bounds, self.counts):
+            cumulative += n
+            lines.append(f'{name}_bucket{{{labels}{sep}le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{labels}{sep}le="+Inf"}} {self.count}')
+        lines.append(f"{name}_count{{{labels}}} {self.count}" if labels else f"{name}_count {self.count}")
+        lines.append(f"{name}_sum{{{labels}}} {self.sum:.6f}" if labels else f"{name}_sum {self.sum:.6f}")
+        return lines
+
+
+def _label(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class ScanMetrics:
+    """Scanner performance counters, updated from the check worker threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.check_latency: Dict[str, Histogram] = {}
+        self.scan_duration: Dict[str, Histogram] = {}
+        self.subprocesses = 0
+        self.subprocess_failures = 0
+        self.last_scan = 0.0
+
+    def observe_check(self, check_id: str, seconds: float):
+        with self._lock:
+            hist = self.check_latency.get(check_id)
+            if hist is None:
+                hist = self.check_latency[check_id] = Histogram(CHECK_LATENCY_BUCKETS)
+            hist.observe(seconds)
+
+    def observe_scan(self, phase: str, seconds: float):
+        with self._lock:
+            hist = self.scan_duration.get(phase)
+            if hist is None:
+                hist = self.scan_duration[phase] = Histogram(SCAN_DURATION_BUCKETS)
+            hist.observe(seconds)
+            self.last_scan = time.time()
+
+    def count_subprocess(self, ok: bool):
+        with self._lock:
+            self.subprocesses += 1
+            if not ok:
+                self.subprocess_failures += 1
+
+    def render(self, scanner, openmetrics: bool = True) -> bytes:
+        """Text exposition of the scanner's current state and counters."""
+        def family(name, kind, help_text):
+            # OpenMetrics names counter/info families without the sample suffix;
+            # the 0.0.4 text format has no info type
+            if openmetrics and kind in ("counter", "info"):
+                name = name.rsplit("_", 1)[0]
+            elif kind == "info":
+                kind = "gauge"
+            out.append(f"# HELP {name} {help_text}")
+            out.append(f"# TYPE {name} {kind}")
+
+        out: List[str] = []
+        family("sechud_build_info", "info", "SEC-HUD version.")
+        out.append(f'sechud_build_info{{version="{VERSION}"}} 1')
+        family("sechud_score", "gauge", "Weighted security posture score (0-100).")
+        out.append(f"sechud_score {scanner.score}")
+        family("sechud_check_status", "gauge", "Check status: 0=green, 1=yellow, 2=red.")
+        for c in scanner.checks:
+            out.append(
+                f'sechud_check_status{{id="{_label(c.id)}",name="{_label(c.name)}",'
+                f'section="{_label(c.section)}",priority="{c.priority}"}} {int(c.status)}'
+            )
+        family("sechud_checks", "gauge", "Number of checks per status.")
+        stats = scanner.stats
+        for status, n in (("green", stats.green_count), ("yellow", stats.yellow_count),
+                          ("red", stats.red_count)):
+            out.append(f'sechud_checks{{status="{status}"}} {n}')
+        with self._lock:
+            family("sechud_check_duration_seconds", "histogram", "Wall time of individual checks.")
+            for check_id in sorted(self.check_latency):
+                out.extend(self.check_latency[check_id].samples(
+                    "sechud_check_duration_seconds", f'id="{_label(check_id)}"'))
+            family("sechud_scan_duration_seconds", "histogram", "Wall time of a scan pass.")
+            for phase in sorted(self.scan_duration):
+                out.extend(self.scan_duration[phase].samples(
+                    "sechud_scan_duration_seconds", f'phase="{phase}"'))
+            family("sechud_subprocesses_total", "counter", "Subprocesses spawned by checks.")
+            out.append(f"sechud_subprocesses_total {self.subprocesses}")
+            family("sechud_subprocess_failures_total", "counter",
+                   "Subprocesses that timed out or failed to start.")
+            out.append(f"sechud_subprocess_failures_total {self.subprocess_failures}")
+            family("sechud_last_scan_timestamp_seconds", "gauge", "Unix time of the last scan pass.")
+            out.append(f"sechud_last_scan_timestamp_seconds {self.last_scan:.3f}")
+        if openmetrics:
+            out.append("# EOF")
+        return ("\n".join(out) + "\n").encode()
+
+
+class MetricsExporter:
+    """Serves the most recently published snapshot over HTTP.
+
+    Scrapes only copy pre-rendered bytes; checks run on the HUD's own
+    schedule and ``publish()`` swaps in new bodies after each scan.
+    """
+
+    def __init__(self, address: str):
+        self.address = address
+        self._bodies = (b"", b"")  # (openmetrics, prometheus text 0.0.4)
+        self._server = None
+
+    def publish(self, scanner, metrics: ScanMetrics):
+        self._bodies = (metrics.render(scanner, True), metrics.render(scanner, False))
+
+    def start(self):
+        exporter = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                openmetrics, text = exporter._bodies
+                if "application/openmetrics-text" in self.headers.get("Accept", ""):
+                    body, ctype = openmetrics, OPENMETRICS_TYPE
+                else:
+                    body, ctype = text, PROMETHEUS_TYPE
+                self.send_response(200)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX:
+            try:
+                os.unlink(addr)
+            except FileNotFoundError:
+                pass
+
+            class Server(socketserver.ThreadingUnixStreamServer):
+                daemon_threads = True
+
+            self._server = Server(addr, Handler)
+            os.chmod(addr, 0o600)
+        else:
+            class Server(http.server.ThreadingHTTPServer):
+                address_family = family
+                daemon_threads = True
+
+            self._server = Server(addr, Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True,
+                         name="hud-metrics").start()
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
 
 
 # ---------------------------------------------------------------------------
@@ -106,410 +1794,525 @@ IDENTIFIABLE_HOSTNAME = re.compile(
     r"[A-Z][a-z]+[-_ ][A-Z][a-z]+",
 )
 
+# Written by tl-check-updates (systemd timer); reading it avoids running apt
+UPDATE_STATE_FILE = "/var/cache/tracelabs/update-state.json"
+
+
+def _tcp_connect(host: str, port: int, timeout: float) -> bool:
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    s.settimeout(timeout)
+    try:
+        s.connect((host, port))
+        return True
+    finally:
+        s.close()
+
+
+def _fetch_public_ip(timeout: float) -> str:
+    req = urllib.request.Request(
+        "https://ifconfig.me", headers={"User-Agent": "curl/7.88"}
+    )
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.read().decode().strip()
+
 
 class SecurityScanner:
     """Runs all security checks with comprehensive monitoring."""
 
-    def __init__(self):
+    def __init__(self, system: Optional[LiveSystem] = None):
+        self.system = system or LiveSystem()
         self.checks: List[SecurityCheck] = []
         self.score: int = 0
         self.scan_time: str = ""
         self.stats: HUDStats = HUDStats()
         self.vpn_start_time: Optional[float] = None
+        self.probe_cache = FileProbeCache(system=self.system)
+        self.browser_auditor = BrowserPrivacyAuditor(self.probe_cache)
+        self.route_engine = RouteLeakEngine(system=self.system)
+        self.dns_engine = DnsPostureEngine(self.system, self.route_engine)
+        self.tor_monitor = TorMonitor()
+        self.throughput = ThroughputSampler()
+        self.resource_sampler: Optional[ResourceSampler] = None
+        self.resources: Optional[Dict[str, Any]] = None
+        if self.system.live:
+            self.tor_monitor.start()
+            self.throughput.start()
+            self.resource_sampler = ResourceSampler()
+        self.history_auditor = HistoryAuditor(self.probe_cache)
+        self.plugin_errors = check_plugin_errors()
+        self.engine = CheckEngine(self)
+        self.history = ResultHistory()
+        self.metrics = ScanMetrics()
+        self.generation = ScanGeneration(0)
+        self._generation_lock = threading.Lock()
+        # a window refreshes the blob in the background; recordings and
+        # replays fetch it in-line so every probe lands in its own scan
+        self.privileged = PrivilegedFacts(
+            self, background=self.system.live and not isinstance(self.system, RecordingSystem))
 
-    @staticmethod
-    def _run(cmd: str, timeout: int = 5) -> Optional[str]:
-        try:
-            r = subprocess.run(
-                cmd, shell=True, capture_output=True, text=True, timeout=timeout
-            )
-            return r.stdout.strip()
-        except Exception:
-            return None
+    def close(self):
+        """Stop the check pool and live samplers and release the fds they keep open."""
+        self.engine.close()
+        self.tor_monitor.stop()
+        self.throughput.stop()
+        if self.resource_sampler is not None:
+            self.resource_sampler.close()
+            self.resource_sampler = None
 
-    @staticmethod
-    def _read(path: str) -> Optional[str]:
-        try:
-            with open(path) as f:
-                return f.read()
-        except Exception:
-            return None
+    def new_generation(self) -> ScanGeneration:
+        """Start the next scan pass, cancelling whatever the previous one still runs."""
+        with self._generation_lock:
+            previous = self.generation
+            self.generation = ScanGeneration(previous.number + 1)
+        previous.cancel()
+        return self.generation
 
-    def check_vpn(self) -> SecurityCheck:
-        try:
-            net_dir = "/sys/class/net"
-            if not os.path.isdir(net_dir):
-                return SecurityCheck("VPN Status", "yellow", "Cannot read net info", "Network", 1)
-            ifaces = os.listdir(net_dir)
-            vpn_ifaces = [i for i in ifaces if i.startswith(("tun", "wg", "tap"))]
-            if vpn_ifaces:
-                for vi in vpn_ifaces:
-                    operstate = self._read(f"{net_dir}/{vi}/operstate")
-                    if operstate and operstate.strip() == "up":
-                        # Track VPN uptime
-                        if self.vpn_start_time is None:
-                            self.vpn_start_time = time.time()
-                        return SecurityCheck("VPN Status", "green", f"{vi} UP", "Network", 1)
-                self.vpn_start_time = None
-                return SecurityCheck("VPN Status", "yellow", f"{', '.join(vpn_ifaces)} down", "Network", 1)
+    def _run(self, cmd: str, timeout: int = 5) -> Optional[str]:
+        out = self.system.run(cmd, timeout, getattr(_scan_thread, "generation", None))
+        self.metrics.count_subprocess(out is not None)
+        return out
+
+    def _read(self, path: str) -> Optional[str]:
+        return self.probe_cache.read(path)
+
+    def _read_parsed(self, path: str, parser: Callable[[str], Any]) -> Any:
+        return self.probe_cache.parsed(path, parser)
+
+    def _stat(self, path: str) -> Optional[StatRecord]:
+        return self.probe_cache.stat(path)
+
+    def _home(self) -> str:
+        return self.system.call("home", os.path.expanduser, "~")
+
+    @register_check("vpn", "VPN Status", "Network", priority=1)
+    def check_vpn(self, probe: CheckProbe):
+        net_dir = "/sys/class/net"
+        st = self.system.stat(net_dir)
+        if st is None or not stat.S_ISDIR(st.st_mode):
+            return "yellow", "Cannot read net info"
+        ifaces = self.system.listdir(net_dir)
+        vpn_ifaces = [i for i in ifaces if i.startswith(VPN_IFACE_PREFIXES)]
+        if vpn_ifaces:
+            for vi in vpn_ifaces:
+                operstate = self._read(f"{net_dir}/{vi}/operstate")
+                if operstate and operstate.strip() == "up":
+                    # Track VPN uptime
+                    if self.vpn_start_time is None:
+                        self.vpn_start_time = time.time()
+                    flow = self.system.call("throughput", self.throughput.status)
+                    if vi in flow["stalled"]:
+                        return "yellow", f"{vi} UP, no replies"
+                    if flow["bypass"]:
+                        return "yellow", f"{vi} UP, {format_rate(flow['excess'])}/s via {flow['bypass']}"
+                    return "green", f"{vi} UP"
             self.vpn_start_time = None
-            return SecurityCheck("VPN Status", "red", "No VPN found", "Network", 1)
-        except Exception:
-            return SecurityCheck("VPN Status", "yellow", "Error", "Network", 1)
+            return "yellow", f"{', '.join(vpn_ifaces)} down"
+        self.vpn_start_time = None
+        return "red", "No VPN found"
 
-    def check_tor(self) -> SecurityCheck:
-        try:
-            active = self._run("systemctl is-active tor 2>/dev/null")
-            if active == "active":
-                s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                s.settimeout(2)
-                try:
-                    s.connect(("127.0.0.1", 9050))
-                    s.close()
-                    return SecurityCheck("Tor Status", "green", "Running :9050", "Network", 1)
-                except Exception:
-                    s.close()
-                    return SecurityCheck("Tor Status", "green", "Active (port N/A)", "Network", 1)
-            which = self._run("which tor 2>/dev/null")
-            if which:
-                return SecurityCheck("Tor Status", "yellow", "Installed, stopped", "Network", 1)
-            return SecurityCheck("Tor Status", "red", "Not found", "Network", 1)
-        except Exception:
-            return SecurityCheck("Tor Status", "yellow", "Error", "Network", 1)
+    @register_check("tor", "Tor Status", "Network", priority=1, cost="exec", needs=("units",))
+    def check_tor(self, probe: CheckProbe):
+        tor = self.system.call("tor_state", self.tor_monitor.snapshot)
+        if tor["connected"]:
+            if tor["bootstrap"] < 100:
+                return "yellow", f"Bootstrapping {tor['bootstrap']}%"
+            if tor["failures"] >= TOR_FAILURE_WARN:
+                return "yellow", f"{tor['failures']} circuits failed"
+            if not tor["built"]:
+                return "yellow", "No circuits"
+            return "green", f"{tor['built']} circuits"
+        # no ControlPort session: fall back to unit state and the SOCKS port
+        if probe.data("units").get("tor") == "active":
+            try:
+                self.system.call("tcp_connect", _tcp_connect, "127.0.0.1", 9050, 2)
+                return "green", "Running :9050"
+            except Exception:
+                return "green", "Active (port N/A)"
+        if self.system.which("tor"):
+            return "yellow", "Installed, stopped"
+        return "red", "Not found"
 
-    def check_dns(self) -> SecurityCheck:
-        try:
-            resolv = self._read("/etc/resolv.conf")
-            if not resolv:
-                return SecurityCheck("DNS Leak", "yellow", "Cannot read resolv.conf", "Network", 1)
-            nameservers = re.findall(r"nameserver\s+(\S+)", resolv)
-            if not nameservers:
-                return SecurityCheck("DNS Leak", "yellow", "No nameservers", "Network", 1)
-            ns_display = ", ".join(nameservers[:2])
-            if len(nameservers) > 2:
-                ns_display += "..."
-            if any(ns in PRIVACY_DNS for ns in nameservers):
-                return SecurityCheck("DNS Leak", "green", ns_display, "Network", 1)
-            wsl_pattern = re.compile(r"^(172\.(1[6-9]|2\d|3[01])|10\.|192\.168\.)")
-            if any(wsl_pattern.match(ns) for ns in nameservers):
-                return SecurityCheck("DNS Leak", "yellow", f"WSL proxy {ns_display}", "Network", 1)
-            return SecurityCheck("DNS Leak", "red", f"ISP DNS {ns_display}", "Network", 1)
-        except Exception:
-            return SecurityCheck("DNS Leak", "yellow", "Error", "Network", 1)
+    # A network check because a re-probe waits up to DNS_PROBE_DEADLINE; while
+    # the cached posture is valid, run_local_checks evaluates it with the
+    # local pass instead.
+    @register_check("dns", "DNS Leak", "Network", priority=1, cost="network")
+    def check_dns(self, probe: CheckProbe):
+        posture = self.dns_engine.snapshot()
+        if posture is None:
+            return "yellow", "Cannot read resolv.conf"
+        if not posture.upstreams:
+            return "yellow", "No nameservers"
+        nameservers = [u.address for u in posture.upstreams]
+        ns_display = ", ".join(nameservers[:2])
+        if len(nameservers) > 2:
+            ns_display += "..."
+        answering = [u for u in posture.upstreams if u.rtt_ms is not None]
+        vpn_ifaces = self.route_engine.snapshot().vpn_ifaces
+        if vpn_ifaces:
+            leaks = [u for u in answering if u.egress and u.egress not in vpn_ifaces and u.egress != "lo"]
+            if leaks:
+                return "red", f"Leak via {leaks[0].egress} {leaks[0].address}", 1
+        if not answering:
+            return "yellow", f"No answer {ns_display}"
+        fastest = min(answering, key=lambda u: u.rtt_ms)
+        if fastest.egress in vpn_ifaces:
+            return "green", f"Via {fastest.egress} {fastest.rtt_ms:.0f}ms"
+        if any(ns in PRIVACY_DNS for ns in nameservers):
+            return "green", ns_display
+        wsl_pattern = re.compile(r"^(172\.(1[6-9]|2\d|3[01])|10\.|192\.168\.)")
+        if any(wsl_pattern.match(ns) for ns in nameservers):
+            return "yellow", f"WSL proxy {ns_display}"
+        return "red", f"ISP DNS {ns_display}"
 
-    def check_webrtc_leak(self) -> SecurityCheck:
-        """Check for potential WebRTC leaks by examining network interfaces."""
-        try:
-            # Check if there are non-VPN interfaces with public IPs
-            interfaces = self._run("ip -4 addr show | grep 'inet ' | awk '{print $2}'")
-            if interfaces:
-                lines = interfaces.split('\n')
-                public_ips = []
-                for line in lines:
-                    ip = line.split('/')[0]
-                    # Skip localhost, private IPs, and VPN ranges
-                    if not ip.startswith(('127.', '10.', '172.16.', '172.17.', '172.18.', 
-                                         '172.19.', '172.20.', '172.21.', '172.22.', '172.23.',
-                                         '172.24.', '172.25.', '172.26.', '172.27.', '172.28.',
-                                         '172.29.', '172.30.', '172.31.', '192.168.')):
-                        if ip != '':
-                            public_ips.append(ip)
-                
-                if public_ips:
-                    return SecurityCheck("WebRTC Leak", "yellow", "Possible leak", "Network", 1)
-            return SecurityCheck("WebRTC Leak", "green", "Protected", "Network", 1)
-        except Exception:
-            return SecurityCheck("WebRTC Leak", "yellow", "Unable to check", "Network", 2)
+    @register_check("webrtc_leak", "WebRTC Leak", "Network", priority=1,
+                    on_error=("yellow", "Unable to check", 2))
+    def check_webrtc_leak(self, probe: CheckProbe):
+        """Check which interface really carries egress traffic, and what WebRTC could expose."""
+        state = self.route_engine.snapshot()
+        if state.vpn_ifaces:
+            bypass = [i for i in state.egress_v4 if i not in state.vpn_ifaces]
+            if bypass:
+                return "red", f"Split tunnel {bypass[0]}"
+            if state.egress_v6 and state.egress_v6 not in state.vpn_ifaces:
+                return "red", f"IPv6 bypass {state.egress_v6}"
+        if state.public_addrs:
+            iface = sorted(state.public_addrs)[0]
+            return "yellow", f"Public IP on {iface}"
+        if state.vpn_ifaces and state.egress_v4:
+            return "green", f"Via {state.egress_v4[0]}"
+        return "green", "Protected"
 
-    def check_public_ip(self) -> SecurityCheck:
-        try:
-            import urllib.request
-            req = urllib.request.Request(
-                "https://ifconfig.me", headers={"User-Agent": "curl/7.88"}
-            )
-            with urllib.request.urlopen(req, timeout=5) as resp:
-                ip = resp.read().decode().strip()
-            return SecurityCheck("Public IP", "yellow", ip, "Network", 2)
-        except Exception:
-            return SecurityCheck("Public IP", "yellow", "Unavailable", "Network", 2)
+    @register_check("public_ip", "Public IP", "Network", cost="network",
+                    on_error=("yellow", "Unavailable"))
+    def check_public_ip(self, probe: CheckProbe):
+        ip = self.system.call("public_ip", _fetch_public_ip, probe.spec.timeout)
+        return "yellow", ip
 
-    def check_open_ports(self) -> SecurityCheck:
-        try:
-            out = self._run("ss -tlnp 2>/dev/null")
-            if out is None:
-                return SecurityCheck("Open Ports", "yellow", "ss unavailable", "Network", 2)
-            lines = [l for l in out.splitlines()[1:] if l.strip()]
-            n = len(lines)
-            detail = f"{n} listening"
-            if n <= 3:
-                return SecurityCheck("Open Ports", "green", detail, "Network", 2)
-            if n <= 5:
-                return SecurityCheck("Open Ports", "yellow", detail, "Network", 2)
-            return SecurityCheck("Open Ports", "red", detail, "Network", 2)
-        except Exception:
-            return SecurityCheck("Open Ports", "yellow", "Error", "Network", 2)
+    @register_check("open_ports", "Open Ports", "Network", cost="exec",
+                    needs=("sockets", "privileged"), timeout=PRIVILEGED_FACTS_TIMEOUT, thresholds=(3, 5))
+    def check_open_ports(self, probe: CheckProbe):
+        sockets = probe.data("sockets")
+        if sockets is None:
+            return "yellow", "Socket table unavailable"
+        n = sockets["listen"]
+        # owners come from the privileged blob (ss -p only sees other users' sockets as root)
+        ss = (probe.data("privileged") or {}).get("ss")
+        owners = sorted({l["process"] for l in ss["listeners"] if l.get("process")}) if ss else []
+        if owners:
+            return probe.grade(n), f"{n} listening ({', '.join(owners[:2])})"
+        return probe.grade(n), f"{n} listening"
 
-    def check_active_connections(self) -> SecurityCheck:
+    @register_check("active_connections", "Active Connections", "Network",
+                    needs=("sockets",), thresholds=(5, 15))
+    def check_active_connections(self, probe: CheckProbe):
         """Count active network connections."""
-        try:
-            out = self._run("ss -tn state established 2>/dev/null | wc -l")
-            if out:
-                count = int(out) - 1  # Subtract header line
-                self.stats.active_connections = max(0, count)
-                if count <= 5:
-                    return SecurityCheck("Active Connections", "green", f"{count} established", "Network", 2)
-                if count <= 15:
-                    return SecurityCheck("Active Connections", "yellow", f"{count} established", "Network", 2)
-                return SecurityCheck("Active Connections", "red", f"{count} established", "Network", 2)
-            return SecurityCheck("Active Connections", "yellow", "Unknown", "Network", 2)
-        except Exception:
-            return SecurityCheck("Active Connections", "yellow", "Error", "Network", 2)
+        sockets = probe.data("sockets")
+        if sockets is None:
+            return "yellow", "Unknown"
+        count = sockets["established"]
+        self.stats.active_connections = count
+        return probe.grade(count), f"{count} established"
 
-    def check_firewall(self) -> SecurityCheck:
-        try:
-            ufw = self._run("ufw status 2>/dev/null")
-            if ufw and "active" in ufw.lower() and "inactive" not in ufw.lower():
-                return SecurityCheck("Firewall", "green", "UFW Active", "Network", 2)
-            iptables = self._run("iptables -L -n 2>/dev/null | wc -l")
-            if iptables and int(iptables) > 8:
-                return SecurityCheck("Firewall", "green", "iptables active", "Network", 2)
-            return SecurityCheck("Firewall", "red", "No firewall", "Network", 1)
-        except Exception:
-            return SecurityCheck("Firewall", "yellow", "Error", "Network", 2)
+    @register_check("firewall", "Firewall", "Network", cost="exec", needs=("privileged",),
+                    timeout=PRIVILEGED_FACTS_TIMEOUT)
+    def check_firewall(self, probe: CheckProbe):
+        facts = probe.data("privileged")
+        if facts:
+            ufw = facts.get("ufw")
+            if ufw and ufw["active"]:
+                return "green", f"UFW Active ({ufw['rules']} rules)"
+            rules = 0
+            for name in ("iptables", "ip6tables"):
+                table = facts.get(name)
+                if table:
+                    rules += table["rules"] + sum(p in ("DROP", "REJECT") for p in table["policies"].values())
+            if rules:
+                return "green", f"iptables {rules} rules"
+            nft = facts.get("nft")
+            if nft and nft["rules"]:
+                return "green", f"nftables {nft['rules']} rules"
+            return "red", "No firewall", 1
+        # without the helper: ufw/iptables usually need root and fail quietly
+        ufw = probe.run("ufw status 2>/dev/null")
+        if ufw and "active" in ufw.lower() and "inactive" not in ufw.lower():
+            return "green", "UFW Active"
+        iptables = probe.run("iptables -L -n 2>/dev/null | wc -l")
+        if iptables and int(iptables) > 8:
+            return "green", "iptables active"
+        return "red", "No firewall", 1
 
-    def check_bluetooth(self) -> SecurityCheck:
+    @register_check("bluetooth", "Bluetooth", "Privacy", priority=1, cost="exec",
+                    on_error=("green", "N/A", 3))
+    def check_bluetooth(self, probe: CheckProbe):
         """Check Bluetooth status."""
-        try:
-            # Check if Bluetooth is powered on
-            bt_status = self._run("rfkill list bluetooth 2>/dev/null | grep -i 'soft blocked: no'")
-            if bt_status:
-                return SecurityCheck("Bluetooth", "yellow", "Enabled", "Privacy", 1)
-            return SecurityCheck("Bluetooth", "green", "Disabled", "Privacy", 1)
-        except Exception:
-            return SecurityCheck("Bluetooth", "green", "N/A", "Privacy", 3)
+        # Check if Bluetooth is powered on
+        bt_status = probe.run("rfkill list bluetooth 2>/dev/null | grep -i 'soft blocked: no'")
+        if bt_status:
+            return "yellow", "Enabled"
+        return "green", "Disabled"
 
-    def check_mac_randomization(self) -> SecurityCheck:
+    @register_check("mac_randomization", "MAC Randomization", "Privacy", interval=600,
+                    on_error=("yellow", "Unknown"))
+    def check_mac_randomization(self, probe: CheckProbe):
         """Check if MAC address randomization is enabled."""
-        try:
-            # Check NetworkManager MAC randomization
-            nm_conf = self._read("/etc/NetworkManager/NetworkManager.conf")
-            if nm_conf and "wifi.scan-rand-mac-address=yes" in nm_conf:
-                return SecurityCheck("MAC Randomization", "green", "Enabled (NM)", "Privacy", 2)
-            
-            # Check for macchanger
-            macchanger = self._run("which macchanger 2>/dev/null")
-            if macchanger:
-                return SecurityCheck("MAC Randomization", "yellow", "Tool installed", "Privacy", 2)
-            
-            return SecurityCheck("MAC Randomization", "yellow", "Not configured", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("MAC Randomization", "yellow", "Unknown", "Privacy", 2)
+        # Check NetworkManager MAC randomization
+        nm_conf = self._read("/etc/NetworkManager/NetworkManager.conf")
+        if nm_conf and "wifi.scan-rand-mac-address=yes" in nm_conf:
+            return "green", "Enabled (NM)"
 
-    def check_ssh(self) -> SecurityCheck:
-        try:
-            active = self._run("systemctl is-active ssh 2>/dev/null")
-            if active == "active":
-                return SecurityCheck("SSH", "yellow", "Running", "System", 2)
-            return SecurityCheck("SSH", "green", "Stopped", "System", 2)
-        except Exception:
-            return SecurityCheck("SSH", "green", "N/A", "System", 3)
+        # Check for macchanger
+        if self.system.which("macchanger"):
+            return "yellow", "Tool installed"
 
-    def check_updates(self) -> SecurityCheck:
-        try:
-            out = self._run("apt list --upgradable 2>/dev/null | wc -l")
-            if out:
-                count = int(out) - 1
-                if count <= 0:
-                    return SecurityCheck("Updates", "green", "Up to date", "System", 2)
-                if count <= 5:
-                    return SecurityCheck("Updates", "yellow", f"{count} available", "System", 2)
-                return SecurityCheck("Updates", "red", f"{count} available", "System", 1)
-            return SecurityCheck("Updates", "yellow", "Unknown", "System", 2)
-        except Exception:
-            return SecurityCheck("Updates", "yellow", "Error", "System", 2)
+        return "yellow", "Not configured"
 
-    def check_auto_updates(self) -> SecurityCheck:
+    @register_check("ssh", "SSH", "System", cost="exec", needs=("units",),
+                    on_error=("green", "N/A", 3))
+    def check_ssh(self, probe: CheckProbe):
+        if probe.data("units").get("ssh") == "active":
+            return "yellow", "Running"
+        return "green", "Stopped"
+
+    @register_check("updates", "Updates", "System", interval=300, thresholds=(0, 5))
+    def check_updates(self, probe: CheckProbe):
+        # tl-check-updates keeps the state file fresh from its timer; running
+        # apt here would block a cheap check for tens of seconds
+        state = self._read_parsed(UPDATE_STATE_FILE, _parse_json_lenient)
+        if not state or "count" not in state:
+            return "yellow", "Unknown"
+        count = int(state["count"])
+        security = int(state.get("security_count", 0))
+        if count <= 0:
+            return "green", "Up to date"
+        if security:
+            return "red", f"{count} available ({security} sec)", 1
+        status = probe.grade(count)
+        return status, f"{count} available", 1 if status == Status.RED else 2
+
+    @register_check("auto_updates", "Auto-Updates", "System", interval=600,
+                    on_error=("yellow", "Unknown", 3))
+    def check_auto_updates(self, probe: CheckProbe):
         """Check if automatic security updates are enabled."""
-        try:
-            apt_conf = self._read("/etc/apt/apt.conf.d/20auto-upgrades")
-            if apt_conf and "APT::Periodic::Unattended-Upgrade" in apt_conf:
-                return SecurityCheck("Auto-Updates", "green", "Enabled", "System", 2)
-            return SecurityCheck("Auto-Updates", "yellow", "Disabled", "System", 2)
-        except Exception:
-            return SecurityCheck("Auto-Updates", "yellow", "Unknown", "System", 3)
+        apt_conf = self._read("/etc/apt/apt.conf.d/20auto-upgrades")
+        if apt_conf and "APT::Periodic::Unattended-Upgrade" in apt_conf:
+            return "green", "Enabled"
+        return "yellow", "Disabled"
 
-    def check_disk_encryption(self) -> SecurityCheck:
-        try:
-            dmsetup = self._run("dmsetup status 2>/dev/null")
-            if dmsetup and "crypt" in dmsetup:
-                return SecurityCheck("Disk Encryption", "green", "LUKS detected", "System", 2)
-            return SecurityCheck("Disk Encryption", "yellow", "Not encrypted", "System", 2)
-        except Exception:
-            return SecurityCheck("Disk Encryption", "yellow", "Unknown", "System", 3)
+    @register_check("disk_encryption", "Disk Encryption", "System", cost="exec", interval=600,
+                    needs=("privileged",), timeout=PRIVILEGED_FACTS_TIMEOUT,
+                    on_error=("yellow", "Unknown", 3))
+    def check_disk_encryption(self, probe: CheckProbe):
+        dm = (probe.data("privileged") or {}).get("dmsetup")
+        if dm is not None:
+            if dm["crypt"]:
+                return "green", f"LUKS ({len(dm['crypt'])} mapped)"
+            return "yellow", "Not encrypted"
+        dmsetup = probe.run("dmsetup status 2>/dev/null")
+        if dmsetup and "crypt" in dmsetup:
+            return "green", "LUKS detected"
+        return "yellow", "Not encrypted"
 
-    def check_selinux(self) -> SecurityCheck:
-        try:
-            sestatus = self._run("getenforce 2>/dev/null")
-            if sestatus and sestatus.lower() == "enforcing":
-                return SecurityCheck("SELinux/AppArmor", "green", "Enforcing", "System", 2)
-            apparmor = self._run("aa-status 2>/dev/null | grep -c profiles")
-            if apparmor and int(apparmor) > 0:
-                return SecurityCheck("SELinux/AppArmor", "green", f"{apparmor} profiles", "System", 2)
-            return SecurityCheck("SELinux/AppArmor", "yellow", "Not active", "System", 3)
-        except Exception:
-            return SecurityCheck("SELinux/AppArmor", "yellow", "Unknown", "System", 3)
+    @register_check("mac_policy", "SELinux/AppArmor", "System", cost="exec", interval=600,
+                    needs=("privileged",), timeout=PRIVILEGED_FACTS_TIMEOUT,
+                    on_error=("yellow", "Unknown", 3))
+    def check_selinux(self, probe: CheckProbe):
+        sestatus = probe.run("getenforce 2>/dev/null")
+        if sestatus and sestatus.lower() == "enforcing":
+            return "green", "Enforcing"
+        aa = (probe.data("privileged") or {}).get("aa_status")
+        if aa is not None:
+            if aa["enforce"]:
+                return "green", f"{aa['enforce']} profiles enforced"
+            return "yellow", "Not active", 3
+        apparmor = probe.run("aa-status 2>/dev/null | grep -c profiles")
+        if apparmor and int(apparmor) > 0:
+            return "green", f"{apparmor} profiles"
+        return "yellow", "Not active", 3
 
-    def check_suspicious_processes(self) -> SecurityCheck:
+    @register_check("suspicious_processes", "Suspicious Processes", "System", priority=1,
+                    needs=("processes",), on_error=("yellow", "Unable to check", 3))
+    def check_suspicious_processes(self, probe: CheckProbe):
         """Check for commonly suspicious process names."""
-        try:
-            suspicious = ['keylogger', 'rootkit', 'backdoor', 'rat', 'trojan']
-            processes = self._run("ps aux | awk '{print $11}' | sort -u")
-            if processes:
-                found = []
-                for proc in processes.lower().split('\n'):
-                    for sus in suspicious:
-                        if sus in proc:
-                            found.append(proc)
-                if found:
-                    return SecurityCheck("Suspicious Processes", "red", f"{len(found)} found", "System", 1)
-            return SecurityCheck("Suspicious Processes", "green", "None detected", "System", 2)
-        except Exception:
-            return SecurityCheck("Suspicious Processes", "yellow", "Unable to check", "System", 3)
+        suspicious = ['keylogger', 'rootkit', 'backdoor', 'rat', 'trojan']
+        commands = {cmd.split(" ", 1)[0].lower() for cmd in probe.data("processes")}
+        found = [cmd for cmd in commands for sus in suspicious if sus in cmd]
+        if found:
+            return "red", f"{len(found)} found"
+        return "green", "None detected", 2
 
-    def check_hostname(self) -> SecurityCheck:
-        try:
-            hostname = socket.gethostname()
-            if KNOWN_DEFAULT_HOSTNAMES.match(hostname):
-                return SecurityCheck("Hostname", "yellow", "Default name", "Privacy", 2)
-            if IDENTIFIABLE_HOSTNAME.search(hostname):
-                return SecurityCheck("Hostname", "red", "Identifiable", "Privacy", 1)
-            return SecurityCheck("Hostname", "green", "Custom", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("Hostname", "yellow", "Error", "Privacy", 2)
+    @register_check("hostname", "Hostname", "Privacy")
+    def check_hostname(self, probe: CheckProbe):
+        hostname = self.system.hostname()
+        if KNOWN_DEFAULT_HOSTNAMES.match(hostname):
+            return "yellow", "Default name"
+        if IDENTIFIABLE_HOSTNAME.search(hostname):
+            return "red", "Identifiable", 1
+        return "green", "Custom"
 
-    def check_history(self) -> SecurityCheck:
-        try:
-            home = os.path.expanduser("~")
-            bash_history = os.path.join(home, ".bash_history")
-            if os.path.isfile(bash_history):
-                size = os.path.getsize(bash_history)
-                if size > 10000:
-                    return SecurityCheck("History", "yellow", "Not cleared", "Privacy", 2)
-            return SecurityCheck("History", "green", "Cleared/small", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("History", "yellow", "Error", "Privacy", 3)
+    @register_check("history", "History", "Privacy", on_error=("yellow", "Error", 3))
+    def check_history(self, probe: CheckProbe):
+        size, hits = self.history_auditor.scan(self._home())
+        if hits:
+            total = sum(hits.values())
+            top = max(hits, key=hits.get).replace("_", " ")
+            return "red", f"{total} sensitive ({top})", 1
+        if size > HISTORY_SIZE_WARN:
+            return "yellow", "Not cleared"
+        return "green", "Cleared/small"
 
-    def check_webcam(self) -> SecurityCheck:
-        try:
-            lsmod = self._run("lsmod | grep -E 'uvcvideo|videodev'")
-            if lsmod:
-                fuser = self._run("fuser /dev/video0 2>/dev/null")
-                if fuser:
-                    return SecurityCheck("Webcam", "yellow", "In use", "Privacy", 2)
-                return SecurityCheck("Webcam", "green", "Not in use", "Privacy", 2)
-            return SecurityCheck("Webcam", "green", "Driver unloaded", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("Webcam", "yellow", "Error", "Privacy", 3)
+    @register_check("webcam", "Webcam", "Privacy", cost="exec", on_error=("yellow", "Error", 3))
+    def check_webcam(self, probe: CheckProbe):
+        modules = self._read("/proc/modules") or ""
+        if re.search(r"^(uvcvideo|videodev) ", modules, re.MULTILINE):
+            fuser = probe.run("fuser /dev/video0 2>/dev/null")
+            if fuser:
+                return "yellow", "In use"
+            return "green", "Not in use"
+        return "green", "Driver unloaded"
 
-    def check_screen_sharing(self) -> SecurityCheck:
+    @register_check("screen_sharing", "Screen Sharing", "Privacy", priority=1,
+                    needs=("processes",), on_error=("yellow", "Unable to check", 3))
+    def check_screen_sharing(self, probe: CheckProbe):
         """Check if screen sharing/recording apps are running."""
-        try:
-            sharing_procs = self._run("ps aux | grep -E 'vnc|x11vnc|teamviewer|anydesk|zoom|obs' | grep -v grep | wc -l")
-            if sharing_procs and int(sharing_procs) > 0:
-                return SecurityCheck("Screen Sharing", "yellow", f"{sharing_procs} apps active", "Privacy", 1)
-            return SecurityCheck("Screen Sharing", "green", "None active", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("Screen Sharing", "yellow", "Unable to check", "Privacy", 3)
+        sharing = re.compile(r"vnc|x11vnc|teamviewer|anydesk|zoom|obs")
+        active = sum(1 for cmd in probe.data("processes") if sharing.search(cmd))
+        if active:
+            return "yellow", f"{active} apps active"
+        return "green", "None active", 2
 
-    def check_browser_privacy(self) -> SecurityCheck:
-        try:
-            home = os.path.expanduser("~")
-            firefox = os.path.join(home, ".mozilla/firefox")
-            chrome = os.path.join(home, ".config/google-chrome")
-            chromium = os.path.join(home, ".config/chromium")
-            
-            browsers_found = 0
-            if os.path.isdir(firefox):
-                browsers_found += 1
-            if os.path.isdir(chrome):
-                browsers_found += 1
-            if os.path.isdir(chromium):
-                browsers_found += 1
-            
-            if browsers_found == 0:
-                return SecurityCheck("Browser Data", "green", "No profiles", "Privacy", 3)
-            if browsers_found <= 1:
-                return SecurityCheck("Browser Data", "yellow", f"{browsers_found} browser", "Privacy", 3)
-            return SecurityCheck("Browser Data", "yellow", f"{browsers_found} browsers", "Privacy", 3)
-        except Exception:
-            return SecurityCheck("Browser Data", "yellow", "Error", "Privacy", 3)
+    @register_check("browser_privacy", "Browser Privacy", "Privacy", on_error=("yellow", "Error", 3))
+    def check_browser_privacy(self, probe: CheckProbe):
+        """Audit browser profiles for WebRTC, telemetry and cookie exposure."""
+        profiles = self.browser_auditor.audit(self._home())
+        if not profiles:
+            return "green", "No profiles", 3
+        n = len(profiles)
+        leaks = sum(1 for p in profiles if p.webrtc_leak)
+        if leaks:
+            return "red", f"WebRTC on {leaks}/{n}", 1
+        issues = []
+        if any(p.telemetry for p in profiles):
+            issues.append("telemetry")
+        if any(p.third_party_cookies for p in profiles):
+            issues.append("3p cookies")
+        if any((p.history_rows or 0) > BROWSER_HISTORY_ROWS_WARN
+               or (p.cookie_rows or 0) > BROWSER_COOKIE_ROWS_WARN for p in profiles):
+            issues.append("data")
+        if issues:
+            return "yellow", ", ".join(issues[:2])
+        label = "profile" if n == 1 else "profiles"
+        return "green", f"{n} {label} OK", 3
 
-    def check_geolocation(self) -> SecurityCheck:
-        try:
-            geoclue = self._run("systemctl is-active geoclue.service 2>/dev/null")
-            if geoclue == "active":
-                return SecurityCheck("Geolocation", "yellow", "Service active", "Privacy", 2)
-            return SecurityCheck("Geolocation", "green", "Disabled", "Privacy", 2)
-        except Exception:
-            return SecurityCheck("Geolocation", "green", "N/A", "Privacy", 3)
+    @register_check("geolocation", "Geolocation", "Privacy", cost="exec", needs=("units",),
+                    on_error=("green", "N/A", 3))
+    def check_geolocation(self, probe: CheckProbe):
+        if probe.data("units").get("geoclue.service") == "active":
+            return "yellow", "Service active"
+        return "green", "Disabled"
 
-    def check_clipboard_monitor(self) -> SecurityCheck:
+    @register_check("clipboard_monitor", "Clipboard Monitor", "Privacy", needs=("processes",),
+                    on_error=("green", "N/A", 3))
+    def check_clipboard_monitor(self, probe: CheckProbe):
         """Check for clipboard monitoring applications."""
+        monitor = re.compile(r"clipman|clipboard|parcellite")
+        if any(monitor.search(cmd) for cmd in probe.data("processes")):
+            return "yellow", "Active"
+        return "green", "None active", 3
+
+    def run_local_checks(self, generation: Optional[ScanGeneration] = None) -> Optional[List[SecurityCheck]]:
+        start = time.perf_counter()
+        self.system.begin_scan()
+        checks = self.engine.run(("cheap", "exec"), self.system.clock(), generation)
+        # an unchanged DNS posture costs two stats: show this pass's row now
+        # rather than the previous pass's until the network phase merges
+        if checks is not None and self.dns_engine.fresh():
+            checks.append(self.engine.run_one("dns", generation))
+        self.metrics.observe_scan("local", time.perf_counter() - start)
+        return checks
+
+    def run_network_checks(self, generation: Optional[ScanGeneration] = None) -> Optional[List[SecurityCheck]]:
+        start = time.perf_counter()
+        checks = self.engine.run(("network",), self.system.clock(), generation)
+        self.metrics.observe_scan("network", time.perf_counter() - start)
+        return checks
+
+    def scan_local(self) -> ScanGeneration:
+        """Start a new generation, replace the results with its local pass and rescore.
+
+        Runs the checks on the calling thread; the window uses
+        ``run_local_checks``/``apply_local_checks`` from its scan worker.
+
+        Network results of the previous generation are carried over until
+        this generation's arrive, so the list never loses rows.
+        """
+        generation = self.new_generation()
+        self.apply_local_checks(self.run_local_checks(generation), generation)
+        return generation
+
+    def apply_local_checks(self, checks: Optional[List[SecurityCheck]],
+                           generation: Optional[ScanGeneration] = None) -> bool:
+        """Replace the results with a local pass and rescore.
+
+        Results of a superseded generation are dropped; returns whether they
+        were applied.
+        """
+        if checks is None or (generation is not None and generation is not self.generation):
+            return False
+        self.checks = self._ordered(self.checks, checks)
+        self.score = self.calculate_score()
+        self.calculate_stats()
+        self.scan_time = time.strftime("%H:%M:%S")
+        # replays return the recorded snapshot and have no sampler to call
+        snapshot = self.resource_sampler.snapshot if self.resource_sampler is not None else None
         try:
-            clipboard_procs = self._run("ps aux | grep -E 'clipman|clipboard|parcellite' | grep -v grep | wc -l")
-            if clipboard_procs and int(clipboard_procs) > 0:
-                return SecurityCheck("Clipboard Monitor", "yellow", "Active", "Privacy", 2)
-            return SecurityCheck("Clipboard Monitor", "green", "None active", "Privacy", 3)
-        except Exception:
-            return SecurityCheck("Clipboard Monitor", "green", "N/A", "Privacy", 3)
-
-    def run_local_checks(self) -> List[SecurityCheck]:
-        return [
-            # Network - Priority 1 (Critical)
-            self.check_vpn(),
-            self.check_tor(),
-            self.check_dns(),
-            self.check_webrtc_leak(),
-            self.check_firewall(),
-            # Network - Priority 2 (Important)
-            self.check_open_ports(),
-            self.check_active_connections(),
-            # System - Priority 1
-            self.check_updates(),
-            self.check_suspicious_processes(),
-            # System - Priority 2
-            self.check_ssh(),
-            self.check_auto_updates(),
-            self.check_disk_encryption(),
-            self.check_selinux(),
-            # Privacy - Priority 1
-            self.check_bluetooth(),
-            self.check_screen_sharing(),
-            # Privacy - Priority 2
-            self.check_mac_randomization(),
-            self.check_hostname(),
-            self.check_history(),
-            self.check_webcam(),
-            self.check_geolocation(),
-            self.check_clipboard_monitor(),
-            self.check_browser_privacy(),
-        ]
+            self.resources = self.system.call("resources", snapshot)
+        except OSError:
+            self.resources = None   # archive recorded before resource sampling
+        return True
+
+    def refresh_check(self, check_id: str) -> bool:
+        """Re-run one check outside the scan cycle; True if its row changed."""
+        result = self.engine.run_one(check_id, self.generation)
+        if result in self.checks:
+            return False
+        self.checks = self._ordered(self.checks, [result])
+        self.score = self.calculate_score()
+        self.calculate_stats()
+        return True
 
-    def run_network_checks(self) -> List[SecurityCheck]:
-        return [self.check_public_ip()]
+    @staticmethod
+    def _ordered(*groups: Iterable[SecurityCheck]) -> List[SecurityCheck]:
+        """One result per check id (later groups win), in registry order."""
+        by_id = {c.id: c for group in groups for c in group}
+        order = [s.id for s in CheckEngine.specs(CHECK_COSTS) if s.id in by_id]
+        return [by_id[i] for i in order]
+
+    def merge_network_checks(self, net_checks: Optional[List[SecurityCheck]],
+                             generation: Optional[ScanGeneration] = None) -> bool:
+        """Replace network results by check id and rescore.
+
+        Results of a superseded generation are dropped; returns whether the
+        merge happened.
+        """
+        if net_checks is None or (generation is not None and generation is not self.generation):
+            return False
+        self.checks = self._ordered(self.checks, net_checks)
+        self.score = self.calculate_score()
+        self.calculate_stats()
+        self.history.append(time.time(), self.checks)
+        self.system.checkpoint()
+        return True
 
     def calculate_score(self) -> int:
         if not self.checks:
             return 0
-        weights = {"green": 100, "yellow": 50, "red": 0}
-        
         # Priority weighting: priority 1 = 2x weight, priority 2 = 1.5x, priority 3 = 1x
         total_weighted = 0
         total_weight = 0
         
         for check in self.checks:
             weight_multiplier = {1: 2.0, 2: 1.5, 3: 1.0}.get(check.priority, 1.0)
-            check_score = weights.get(check.status, 0)
+            check_score = STATUS_SCORES[check.status]
             total_weighted += check_score * weight_multiplier
             total_weight += 100 * weight_multiplier
         
@@ -518,18 +2321,12 @@ class SecurityScanner:
     def calculate_stats(self):
         """Calculate comprehensive statistics."""
         self.stats.total_checks = len(self.checks)
-        self.stats.green_count = sum(1 for c in self.checks if c.status == "green")
-        self.stats.yellow_count = sum(1 for c in self.checks if c.status == "yellow")
-        self.stats.red_count = sum(1 for c in self.checks if c.status == "red")
-        
-        # Threat level
-        score = self.score
-        if score >= 80:
-            self.stats.threat_level = "SECURE"
-        elif score >= 50:
-            self.stats.threat_level = "CAUTION"
-        else:
-            self.stats.threat_level = "COMPROMISED"
+        counts = [0, 0, 0]
+        for c in self.checks:
+            counts[c.status] += 1
+        self.stats.green_count, self.stats.yellow_count, self.stats.red_count = counts
+        
+        self.stats.threat_level = threat_level(self.score)
         
         # VPN uptime
         if self.vpn_start_time:
@@ -555,15 +2352,14 @@ class SecurityScanner:
         
         worst_section = None
         worst_score = 101
-        weights = {"green": 100, "yellow": 50, "red": 0}
         
         for section, statuses in sections.items():
-            avg = sum(weights.get(s, 0) for s in statuses) / len(statuses)
+            avg = sum(STATUS_SCORES[s] for s in statuses) / len(statuses)
             if avg < worst_score:
                 worst_score = avg
                 worst_section = section
         
-        return worst_section or "None"
+        return str(worst_section) if worst_section is not None else "None"
 
 
 # ---------------------------------------------------------------------------
@@ -582,13 +2378,38 @@ class CyberpunkFrame:
     COMPACT_WIDTH = 280
     COMPACT_HEIGHT = 90  # Reduced height for horizontal layout
     EXPANDED_WIDTH = 320
+    FLEET_WIDTH = 360
+    FLEET_HOST_ROWS = 15
+    FLEET_CHECK_ROWS = 10
+    LAYER_CACHE_BYTES = 32 << 20  # rasterized layers, all scales together
+    GRAPH_HEIGHT = 36
     
     def __init__(self):
         self.width = self.EXPANDED_WIDTH
         self._cached_height = 600
-        self.scan_line_offset = 0  # For animated scan effect
+        self._pulses: Dict[str, List[Tuple[float, float, float]]] = {}  # red dots per view
+        self._pulse_sink: Optional[List[Tuple[float, float, float]]] = None
+        self.scale = 1.0  # widget scale factor; used when the target has no device scale
+        self._layers: "OrderedDict[tuple, Any]" = OrderedDict()
+        self._layer_bytes = 0
+        self.layer_hits = 0
+        self.layer_misses = 0
+        self._graph_rect: Optional[Tuple[float, float, float, float]] = None
+    
+    def set_scale(self, scale: float) -> bool:
+        """Track the widget's scale factor; returns True if it changed.
+
+        Layers rasterized at other scales stay cached, so moving between a
+        1x and a 2x monitor does not re-render either.
+        """
+        scale = float(scale) or 1.0
+        if scale == self.scale:
+            return False
+        self.scale = scale
+        return True
     
-    def measure_height(self, checks: List[SecurityCheck], expanded: bool = True) -> int:
+    def measure_height(self, checks: List[SecurityCheck], expanded: bool = True,
+                       graph: bool = False, resources: int = 0) -> int:
         """Calculate total height needed."""
         if not expanded:
             return self.COMPACT_HEIGHT
@@ -605,6 +2426,10 @@ class CyberpunkFrame:
                 y += 30  # section header
             y += self.LINE_HEIGHT
         
+        if resources:
+            y += 32 + resources * self.LINE_HEIGHT  # section label + resource rows
+        if graph:
+            y += 32 + self.GRAPH_HEIGHT + 4  # section label + throughput graph
         y += 50  # footer + powered by
         y += self.PADDING
         self._cached_height = max(y, 200)
@@ -614,6 +2439,55 @@ class CyberpunkFrame:
     def height(self):
         return self._cached_height
     
+    # -- layer cache ------------------------------------------------------
+    
+    def _device_scale(self, cr) -> float:
+        # GTK hands draw functions a target already scaled to the monitor
+        try:
+            return cr.get_target().get_device_scale()[0] or self.scale
+        except (AttributeError, TypeError, cairo.Error):
+            return self.scale
+    
+    def _paint_layer(self, cr, slot: tuple, content: tuple, w: int, h: int,
+                     render: Callable[[Any], None]):
+        """Replace the (w, h) area with a layer, rendering it only when needed.
+
+        Each ``slot`` (a view or background) keeps one raster per device
+        scale, reused while ``content`` -- everything ``render`` draws --
+        is unchanged.  Layers are drawn in logical pixels onto an image
+        surface of w*scale x h*scale.
+        """
+        scale = self._device_scale(cr)
+        key = slot + (w, h, scale)
+        cached = self._layers.get(key)
+        if cached is not None and cached[0] == content:
+            self.layer_hits += 1
+            self._layers.move_to_end(key)
+            surface = cached[1]
+        else:
+            self.layer_misses += 1
+            if cached is not None:
+                self._layer_bytes -= cached[1].get_stride() * cached[1].get_height()
+            surface = cairo.ImageSurface(cairo.FORMAT_ARGB32, math.ceil(w * scale), math.ceil(h * scale))
+            surface.set_device_scale(scale, scale)
+            render(cairo.Context(surface))
+            surface.flush()
+            self._layers[key] = (content, surface)
+            self._layers.move_to_end(key)
+            self._layer_bytes += surface.get_stride() * surface.get_height()
+            while self._layer_bytes > self.LAYER_CACHE_BYTES and len(self._layers) > 1:
+                _key, (_content, old) = self._layers.popitem(last=False)
+                self._layer_bytes -= old.get_stride() * old.get_height()
+        cr.save()
+        cr.set_operator(cairo.OPERATOR_SOURCE)
+        cr.set_source_surface(surface, 0, 0)
+        cr.paint()
+        cr.restore()
+    
+    def clear_layers(self):
+        self._layers.clear()
+        self._layer_bytes = 0
+    
     # -- drawing primitives -----------------------------------------------
     
     @staticmethod
@@ -730,7 +2604,9 @@ class CyberpunkFrame:
     
     def _draw_dot(self, cr, cx, cy, status, radius=4, priority=1):
         """Draw colored status dot with glow (enhanced for priority)."""
-        color = STATUS_COLORS.get(status, COLORS["accent"])
+        color = STATUS_COLORS[status]
+        if status == Status.RED and self._pulse_sink is not None:
+            self._pulse_sink.append((cx, cy, radius))
         
         # Larger glow for priority 1 items
         glow_radius = radius + (5 if priority == 1 else 3)
@@ -833,34 +2709,14 @@ class CyberpunkFrame:
             cr.move_to(x + w - extents.width - 5, text_y)
             cr.show_text(uptime_text)
     
-    def _draw_digital_number(self, cr, x, y, number, size, color):
-        """Draw number with digital display effect."""
-        # Shadow/glow
-        self._set_color(cr, color, 0.3)
-        cr.move_to(x + 2, y + 2)
-        cr.show_text(str(number))
-        
-        # Main number
-        self._set_color(cr, color, 1.0)
-        cr.move_to(x, y)
-        cr.show_text(str(number))
-    
-    # -- main draw methods ------------------------------------------------
+    def _draw_panel(self, cr, w, h, alpha=0.94):
+        """Clear the surface and draw the framed background shared by all views."""
+        self._paint_layer(cr, ("panel", alpha), (), w, h, lambda lc: self._render_panel(lc, w, h, alpha))
     
-    def draw_compact(self, cr, score: int, stats: HUDStats, scan_time: str, checks: List[SecurityCheck]):
-        """Draw compact view - actionable info showing what to fix."""
-        w = self.COMPACT_WIDTH
-        h = self.COMPACT_HEIGHT
-        
-        # clear
-        cr.set_operator(cairo.OPERATOR_SOURCE)
-        cr.set_source_rgba(0, 0, 0, 0)
-        cr.paint()
-        cr.set_operator(cairo.OPERATOR_OVER)
-        
+    def _render_panel(self, cr, w, h, alpha):
         # background fill
         self._draw_beveled_rect(cr, 2, 2, w - 4, h - 4)
-        self._set_color(cr, COLORS["bg_dark"], 0.95)
+        self._set_color(cr, COLORS["bg_dark"], alpha)
         cr.fill()
         
         # hex grid
@@ -887,6 +2743,32 @@ class CyberpunkFrame:
         cr.clip()
         self._draw_scanlines(cr, w, h)
         cr.restore()
+    
+    def _draw_digital_number(self, cr, x, y, number, size, color):
+        """Draw number with digital display effect."""
+        # Shadow/glow
+        self._set_color(cr, color, 0.3)
+        cr.move_to(x + 2, y + 2)
+        cr.show_text(str(number))
+        
+        # Main number
+        self._set_color(cr, color, 1.0)
+        cr.move_to(x, y)
+        cr.show_text(str(number))
+    
+    # -- main draw methods ------------------------------------------------
+    
+    def draw_compact(self, cr, score: int, stats: HUDStats, scan_time: str, checks: List[SecurityCheck]):
+        """Draw compact view - actionable info showing what to fix."""
+        content = (score, astuple(stats), scan_time, tuple(checks))
+        self._paint_layer(cr, ("compact",), content, self.COMPACT_WIDTH, self.COMPACT_HEIGHT,
+                          lambda lc: self._render_compact(lc, score, stats, scan_time, checks))
+    
+    def _render_compact(self, cr, score, stats, scan_time, checks):
+        w = self.COMPACT_WIDTH
+        h = self.COMPACT_HEIGHT
+        
+        self._draw_panel(cr, w, h, alpha=0.95)
         
         # --- content - ACTIONABLE LAYOUT ---
         cr.select_font_face("monospace", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
@@ -959,35 +2841,35 @@ class CyberpunkFrame:
         
         # First, look for Priority 1 reds
         for check in checks:
-            if check.priority == 1 and check.status == "red":
+            if check.priority == 1 and check.status == Status.RED:
                 worst_issue = check
                 break
         
         # If no P1 reds, look for P1 yellows
         if not worst_issue:
             for check in checks:
-                if check.priority == 1 and check.status == "yellow":
+                if check.priority == 1 and check.status == Status.YELLOW:
                     worst_issue = check
                     break
         
         # If still nothing, just find first red
         if not worst_issue:
             for check in checks:
-                if check.status == "red":
+                if check.status == Status.RED:
                     worst_issue = check
                     break
         
         # If still nothing, find first yellow
         if not worst_issue:
             for check in checks:
-                if check.status == "yellow":
+                if check.status == Status.YELLOW:
                     worst_issue = check
                     break
         
         # Display the issue (or "ALL GOOD")
         cr.set_font_size(8)
         if worst_issue:
-            issue_color = STATUS_COLORS.get(worst_issue.status, COLORS["text"])
+            issue_color = STATUS_COLORS[worst_issue.status]
             self._set_color(cr, issue_color, 0.85)
             
             # Shorten name if needed
@@ -1023,46 +2905,35 @@ class CyberpunkFrame:
         cr.move_to((w - extents.width) / 2, y)
         cr.show_text(powered)
     
-    def draw_expanded(self, cr, checks: List[SecurityCheck], score: int, stats: HUDStats, scan_time: str):
-        """Draw expanded view - comprehensive dashboard."""
+    def draw_expanded(self, cr, checks: List[SecurityCheck], score: int, stats: HUDStats, scan_time: str,
+                      throughput: Optional[Tuple[str, List[float], List[float]]] = None,
+                      resources: tuple = ()):
+        """Draw expanded view - comprehensive dashboard.
+
+        ``throughput`` is (interface, rx rates, tx rates) for the live graph;
+        only its frame is part of the cached layer, the lines are drawn on top.
+        ``resources`` are the rows from ``resource_rows``.
+        """
+        graph = throughput is not None
+        content = (score, astuple(stats), scan_time, tuple(checks), graph, resources)
+        self._paint_layer(cr, ("expanded",), content, self.width, self.height,
+                          lambda lc: self._render_expanded(lc, checks, score, stats, scan_time, graph, resources))
+        if graph and self._graph_rect is not None:
+            self.draw_throughput(cr, *throughput)
+    
+    def _render_expanded(self, cr, checks, score, stats, scan_time, graph=False, resources=()):
+        # red dot positions are kept with the cached layer for draw_overlay
+        self._pulse_sink = self._pulses["expanded"] = []
+        try:
+            self._render_expanded_content(cr, checks, score, stats, scan_time, graph, resources)
+        finally:
+            self._pulse_sink = None
+    
+    def _render_expanded_content(self, cr, checks, score, stats, scan_time, graph=False, resources=()):
         w = self.width
         h = self.height
         
-        # clear
-        cr.set_operator(cairo.OPERATOR_SOURCE)
-        cr.set_source_rgba(0, 0, 0, 0)
-        cr.paint()
-        cr.set_operator(cairo.OPERATOR_OVER)
-        
-        # background fill
-        self._draw_beveled_rect(cr, 2, 2, w - 4, h - 4)
-        self._set_color(cr, COLORS["bg_dark"], 0.94)
-        cr.fill()
-        
-        # hex grid
-        cr.save()
-        self._draw_beveled_rect(cr, 2, 2, w - 4, h - 4)
-        cr.clip()
-        self._draw_hex_grid(cr, w, h)
-        cr.restore()
-        
-        # inner panel
-        self._draw_beveled_rect(cr, 6, 6, w - 12, h - 12, cut=self.CORNER_CUT - 4)
-        self._set_color(cr, COLORS["bg_panel"], 0.6)
-        cr.fill()
-        
-        # glow frame
-        self._draw_glow_frame(cr, 2, 2, w - 4, h - 4)
-        
-        # corner lights
-        self._draw_corner_lights(cr, 2, 2, w - 4, h - 4, self.CORNER_CUT)
-        
-        # scanlines
-        cr.save()
-        self._draw_beveled_rect(cr, 2, 2, w - 4, h - 4)
-        cr.clip()
-        self._draw_scanlines(cr, w, h)
-        cr.restore()
+        self._draw_panel(cr, w, h)
         
         # --- content ---
         cr.select_font_face("monospace", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
@@ -1146,7 +3017,7 @@ class CyberpunkFrame:
                 # section label
                 cr.set_font_size(10)
                 self._set_color(cr, COLORS["accent"], 0.6)
-                section_label = f"// {check.section.upper()}"
+                section_label = f"// {str(check.section).upper()}"
                 cr.move_to(pad + 8, y)
                 cr.show_text(section_label)
                 y += 10
@@ -1184,13 +3055,57 @@ class CyberpunkFrame:
                 cr.show_text(dots)
             
             # detail text
-            detail_color = STATUS_COLORS.get(check.status, COLORS["text"])
+            detail_color = STATUS_COLORS[check.status]
             self._set_color(cr, detail_color, 0.85 if check.priority == 1 else 0.75)
             cr.move_to(detail_x, y + 10)
             cr.show_text(detail)
             
             y += self.LINE_HEIGHT
         
+        # --- resources: usage bars, not part of the score ---
+        if resources:
+            y = self._draw_section_label(cr, pad, y, w, "// RESOURCES")
+            cr.set_font_size(self.BODY_FONT_SIZE)
+            bar_x, bar_w = pad + 86, w - 2 * pad - 200
+            for label, pct, detail, status in resources:
+                self._draw_dot(cr, pad + 10, y + 6, status, radius=3.5, priority=2)
+                self._set_color(cr, COLORS["text"], 0.85)
+                cr.move_to(pad + 22, y + 10)
+                cr.show_text(label[:10])
+                self._set_color(cr, COLORS["grid"], 0.8)
+                cr.rectangle(bar_x, y + 3, bar_w, 6)
+                cr.fill()
+                self._set_color(cr, STATUS_COLORS[status], 0.75)
+                cr.rectangle(bar_x, y + 3, bar_w * min(max(pct, 0.0), 100.0) / 100, 6)
+                cr.fill()
+                cr.set_font_size(9)
+                extents = cr.text_extents(detail)
+                self._set_color(cr, STATUS_COLORS[status], 0.8)
+                cr.move_to(w - pad - 8 - extents.width, y + 10)
+                cr.show_text(detail)
+                cr.set_font_size(self.BODY_FONT_SIZE)
+                y += self.LINE_HEIGHT
+        
+        # --- throughput graph frame (lines are drawn live by draw_throughput) ---
+        self._graph_rect = None
+        if graph:
+            y = self._draw_section_label(cr, pad, y, w, "// THROUGHPUT")
+            gx, gw, gh = pad + 8, w - 2 * pad - 16, self.GRAPH_HEIGHT
+            self._set_color(cr, COLORS["bg_dark"], 0.6)
+            cr.rectangle(gx, y, gw, gh)
+            cr.fill()
+            self._set_color(cr, COLORS["grid"], 0.8)
+            cr.set_line_width(0.5)
+            for i in range(1, 3):
+                cr.move_to(gx, y + gh * i / 3)
+                cr.line_to(gx + gw, y + gh * i / 3)
+            cr.stroke()
+            self._set_color(cr, COLORS["accent"], 0.25)
+            cr.rectangle(gx + 0.5, y + 0.5, gw - 1, gh - 1)
+            cr.stroke()
+            self._graph_rect = (gx, y, gw, gh)
+            y += gh + 4
+        
         # --- footer ---
         y += 10
         self._set_color(cr, COLORS["accent"], 0.2)
@@ -1234,27 +3149,522 @@ class CyberpunkFrame:
         extents = cr.text_extents(hint)
         cr.move_to((w - extents.width) / 2, y)
         cr.show_text(hint)
+    
+    def draw_throughput(self, cr, iface: str, rx: List[float], tx: List[float]):
+        """Live rx/tx lines inside the graph frame of the cached expanded layer."""
+        x, y, w, h = self._graph_rect
+        cr.select_font_face("monospace", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+        cr.set_font_size(8)
+        if not rx:
+            self._set_color(cr, COLORS["dim"], 0.6)
+            cr.move_to(x + 4, y + 10)
+            cr.show_text("sampling...")
+            return
+        peak = max(max(rx), max(tx), 1024.0)
+        step = w / (THROUGHPUT_HISTORY - 1)
+        x0 = x + w - step * (len(rx) - 1)   # newest sample at the right edge
+        cr.save()
+        cr.rectangle(x, y, w, h)
+        cr.clip()
+        cr.set_line_width(1)
+        for series, color, alpha in ((rx, COLORS["accent"], 0.85), (tx, COLORS["yellow"], 0.7)):
+            cr.move_to(x0, y + h - 1 - series[0] / peak * (h - 4))
+            for i in range(1, len(series)):
+                cr.line_to(x0 + i * step, y + h - 1 - series[i] / peak * (h - 4))
+            self._set_color(cr, color, alpha)
+            cr.stroke()
+        cr.restore()
+        self._set_color(cr, COLORS["text"], 0.7)
+        cr.move_to(x + 4, y + 10)
+        cr.show_text(iface)
+        rates = f"↓{format_rate(rx[-1])} ↑{format_rate(tx[-1])}  peak {format_rate(peak)}/s"
+        extents = cr.text_extents(rates)
+        cr.move_to(x + w - extents.width - 4, y + 10)
+        cr.show_text(rates)
+    
+    def draw_overlay(self, cr, view: str, w: int, h: int,
+                     sweep: Optional[float], pulse: Optional[float]):
+        """Animated effects composited over a cached view (see FrameAnimator).
+
+        ``sweep`` is the scanline position (0..1 down the panel) and
+        ``pulse`` the phase (0..1) of the rings around red status dots;
+        None skips the effect.
+        """
+        if sweep is not None:
+            cr.save()
+            self._draw_beveled_rect(cr, 2, 2, w - 4, h - 4)
+            cr.clip()
+            y = 6 + sweep * (h - 12)
+            trail = cairo.LinearGradient(0, y - 14, 0, y)
+            trail.add_color_stop_rgba(0, *COLORS["accent"], 0)
+            trail.add_color_stop_rgba(1, *COLORS["accent"], 0.12)
+            cr.set_source(trail)
+            cr.rectangle(0, y - 14, w, 14)
+            cr.fill()
+            self._set_color(cr, COLORS["accent_bright"], 0.45)
+            cr.rectangle(6, y, w - 12, 1)
+            cr.fill()
+            cr.restore()
+        if pulse is not None:
+            cr.set_line_width(1.5)
+            for cx, cy, radius in self._pulses.get(view, ()):
+                self._set_color(cr, STATUS_COLORS[Status.RED], 0.6 * (1 - pulse))
+                cr.arc(cx, cy, radius + 2 + 7 * pulse, 0, 2 * math.pi)
+                cr.stroke()
+    
+    def measure_fleet_height(self, summary: "FleetSummary") -> int:
+        y = self.PADDING + 40  # header
+        y += 30  # stats bar
+        y += 32 + self.LINE_HEIGHT * max(1, min(len(summary.hosts), self.FLEET_HOST_ROWS))
+        y += 32 + self.LINE_HEIGHT * min(len(summary.checks), self.FLEET_CHECK_ROWS)
+        y += 40  # footer
+        y += self.PADDING
+        return max(y, 200)
+
+    def _draw_section_label(self, cr, pad, y, w, label):
+        y += 8
+        self._draw_pcb_divider(cr, pad, y, w - 2 * pad)
+        y += 14
+        cr.set_font_size(10)
+        self._set_color(cr, COLORS["accent"], 0.6)
+        cr.move_to(pad + 8, y)
+        cr.show_text(label)
+        return y + 10
+
+    def draw_fleet(self, cr, summary: "FleetSummary", address: str):
+        """Draw the collector view: worst hosts first, then per-check counts."""
+        w = self.FLEET_WIDTH
+        h = self.measure_fleet_height(summary)
+        self._draw_panel(cr, w, h)
+
+        cr.select_font_face("monospace", cairo.FONT_SLANT_NORMAL, cairo.FONT_WEIGHT_BOLD)
+        pad = self.PADDING
+        y = pad
+
+        # header
+        cr.set_font_size(self.HEADER_FONT_SIZE)
+        self._set_color(cr, COLORS["accent"], 0.9)
+        text = "TRACE LABS // FLEET"
+        extents = cr.text_extents(text)
+        y += 18
+        cr.move_to((w - extents.width) / 2, y)
+        cr.show_text(text)
+        y += 8
+        self._set_color(cr, COLORS["accent"], 0.4)
+        cr.set_line_width(1)
+        cr.move_to(pad + 10, y)
+        cr.line_to(w / 2 - 12, y)
+        cr.stroke()
+        cr.move_to(w / 2 + 12, y)
+        cr.line_to(w - pad - 10, y)
+        cr.stroke()
+        self._set_color(cr, COLORS["accent"], 0.6)
+        self._draw_diamond(cr, w / 2, y, 5)
+        y += 12
+
+        # threat level + SECURE/CAUTION/COMPROMISED host counts
+        self._draw_stats_bar(cr, pad, y, w - 2 * pad, summary.stats)
+        cr.set_font_size(9)
+        self._set_color(cr, COLORS["text"], 0.7)
+        hosts_text = f"{len(summary.hosts)} HOSTS"
+        extents = cr.text_extents(hosts_text)
+        cr.move_to(w - pad - extents.width - 5, y + 13)
+        cr.show_text(hosts_text)
+        y += 26
+
+        # --- hosts, worst first ---
+        label = "// HOSTS"
+        if summary.stale:
+            label += f"  ({summary.stale} stale)"
+        y = self._draw_section_label(cr, pad, y, w, label)
+        cr.set_font_size(self.BODY_FONT_SIZE)
+        if not summary.hosts:
+            self._set_color(cr, COLORS["dim"], 0.7)
+            cr.move_to(pad + 10, y + 10)
+            cr.show_text(f"waiting for senders on {address}")
+            y += self.LINE_HEIGHT
+        for host, score, threat, red, stale in summary.hosts[:self.FLEET_HOST_ROWS]:
+            status = Status.GREEN if threat == "SECURE" else Status.YELLOW if threat == "CAUTION" else Status.RED
+            self._draw_dot(cr, pad + 10, y + 6, status, radius=3.5, priority=1 if status == Status.RED else 2)
+            self._set_color(cr, COLORS["dim"] if stale else COLORS["text"], 0.9)
+            cr.move_to(pad + 22, y + 10)
+            cr.show_text(host[:24])
+            detail = f"{red}R  {score:3d}" + ("  STALE" if stale else "")
+            extents = cr.text_extents(detail)
+            self._set_color(cr, STATUS_COLORS[status], 0.5 if stale else 0.85)
+            cr.move_to(w - pad - 8 - extents.width, y + 10)
+            cr.show_text(detail)
+            y += self.LINE_HEIGHT
+
+        # --- per-check counts across the fleet ---
+        y = self._draw_section_label(cr, pad, y, w, "// CHECKS  (G / Y / R)")
+        cr.set_font_size(self.BODY_FONT_SIZE)
+        for name, green, yellow, red in summary.checks[:self.FLEET_CHECK_ROWS]:
+            worst = Status.RED if red else Status.YELLOW if yellow else Status.GREEN
+            self._draw_dot(cr, pad + 10, y + 6, worst, radius=3.5, priority=2)
+            self._set_color(cr, COLORS["text"], 0.85)
+            cr.move_to(pad + 22, y + 10)
+            cr.show_text(name[:22])
+            x = w - pad - 8
+            for count, status in ((red, Status.RED), (yellow, Status.YELLOW), (green, Status.GREEN)):
+                text = str(count)
+                extents = cr.text_extents(text)
+                x -= 30
+                self._set_color(cr, STATUS_COLORS[status], 0.85 if count else 0.3)
+                cr.move_to(x + 30 - extents.width, y + 10)
+                cr.show_text(text)
+            y += self.LINE_HEIGHT
+
+        # --- footer ---
+        y += 10
+        self._set_color(cr, COLORS["accent"], 0.2)
+        cr.set_line_width(1)
+        cr.move_to(pad + 20, y)
+        cr.line_to(w - pad - 20, y)
+        cr.stroke()
+        y += 14
+        cr.set_font_size(9)
+        self._set_color(cr, COLORS["dim"], 0.7)
+        footer = f"COLLECTOR {address} • {summary.stats.last_scan}"
+        extents = cr.text_extents(footer)
+        cr.move_to((w - extents.width) / 2, y)
+        cr.show_text(footer)
+
+
+# ---------------------------------------------------------------------------
+# Animation
+# ---------------------------------------------------------------------------
+
+class FrameAnimator:
+    """Short animation bursts driven by the widget's frame clock.
+
+    A scan triggers one scanline sweep, and red checks pulse for a few
+    seconds; then the tick callback is removed, so an idle HUD does no
+    per-frame work at all.  Each animated frame only composites the
+    overlay over cached layers.  Frames that take longer than
+    FRAME_BUDGET step the frame rate down, and animation is switched off
+    for good once the slowest rate cannot keep up (e.g. software
+    rendering on a loaded VM).
+    """
+
+    FRAME_BUDGET = 0.008       # seconds of drawing per animated frame
+    FRAME_RATES = (60, 30, 15)
+    SLOW_FRAMES = 3            # consecutive over-budget frames before degrading
+    SWEEP_SECONDS = 1.2
+    PULSE_SECONDS = 6.0
+    PULSE_PERIOD = 1.5
+
+    def __init__(self, widget, visible: Callable[[], bool]):
+        self.widget = widget
+        self.visible = visible
+        self.level = 0
+        self.enabled = True
+        self.sweep: Optional[float] = None
+        self.pulse: Optional[float] = None
+        self._tick_id: Optional[int] = None
+        self._sweep_until = 0.0
+        self._pulse_until = 0.0
+        self._last_frame = 0.0
+        self._slow = 0
+        self.frames = 0
+        self.slowest = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._tick_id is not None
+
+    def kick(self, sweep: bool = False, pulse: bool = False):
+        """Start (or extend) a burst."""
+        if not self.enabled or not (sweep or pulse) or not self.visible():
+            return
+        now = time.monotonic()
+        if sweep:
+            self._sweep_until = now + self.SWEEP_SECONDS
+        if pulse:
+            self._pulse_until = now + self.PULSE_SECONDS
+        if self._tick_id is None:
+            self._last_frame = 0.0
+            self._tick_id = self.widget.add_tick_callback(self._on_tick)
+
+    def stop(self, *args):
+        if self._tick_id is not None:
+            self.widget.remove_tick_callback(self._tick_id)
+            self._tick_id = None
+        if self.sweep is not None or self.pulse is not None:
+            self.sweep = self.pulse = None
+            self.widget.queue_draw()  # leave the static frame behind
+
+    def _on_tick(self, widget, frame_clock) -> bool:
+        now = frame_clock.get_frame_time() / 1e6
+        mono = time.monotonic()
+        if not self.visible() or mono >= max(self._sweep_until, self._pulse_until):
+            self._tick_id = None
+            self.stop()
+            return False
+        if now - self._last_frame < 1.0 / self.FRAME_RATES[self.level]:
+            return True
+        self._last_frame = now
+        remaining = self._sweep_until - mono
+        self.sweep = 1 - remaining / self.SWEEP_SECONDS if remaining > 0 else None
+        self.pulse = (mono % self.PULSE_PERIOD) / self.PULSE_PERIOD if mono < self._pulse_until else None
+        widget.queue_draw()
+        return True
+
+    def record(self, seconds: float):
+        """Report how long an animated frame took to draw."""
+        if not self.active:
+            return
+        self.frames += 1
+        self.slowest = max(self.slowest, seconds)
+        if seconds <= self.FRAME_BUDGET:
+            self._slow = 0
+            return
+        self._slow += 1
+        if self._slow < self.SLOW_FRAMES:
+            return
+        self._slow = 0
+        if self.level + 1 < len(self.FRAME_RATES):
+            self.level += 1
+        else:
+            self.enabled = False
+            self.stop()
+
+
+# ---------------------------------------------------------------------------
+# Adaptive refresh scheduling
+# ---------------------------------------------------------------------------
+
+class AdaptiveRefresh:
+    """Picks the next scan interval from posture volatility and session state.
+
+    Any status flip snaps the interval to ``MIN_INTERVAL``; it then doubles
+    back to ``BASE_INTERVAL`` and, after ``STABLE_ROUNDS`` unchanged scans,
+    keeps doubling up to ``MAX_INTERVAL``.  Hidden windows and idle/locked
+    sessions are polled at ``IDLE_INTERVAL`` with low priority.
+    """
+
+    MIN_INTERVAL = 15
+    BASE_INTERVAL = 60
+    MAX_INTERVAL = 600
+    IDLE_INTERVAL = 900
+    STABLE_ROUNDS = 5
+
+    def __init__(self):
+        self.interval = self.BASE_INTERVAL
+        self.stable_rounds = 0
+        self._last_signature: Optional[tuple] = None
+
+    def observe(self, checks: List[SecurityCheck]) -> bool:
+        """Record a scan result; returns True if any status flipped."""
+        signature = tuple((c.id, c.status) for c in checks)
+        flipped = self._last_signature is not None and signature != self._last_signature
+        self._last_signature = signature
+        if flipped:
+            self.interval = self.MIN_INTERVAL
+            self.stable_rounds = 0
+            return True
+        self.stable_rounds += 1
+        if self.interval < self.BASE_INTERVAL:
+            self.interval = min(self.BASE_INTERVAL, self.interval * 2)
+        elif self.stable_rounds % self.STABLE_ROUNDS == 0:
+            self.interval = min(self.MAX_INTERVAL, self.interval * 2)
+        return False
+
+    def next_interval(self, visible: bool = True, expanded: bool = True,
+                      idle: bool = False) -> Tuple[int, int]:
+        """Return (seconds, GLib priority) for the next refresh."""
+        if idle or not visible:
+            return max(self.interval, self.IDLE_INTERVAL), GLib.PRIORITY_LOW
+        interval = self.interval if expanded else min(self.MAX_INTERVAL, self.interval * 2)
+        priority = GLib.PRIORITY_DEFAULT if interval <= self.BASE_INTERVAL else GLib.PRIORITY_LOW
+        return interval, priority
+
+
+class SessionMonitor:
+    """Tracks logind IdleHint/LockedHint for the current session without polling."""
+
+    def __init__(self, on_change: Optional[Callable[[], None]] = None):
+        self._proxy = None
+        try:
+            self._proxy = Gio.DBusProxy.new_for_bus_sync(
+                Gio.BusType.SYSTEM, Gio.DBusProxyFlags.NONE, None,
+                "org.freedesktop.login1", "/org/freedesktop/login1/session/auto",
+                "org.freedesktop.login1.Session", None,
+            )
+            if on_change is not None:
+                self._proxy.connect("g-properties-changed", lambda *a: on_change())
+        except Exception:
+            self._proxy = None
+
+    def _hint(self, name: str) -> bool:
+        if self._proxy is None:
+            return False
+        value = self._proxy.get_cached_property(name)
+        return bool(value.unpack()) if value is not None else False
+
+    @property
+    def idle(self) -> bool:
+        return self._hint("IdleHint") or self._hint("LockedHint")
 
 
 # ---------------------------------------------------------------------------
 # GTK4 Window
 # ---------------------------------------------------------------------------
 
-class TraceLabsHUD(Gtk.ApplicationWindow):
-    """Main HUD window with compact/expanded modes."""
+def benchmark_render(iterations: int = 200, scales: Tuple[float, ...] = (1, 2, 3)):
+    """Time offscreen draws of both views at each device scale.
+
+    ``cold`` rasterizes every layer, ``rescan`` is a redraw after a scan
+    (new content over the cached panel), ``cached`` repaints unchanged
+    content.  Prints milliseconds per draw.
+    """
+    specs = CheckEngine.specs(CHECK_COSTS)
+    checks = [SecurityCheck(spec.name, Status(i % 3), "benchmark", spec.section, spec.priority, spec.id)
+              for i, spec in enumerate(specs)]
+    stats = HUDStats(total_checks=len(checks), green_count=8, yellow_count=8, red_count=7,
+                     threat_level="CAUTION", vpn_uptime="1h 2m", last_scan="12:00:00")
+    frame = CyberpunkFrame()
+    print(f"{'view':<9}{'scale':>6}{'cold':>10}{'rescan':>10}{'cached':>10}   (ms/draw)")
+    for expanded in (False, True):
+        if expanded:
+            w, h = frame.EXPANDED_WIDTH, frame.measure_height(checks)
+            draw = lambda cr, t: frame.draw_expanded(cr, checks, 60, stats, t)
+        else:
+            w, h = frame.COMPACT_WIDTH, frame.COMPACT_HEIGHT
+            draw = lambda cr, t: frame.draw_compact(cr, 60, stats, t, checks)
+        for scale in scales:
+            target = cairo.ImageSurface(cairo.FORMAT_ARGB32, math.ceil(w * scale), math.ceil(h * scale))
+            target.set_device_scale(scale, scale)
+            cr = cairo.Context(target)
+            frame.clear_layers()
+            start = time.perf_counter()
+            draw(cr, "12:00:00")
+            cold = time.perf_counter() - start
+            start = time.perf_counter()
+            for i in range(iterations):
+                draw(cr, f"12:{i // 60 % 60:02d}:{i % 60:02d}")
+            rescan = (time.perf_counter() - start) / iterations
+            draw(cr, "12:00:00")
+            start = time.perf_counter()
+            for _ in range(iterations):
+                draw(cr, "12:00:00")
+            cached = (time.perf_counter() - start) / iterations
+            target.flush()
+            print(f"{'expanded' if expanded else 'compact':<9}{scale:>5g}x"
+                  f"{cold * 1e3:>10.2f}{rescan * 1e3:>10.2f}{cached * 1e3:>10.3f}")
+
+
+SOAK_CYCLES = 20000
+SOAK_WARMUP = 500             # cycles before the baseline (pools, caches, interned strings fill)
+SOAK_RSS_GROWTH = 16 << 20    # bytes
+SOAK_TRACED_GROWTH = 4 << 20  # bytes of live Python allocations
+SOAK_FD_GROWTH = 0
+SOAK_THREAD_GROWTH = 0
+
+
+def _process_usage() -> Tuple[int, int, int]:
+    """(RSS bytes, open fds, OS threads) of this process."""
+    with open("/proc/self/statm") as f:
+        rss = int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    fds = len(os.listdir("/proc/self/fd"))
+    with open("/proc/self/status") as f:
+        threads = next(int(line.split()[1]) for line in f if line.startswith("Threads:"))
+    return rss, fds, threads
+
+
+def soak(archive: str, cycles: int = SOAK_CYCLES, report_every: int = 1000,
+         warmup: int = SOAK_WARMUP) -> bool:
+    """Replay ``archive`` in a loop through full scan + draw cycles, checking for leaks.
+
+    Every cycle runs the local and network passes against the looping
+    ReplaySystem and draws both views (new content each cycle, so layers
+    are re-rasterized) plus the throughput graph and animation overlay.
+    After ``warmup`` cycles the RSS, fd count, thread count and
+    tracemalloc total are taken as the baseline; growth beyond the SOAK_*
+    limits at the end fails the run. Prints the per-cycle cost trend.
+    """
+    system = ReplaySystem(archive, loop=True)
+    scanner = SecurityScanner(system)
+    frame = CyberpunkFrame()
+    rates = [float((i * 7919) % 50000) for i in range(THROUGHPUT_HISTORY)]
+    compact = cairo.ImageSurface(cairo.FORMAT_ARGB32, frame.COMPACT_WIDTH, frame.COMPACT_HEIGHT)
+    expanded: Optional[Tuple[int, Any]] = None
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    baseline = None     # (rss, traced, fds, threads) after the warm-up
+    reference = None    # ms/cycle of the first window after the warm-up
+    cost = 0.0
+    window_start, window_cycles = time.perf_counter(), 0
+    print(f"{'cycle':>7}{'ms/cycle':>10}{'rss MiB':>10}{'traced KiB':>12}{'fds':>6}{'threads':>9}")
+    for n in range(1, cycles + 1):
+        generation = scanner.scan_local()
+        scanner.merge_network_checks(scanner.run_network_checks(generation), generation)
+        label = f"#{n}"
+        rows = resource_rows(scanner.resources)
+        height = frame.measure_height(scanner.checks, expanded=True, graph=True, resources=len(rows))
+        if expanded is None or expanded[0] != height:
+            expanded = (height, cairo.ImageSurface(cairo.FORMAT_ARGB32, frame.EXPANDED_WIDTH, height))
+        cr = cairo.Context(compact)
+        frame.draw_compact(cr, scanner.score, scanner.stats, label, scanner.checks)
+        frame.draw_overlay(cr, "compact", frame.COMPACT_WIDTH, frame.COMPACT_HEIGHT, n % 60 / 60, None)
+        cr = cairo.Context(expanded[1])
+        frame.draw_expanded(cr, scanner.checks, scanner.score, scanner.stats, label,
+                            ("eth0", rates, rates[::-1]), rows)
+        frame.draw_overlay(cr, "expanded", frame.EXPANDED_WIDTH, height, n % 60 / 60, n % 30 / 30)
+        del cr
+        window_cycles += 1
+        if n == warmup or n % report_every == 0 or n == cycles:
+            cost = (time.perf_counter() - window_start) / window_cycles * 1e3
+            rss, fds, threads = _process_usage()
+            traced = tracemalloc.get_traced_memory()[0]
+            note = ""
+            if baseline is None and n >= warmup:
+                baseline, note = (rss, traced, fds, threads), "   <- baseline"
+            elif baseline is not None and reference is None:
+                reference = cost
+            print(f"{n:>7}{cost:>10.2f}{rss / (1 << 20):>10.1f}{traced / 1024:>12.0f}"
+                  f"{fds:>6}{threads:>9}{note}", flush=True)
+            window_start, window_cycles = time.perf_counter(), 0
+    rss, fds, threads = _process_usage()
+    traced = tracemalloc.get_traced_memory()[0]
+    scanner.close()
+    if not tracing:
+        tracemalloc.stop()
+    if baseline is None or reference is None:
+        print(f"SEC-HUD: a soak needs more than {warmup} cycles", file=sys.stderr)
+        return False
+    failures = []
+    for name, grown, limit in (("rss", rss - baseline[0], SOAK_RSS_GROWTH),
+                               ("traced", traced - baseline[1], SOAK_TRACED_GROWTH)):
+        if grown > limit:
+            failures.append(f"{name} grew {grown / (1 << 20):.1f} MiB (limit {limit >> 20} MiB)")
+    for name, grown, limit in (("fds", fds - baseline[2], SOAK_FD_GROWTH),
+                               ("threads", threads - baseline[3], SOAK_THREAD_GROWTH)):
+        if grown > limit:
+            failures.append(f"{name} grew by {grown} (limit {limit})")
+    print(f"cost trend: last window {cost / reference:.2f}x the first after warm-up; "
+          f"{system.misses} probes not in the archive")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"PASS: {cycles} cycles within the growth limits")
+    return not failures
+
+
+class FrameWindow(Gtk.ApplicationWindow):
+    """Undecorated window drawn by CyberpunkFrame, with the HUD mouse controls."""
     
-    def __init__(self, app):
-        super().__init__(application=app, title="Trace Labs SEC-HUD")
+    def __init__(self, app, title: str, width: int, height: int):
+        super().__init__(application=app, title=title)
         
-        self.scanner = SecurityScanner()
         self.frame = CyberpunkFrame()
-        self.expanded = False
         
         # window properties
         self.set_decorated(False)
         
         # sizing
-        self.set_default_size(self.frame.COMPACT_WIDTH, self.frame.COMPACT_HEIGHT)
+        self.set_default_size(width, height)
         
         # drawing area
         self.darea = Gtk.DrawingArea()
@@ -1280,17 +3690,16 @@ class TraceLabsHUD(Gtk.ApplicationWindow):
         right_click.connect("pressed", self._on_right_click)
         self.add_controller(right_click)
         
-        # initial scan
-        self._run_scan()
-        
-        # auto-refresh every 60s
-        GLib.timeout_add_seconds(60, self._on_refresh)
+        # HiDPI: layers are cached per scale, so a change only needs a repaint
+        self.frame.set_scale(self.get_scale_factor())
+        self.connect("notify::scale-factor", self._on_scale_changed)
+    
+    def _on_scale_changed(self, *args):
+        if self.frame.set_scale(self.get_scale_factor()):
+            self.darea.queue_draw()
     
     def _on_left_click(self, gesture, n_press, x, y):
-        """Left-click to toggle expand/collapse."""
-        self.expanded = not self.expanded
-        self._update_size()
-        self.darea.queue_draw()
+        pass
     
     def _on_drag_begin(self, gesture, start_x, start_y):
         """Ctrl+Left-drag OR Middle-drag to move window."""
@@ -1329,64 +3738,304 @@ class TraceLabsHUD(Gtk.ApplicationWindow):
         """Right-click to quit."""
         self.get_application().quit()
     
+    def _resize(self, w: int, h: int):
+        self.set_default_size(w, h)
+        self.darea.set_size_request(w, h)
+
+
+class TraceLabsHUD(FrameWindow):
+    """Main HUD window with compact/expanded modes."""
+    
+    def __init__(self, app, system: Optional[LiveSystem] = None):
+        super().__init__(app, "Trace Labs SEC-HUD", CyberpunkFrame.COMPACT_WIDTH, CyberpunkFrame.COMPACT_HEIGHT)
+        
+        self.scanner = SecurityScanner(system)
+        self.expanded = False
+        
+        # adaptive refresh: backs off when stable/hidden/idle, tightens on flips
+        self.refresh = AdaptiveRefresh()
+        self._refresh_source: Optional[int] = None
+        self._refresh_due = 0.0
+        self.session = SessionMonitor(on_change=self._on_session_change)
+        self.connect("map", lambda *a: self._reschedule_if_sooner())
+        self.connect("realize", self._on_realize)
+        
+        # scanline/pulse bursts over the cached layers; idle costs nothing
+        self.animator = FrameAnimator(self.darea, self._is_visible)
+        self.connect("unmap", self.animator.stop)
+        
+        # optional Prometheus/OpenMetrics endpoint, served from a per-scan snapshot
+        self.metrics_exporter: Optional[MetricsExporter] = None
+        address = os.environ.get(METRICS_ENV)
+        if address:
+            try:
+                exporter = MetricsExporter(address)
+                exporter.start()
+                self.metrics_exporter = exporter
+            except (OSError, ValueError) as e:
+                print(f"SEC-HUD: metrics exporter disabled ({address}): {e}", file=sys.stderr)
+        
+        # optional push of each completed scan to a fleet collector
+        self.streamer: Optional[PostureStreamer] = None
+        address = os.environ.get(FLEET_ENV)
+        if address:
+            try:
+                self.streamer = PostureStreamer(address)
+            except ValueError as e:
+                print(f"SEC-HUD: fleet reporting disabled ({address}): {e}", file=sys.stderr)
+        
+        # live throughput graph: redrawn once per sample while expanded and shown
+        self._graph = self.scanner.system.live
+        self._graph_source: Optional[int] = None
+        self._graph_samples = 0
+        self.connect("map", lambda *a: self._update_graph_timer())
+        
+        # Tor pushes bootstrap/circuit events; only the tor row is re-evaluated
+        self._tor_update_pending = False
+        self.scanner.tor_monitor.on_change = self._on_tor_change
+        
+        # one scan worker and one network worker for the window's lifetime;
+        # only the newest generation waits for them, so the GTK thread never
+        # blocks on a check and slow lookups never stack threads
+        self._scan_pending: Optional[ScanGeneration] = None
+        self._scan_wake = threading.Event()
+        threading.Thread(target=self._scan_loop, daemon=True, name="hud-scan").start()
+        self._network_pending: Optional[ScanGeneration] = None
+        self._network_wake = threading.Event()
+        threading.Thread(target=self._network_loop, daemon=True, name="hud-network").start()
+        
+        # initial scan
+        self._run_scan()
+    
+    def _on_left_click(self, gesture, n_press, x, y):
+        """Left-click to toggle expand/collapse."""
+        self.expanded = not self.expanded
+        self._update_size()
+        self.darea.queue_draw()
+        self.animator.kick(pulse=self.expanded and self.scanner.stats.red_count > 0)
+        self._reschedule_if_sooner()
+        self._update_graph_timer()
+    
     def _on_draw(self, area, cr, width, height, user_data=None):
         """Draw callback."""
+        start = time.perf_counter()
         if self.expanded:
+            throughput = None
+            if self._graph:
+                sampler = self.scanner.throughput
+                iface = sampler.graph_iface() or ""
+                throughput = (iface, *sampler.series(iface))
             self.frame.draw_expanded(cr, self.scanner.checks, self.scanner.score, 
-                                    self.scanner.stats, self.scanner.scan_time)
+                                    self.scanner.stats, self.scanner.scan_time, throughput,
+                                    resource_rows(self.scanner.resources))
         else:
             self.frame.draw_compact(cr, self.scanner.score, self.scanner.stats, 
                                    self.scanner.scan_time, self.scanner.checks)
+        if self.animator.active:
+            view = "expanded" if self.expanded else "compact"
+            w = self.frame.width if self.expanded else self.frame.COMPACT_WIDTH
+            h = self.frame.height if self.expanded else self.frame.COMPACT_HEIGHT
+            self.frame.draw_overlay(cr, view, w, h, self.animator.sweep, self.animator.pulse)
+            self.animator.record(time.perf_counter() - start)
     
     def _on_refresh(self):
-        """Refresh timer."""
+        """Refresh timer (one-shot; _run_scan schedules the next one)."""
+        self._refresh_source = None
         self._run_scan()
+        return False
+    
+    def _on_realize(self, *args):
+        surface = self.get_surface()
+        if surface is not None:
+            surface.connect("notify::state", lambda *a: self._reschedule_if_sooner())
+        # software rendering (no GPU in the VM): start at a lower frame rate
+        renderer = self.get_renderer()
+        if renderer is not None and "Cairo" in type(renderer).__name__:
+            self.animator.level = 1
+    
+    def _is_visible(self) -> bool:
+        if not self.get_mapped():
+            return False
+        surface = self.get_surface()
+        if surface is not None and hasattr(surface, "get_state"):
+            state = surface.get_state()
+            hidden = Gdk.ToplevelState.MINIMIZED
+            if hasattr(Gdk.ToplevelState, "SUSPENDED"):
+                hidden |= Gdk.ToplevelState.SUSPENDED
+            if state & hidden:
+                return False
+        return True
+    
+    def _schedule_refresh(self):
+        """(Re)arm the one-shot refresh timer from the adaptive policy."""
+        if self._refresh_source is not None:
+            GLib.source_remove(self._refresh_source)
+        seconds, priority = self.refresh.next_interval(
+            visible=self._is_visible(), expanded=self.expanded, idle=self.session.idle
+        )
+        self._refresh_due = time.monotonic() + seconds
+        # timeout_add_seconds lets GLib coalesce our wakeups with other timers
+        self._refresh_source = GLib.timeout_add_seconds(seconds, self._on_refresh, priority=priority)
+    
+    def _reschedule_if_sooner(self):
+        """Pull the next refresh forward when the window/session becomes active again."""
+        seconds, _priority = self.refresh.next_interval(
+            visible=self._is_visible(), expanded=self.expanded, idle=self.session.idle
+        )
+        if time.monotonic() + seconds < self._refresh_due:
+            self._schedule_refresh()
+    
+    def _on_session_change(self):
+        self._reschedule_if_sooner()
+    
+    def _update_graph_timer(self):
+        if self._graph and self.expanded and self._graph_source is None and self._is_visible():
+            interval = int(self.scanner.throughput.interval * 1000)
+            self._graph_source = GLib.timeout_add(interval, self._on_graph_tick)
+    
+    def _on_graph_tick(self):
+        if not (self.expanded and self._is_visible()):
+            self._graph_source = None
+            return False
+        # only the graph lines change; the cached layer is reused
+        samples = self.scanner.throughput.samples
+        if samples != self._graph_samples:
+            self._graph_samples = samples
+            self.darea.queue_draw()
         return True
     
     def _run_scan(self):
-        """Run security scan."""
-        self.scanner.checks = self.scanner.run_local_checks()
-        self.scanner.score = self.scanner.calculate_score()
-        self.scanner.calculate_stats()
-        self.scanner.scan_time = time.strftime("%H:%M:%S")
+        """Start a scan pass on the scan worker, cancelling the previous one."""
+        self._scan_pending = self.scanner.new_generation()
+        self._scan_wake.set()
+    
+    def _scan_loop(self):
+        """Background local checks, newest generation only."""
+        while True:
+            self._scan_wake.wait()
+            self._scan_wake.clear()
+            generation, self._scan_pending = self._scan_pending, None
+            if generation is None or generation.cancelled:
+                continue
+            checks = self.scanner.run_local_checks(generation)
+            if checks is None:
+                continue
+            GLib.idle_add(self._apply_local_checks, generation, checks)
+            # network checks next, merged after the local results
+            self._network_pending = generation
+            self._network_wake.set()
+    
+    def _apply_local_checks(self, generation, checks):
+        """Show a local pass (dropped if a newer scan has started)."""
+        if not self.scanner.apply_local_checks(checks, generation):
+            return False
+        self.refresh.observe(self.scanner.checks)
+        self._schedule_refresh()
+        self._publish_metrics()
         self._update_size()
         self.darea.queue_draw()
-        
-        # network checks in background
-        thread = threading.Thread(target=self._run_network_thread, daemon=True)
-        thread.start()
-    
-    def _run_network_thread(self):
-        """Background network checks."""
-        net_checks = self.scanner.run_network_checks()
-        GLib.idle_add(self._merge_network_checks, net_checks)
-    
-    def _merge_network_checks(self, net_checks):
-        """Merge network results."""
-        insert_idx = 0
-        for i, c in enumerate(self.scanner.checks):
-            if c.section == "Network":
-                insert_idx = i + 1
-        for nc in net_checks:
-            self.scanner.checks.insert(insert_idx, nc)
-            insert_idx += 1
-        self.scanner.score = self.scanner.calculate_score()
-        self.scanner.calculate_stats()
+        self.animator.kick(sweep=True, pulse=self.expanded and self.scanner.stats.red_count > 0)
+        return False
+    
+    def _on_tor_change(self):
+        """Called from the Tor monitor thread; coalesces bursts of events."""
+        if not self._tor_update_pending:
+            self._tor_update_pending = True
+            GLib.idle_add(self._apply_tor_change)
+    
+    def _apply_tor_change(self):
+        self._tor_update_pending = False
+        if self.scanner.refresh_check("tor"):
+            self._publish_metrics()
+            self.darea.queue_draw()
+        return False
+    
+    def _network_loop(self):
+        """Background network checks, newest generation only."""
+        while True:
+            self._network_wake.wait()
+            self._network_wake.clear()
+            generation, self._network_pending = self._network_pending, None
+            if generation is None or generation.cancelled:
+                continue
+            net_checks = self.scanner.run_network_checks(generation)
+            if net_checks is not None:
+                GLib.idle_add(self._merge_network_checks, generation, net_checks)
+    
+    def _merge_network_checks(self, generation, net_checks):
+        """Merge network results (dropped if a newer scan has started)."""
+        if not self.scanner.merge_network_checks(net_checks, generation):
+            return False
+        self._publish_metrics()
+        if self.streamer is not None:
+            self.streamer.publish(self.scanner)
         self._update_size()
         self.darea.queue_draw()
         return False
     
+    def _publish_metrics(self):
+        if self.metrics_exporter is not None:
+            self.metrics_exporter.publish(self.scanner, self.scanner.metrics)
+    
     def _update_size(self):
         """Update window size based on view mode."""
         if self.expanded:
-            h = self.frame.measure_height(self.scanner.checks, expanded=True)
+            h = self.frame.measure_height(self.scanner.checks, expanded=True, graph=self._graph,
+                                          resources=len(resource_rows(self.scanner.resources)))
             w = self.frame.EXPANDED_WIDTH
         else:
             w = self.frame.COMPACT_WIDTH
             h = self.frame.COMPACT_HEIGHT
         
-        self.set_default_size(w, h)
-        self.darea.set_size_request(w, h)
+        self._resize(w, h)
+
+
+class FleetWindow(FrameWindow):
+    """Collector view: posture of every VM streaming to this host."""
+    
+    def __init__(self, app, address: str, index: FleetIndex):
+        super().__init__(app, "Trace Labs SEC-HUD Fleet", CyberpunkFrame.FLEET_WIDTH, 200)
+        self.address = address
+        self.index = index
+        self.summary = index.summary()
+        self._resize(self.frame.FLEET_WIDTH, self.frame.measure_fleet_height(self.summary))
+        GLib.timeout_add(FLEET_REFRESH_MS, self._on_tick)
+    
+    def _on_tick(self):
+        # summary() returns the cached object until a record arrives
+        summary = self.index.summary()
+        if summary is not self.summary:
+            self.summary = summary
+            self._resize(self.frame.FLEET_WIDTH, self.frame.measure_fleet_height(summary))
+            self.darea.queue_draw()
+        return True
+    
+    def _on_draw(self, area, cr, width, height, user_data=None):
+        self.frame.draw_fleet(cr, self.summary, self.address)
+
+
+# ---------------------------------------------------------------------------
+# Profiling
+# ---------------------------------------------------------------------------
+
+PROFILE_DIR = os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+                           "tracelabs", "hud-profile")
+
+# tl_profile.py (the sampler shared with tl-updater-gui) is copied next to
+# this script by install.sh; the VM updater installs it system-wide
+PROFILE_LIB_DIRS = (
+    os.path.dirname(os.path.abspath(__file__)),
+    "/usr/local/lib/tracelabs",
+)
+
+
+def start_profiler(base: str, allocations: bool = False):
+    """Start the shared sampling profiler for ``--profile``; raises ImportError/OSError."""
+    sys.path.extend(d for d in PROFILE_LIB_DIRS if d not in sys.path)
+    from tl_profile import SamplingProfiler
+    profiler = SamplingProfiler(base, "SEC-HUD", VERSION, allocations=allocations)
+    profiler.start()
+    return profiler
 
 
 # ---------------------------------------------------------------------------
@@ -1396,18 +4045,143 @@ class TraceLabsHUD(Gtk.ApplicationWindow):
 class TraceLabsApp(Gtk.Application):
     """GTK4 Application."""
     
-    def __init__(self):
-        super().__init__(application_id="org.tracelabs.sechud")
+    def __init__(self, fleet: Optional[Tuple[str, FleetIndex]] = None,
+                 system: Optional[LiveSystem] = None):
+        app_id = "org.tracelabs.sechud.fleet" if fleet else "org.tracelabs.sechud"
+        super().__init__(application_id=app_id)
+        self.fleet = fleet
+        self.system = system
     
     def do_activate(self):
         """Create and show window."""
-        win = TraceLabsHUD(self)
+        if self.fleet:
+            win = FleetWindow(self, *self.fleet)
+        else:
+            win = TraceLabsHUD(self, self.system)
         win.present()
 
 
-def main():
-    app = TraceLabsApp()
-    app.run(None)
+def format_report(scanner) -> str:
+    """Plain-text form of one scan for ``--headless``."""
+    lines = [f"[{scanner.scan_time}] score {scanner.score} {scanner.stats.threat_level}"]
+    for c in scanner.checks:
+        lines.append(f"  {str(c.section):<8} {c.name:<20} {c.status!s:<6} {c.detail}")
+    for label, _pct, detail, status in resource_rows(scanner.resources):
+        lines.append(f"  {'Resource':<8} {label:<20} {status!s:<6} {detail}")
+    return "\n".join(lines)
+
+
+def run_headless(scanner, scans: int, interval: float, as_json: bool) -> int:
+    """Scan without a window, printing each result; returns the last score."""
+    host = scanner.system.hostname()
+    n = 0
+    while True:
+        generation = scanner.scan_local()
+        scanner.merge_network_checks(scanner.run_network_checks(generation), generation)
+        if as_json:
+            print(json.dumps(posture_record(scanner, host), separators=(",", ":")), flush=True)
+        else:
+            print(format_report(scanner), flush=True)
+        n += 1
+        if scans and n >= scans:
+            return scanner.score
+        if interval:
+            time.sleep(interval)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Trace Labs SEC-HUD security posture monitor.")
+    parser.add_argument("--collect", metavar="ADDRESS",
+                        help="run as fleet collector on host:port or unix:/path "
+                             f"(senders set {FLEET_ENV} to the same address)")
+    parser.add_argument("--simulate", type=int, default=0, metavar="N",
+                        help="with --collect, also start N simulated local senders")
+    parser.add_argument("--bench-render", type=int, nargs="?", const=200, metavar="N",
+                        help="time N offscreen draws per view at 1x, 2x and 3x, then exit")
+    parser.add_argument("--soak", metavar="ARCHIVE",
+                        help="loop a replay archive through --scans scan+draw cycles "
+                             f"(default {SOAK_CYCLES}) and fail on memory, fd or thread growth")
+    parser.add_argument("--headless", action="store_true",
+                        help="print scan results instead of opening a window")
+    parser.add_argument("--json", action="store_true",
+                        help="with --headless, print one NDJSON posture record per scan")
+    parser.add_argument("--scans", type=int, metavar="N",
+                        help="with --headless, stop after N scans (default 1; 0 = forever); "
+                             "with --soak, the number of cycles")
+    parser.add_argument("--interval", type=float, metavar="SECONDS",
+                        help="with --headless, pause between scans (default 30)")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--record", metavar="FILE",
+                        help="save every probe result to a replay archive (.json.gz)")
+    source.add_argument("--replay", metavar="FILE",
+                        help="scan a recorded archive instead of this machine")
+    parser.add_argument("--profile", nargs="?", const=PROFILE_DIR, metavar="DIR",
+                        help="sample stacks into a new run directory under DIR "
+                             f"(default {PROFILE_DIR})")
+    parser.add_argument("--profile-alloc", action="store_true",
+                        help="with --profile, also trace allocations for a window before each report")
+    args = parser.parse_args(argv)
+    if args.simulate and not args.collect:
+        parser.error("--simulate requires --collect")
+    if args.profile_alloc and not args.profile:
+        parser.error("--profile-alloc requires --profile")
+    
+    if args.profile:
+        try:
+            start_profiler(args.profile, args.profile_alloc)
+        except (ImportError, OSError) as e:
+            parser.exit(1, f"cannot profile to {args.profile}: {e}\n")
+    
+    if args.bench_render:
+        benchmark_render(args.bench_render)
+        return
+    
+    if args.soak:
+        try:
+            ok = soak(args.soak, args.scans or SOAK_CYCLES)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"cannot soak {args.soak}: {e}\n")
+        sys.exit(0 if ok else 1)
+    
+    system = None
+    if args.record:
+        system = RecordingSystem(args.record)
+    elif args.replay:
+        try:
+            system = ReplaySystem(args.replay)
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"cannot replay {args.replay}: {e}\n")
+    
+    if args.headless:
+        replay = isinstance(system, ReplaySystem)
+        scans = args.scans if args.scans is not None else len(system) if replay else 1
+        interval = args.interval if args.interval is not None else 0 if replay else 30
+        scanner = SecurityScanner(system)
+        try:
+            run_headless(scanner, scans, interval, args.json)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            scanner.close()
+        if replay and system.misses:
+            print(f"SEC-HUD: {system.misses} probes not in the archive", file=sys.stderr)
+        return
+    
+    
+    fleet = None
+    if args.collect:
+        index = FleetIndex()
+        try:
+            FleetCollector(args.collect, index).start()
+        except (OSError, ValueError) as e:
+            parser.exit(1, f"cannot listen on {args.collect}: {e}\n")
+        if args.simulate:
+            checks = [(spec.id, spec.name, str(spec.section)) for spec in CheckEngine.specs(CHECK_COSTS)]
+            simulate_senders(args.collect, checks, args.simulate)
+        fleet = (args.collect, index)
+    
+    app = TraceLabsApp(fleet, system)
+    app.run([sys.argv[0]])
 
 
 if __name__ == "__main__":
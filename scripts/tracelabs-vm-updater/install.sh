@@ -37,6 +37,7 @@ check_deps() {
     command -v python3 >/dev/null 2>&1 || missing+=("python3")
     command -v notify-send >/dev/null 2>&1 || missing+=("libnotify-bin")
     python3 -c "import gi" 2>/dev/null || missing+=("python3-gi")
+    python3 -c "import apt_pkg" 2>/dev/null || missing+=("python3-apt")
 
     if [ ${#missing[@]} -gt 0 ]; then
         echo -e "${YELLOW}[!] Installing missing dependencies: ${missing[*]}${NC}"
@@ -49,10 +50,13 @@ check_deps() {
 install_scripts() {
     echo -e "${CYAN}[*] Installing scripts to /usr/local/bin/...${NC}"
 
-    for script in tl-check-updates tl-notify-updates tl-updater-gui tl-run-updates; do
+    for script in tl-check-updates tl-notify-updates tl-updater-gui tl-run-updates tl-update-tools tl-hud-facts; do
         install -m 755 "$REPO_DIR/bin/$script" "/usr/local/bin/$script"
         echo -e "  ${GREEN}✓${NC} /usr/local/bin/$script"
     done
+    # Shared with the SEC-HUD (--profile)
+    install -D -m 644 "$REPO_DIR/lib/tl_profile.py" /usr/local/lib/tracelabs/tl_profile.py
+    echo -e "  ${GREEN}✓${NC} /usr/local/lib/tracelabs/tl_profile.py"
 }
 
 install_systemd() {
@@ -90,9 +94,11 @@ install_desktop_shortcut() {
 }
 
 install_polkit() {
-    echo -e "${CYAN}[*] Installing polkit policy...${NC}"
-    install -m 644 "$REPO_DIR/polkit/org.tracelabs.vm.update.policy" /usr/share/polkit-1/actions/
-    echo -e "  ${GREEN}✓${NC} Polkit policy installed"
+    echo -e "${CYAN}[*] Installing polkit policies...${NC}"
+    for policy in org.tracelabs.vm.update.policy org.tracelabs.vm.hud-facts.policy; do
+        install -m 644 "$REPO_DIR/polkit/$policy" /usr/share/polkit-1/actions/
+        echo -e "  ${GREEN}✓${NC} $policy"
+    done
 }
 
 create_dirs() {
@@ -0,0 +1,257 @@
+"""Sampling profiler shared by the SEC-HUD and tl-updater-gui (``--profile``).
+
+A daemon thread reads ``sys._current_frames()`` every ``interval`` and
+counts each thread's stack; every ``flush`` seconds the counts go to a
+collapsed-stack file (flamegraph.pl / speedscope input), rooted at the
+thread name. If sampling costs more than PROFILE_OVERHEAD of a core, the
+interval doubles.
+
+Allocation reports are opt-in (``allocations=True``): tracemalloc slows
+every allocation while it traces, so it only runs for the ``window``
+seconds before each ``snapshot``. The report covers allocations made
+during that window that are still live. profile.json records what both
+parts cost: sampling time, the share of the run spent tracing, the
+measured slowdown of allocations while traced and tracemalloc's own
+memory.
+
+Each run writes to its own directory under ``base``; only the newest
+runs and files are kept, so profiling can stay on for a whole event.
+
+Installed to /usr/local/lib/tracelabs by the updater and next to the
+SEC-HUD by its installer.
+"""
+
+import atexit
+import json
+import os
+import shutil
+import sys
+import threading
+import time
+import tracemalloc
+from typing import Any, Dict, Optional
+
+PROFILE_INTERVAL = 0.02       # seconds between stack samples (50 Hz)
+PROFILE_MAX_INTERVAL = 0.5
+PROFILE_OVERHEAD = 0.02       # share of a core the sampler may use before it slows down
+PROFILE_FLUSH = 60            # seconds of samples per collapsed-stack file
+PROFILE_SNAPSHOT = 300        # seconds between allocation reports
+PROFILE_ALLOC_WINDOW = 30     # seconds of tracing before each report
+PROFILE_TRACE_FRAMES = 1      # tracemalloc frames per allocation; more costs more
+PROFILE_TOP = 30              # allocation sites per report
+PROFILE_KEEP_FILES = 60       # per kind, per run
+PROFILE_KEEP_RUNS = 5
+PROFILE_CALIBRATE = 20000     # allocation rounds timed with and without tracing
+
+
+def _allocation_round(n: int) -> float:
+    start = time.perf_counter()
+    for i in range(n):
+        [i, i, i]
+        {"i": i}
+    return time.perf_counter() - start
+
+
+class SamplingProfiler:
+    """Wall-clock stack sampler plus windowed tracemalloc reports.
+
+    ``prog`` prefixes error messages and the sampler thread's name;
+    ``version`` goes into profile.json.
+    """
+
+    def __init__(self, base: str, prog: str, version: str = "",
+                 interval: float = PROFILE_INTERVAL, flush: float = PROFILE_FLUSH,
+                 snapshot: float = PROFILE_SNAPSHOT, allocations: bool = False,
+                 window: float = PROFILE_ALLOC_WINDOW):
+        self.base = base
+        self.prog = prog
+        self.version = version
+        self.interval = interval
+        self.flush_every = flush
+        self.snapshot_every = snapshot
+        self.allocations = allocations
+        self.window = min(window, snapshot)
+        self.dir = os.path.join(base, time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}")
+        self.samples = 0
+        self.cost = 0.0             # seconds spent sampling stacks
+        self.alloc_cost = 0.0       # seconds spent starting, stopping and snapshotting tracemalloc
+        self.traced = 0.0           # seconds tracemalloc was on
+        self.slowdown: Optional[float] = None   # allocation time traced / untraced
+        self.trace_memory = 0       # peak bytes tracemalloc used for itself
+        self._trace_since: Optional[float] = None   # set while we own the tracing
+        self._started = 0.0
+        self._stacks: Dict[str, int] = {}
+        self._labels: Dict[Any, str] = {}   # code object -> frame label
+        self._previous: Optional[tracemalloc.Snapshot] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+
+    def start(self):
+        os.makedirs(self.dir, exist_ok=True)
+        runs = sorted(e.name for e in os.scandir(self.base) if e.is_dir())
+        for name in runs[:-PROFILE_KEEP_RUNS]:
+            shutil.rmtree(os.path.join(self.base, name), ignore_errors=True)
+        if self.allocations and not tracemalloc.is_tracing():
+            self.slowdown = self._calibrate()
+        self._started = time.monotonic()
+        self._running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name=f"{self.prog}-profiler")
+        self._thread.start()
+        atexit.register(self.stop)
+
+    def stop(self):
+        """Write what is pending and stop tracing (also runs at exit)."""
+        if not self._running:
+            return
+        self._running = False
+        self._wake.set()
+        self._thread.join(timeout=2)
+        if self.allocations:
+            self.snapshot()
+            self._trace_stop()
+        self.flush()
+
+    @staticmethod
+    def _calibrate() -> float:
+        plain = _allocation_round(PROFILE_CALIBRATE)
+        tracemalloc.start(PROFILE_TRACE_FRAMES)
+        try:
+            traced = _allocation_round(PROFILE_CALIBRATE)
+        finally:
+            tracemalloc.stop()
+        return round(traced / max(plain, 1e-9), 2)
+
+    def _trace_start(self):
+        if tracemalloc.is_tracing():
+            return   # someone else (e.g. --soak) traces; report from theirs
+        start = time.perf_counter()
+        tracemalloc.start(PROFILE_TRACE_FRAMES)
+        self._trace_since = time.monotonic()
+        self.alloc_cost += time.perf_counter() - start
+
+    def _trace_stop(self):
+        if self._trace_since is None:
+            return
+        start = time.perf_counter()
+        self.traced += time.monotonic() - self._trace_since
+        self.trace_memory = max(self.trace_memory, tracemalloc.get_tracemalloc_memory())
+        tracemalloc.stop()
+        self._trace_since = None
+        self.alloc_cost += time.perf_counter() - start
+
+    def _loop(self):
+        own = threading.get_ident()
+        next_flush = time.monotonic() + self.flush_every
+        next_snapshot = time.monotonic() + self.snapshot_every
+        average = 0.0
+        while self._running:
+            start = time.perf_counter()
+            self._sample(own)
+            cost = time.perf_counter() - start
+            self.cost += cost
+            self.samples += 1
+            average = 0.9 * average + 0.1 * cost
+            if average > self.interval * PROFILE_OVERHEAD and self.interval < PROFILE_MAX_INTERVAL:
+                self.interval = min(self.interval * 2, PROFILE_MAX_INTERVAL)
+            now = time.monotonic()
+            if now >= next_flush:
+                self.flush()
+                next_flush = now + self.flush_every
+            if self.allocations:
+                if self._trace_since is None and now >= next_snapshot - self.window:
+                    self._trace_start()
+                if now >= next_snapshot:
+                    self.snapshot()
+                    self._trace_stop()
+                    next_snapshot = now + self.snapshot_every
+            self._wake.wait(self.interval)
+
+    def _sample(self, own: int):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        labels = self._labels
+        with self._lock:
+            stacks = self._stacks
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                parts = []
+                while frame is not None:
+                    code = frame.f_code
+                    label = labels.get(code)
+                    if label is None:
+                        label = labels[code] = (
+                            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+                        )
+                    parts.append(label)
+                    frame = frame.f_back
+                parts.append(names.get(ident, f"thread-{ident}"))
+                key = ";".join(reversed(parts))
+                stacks[key] = stacks.get(key, 0) + 1
+
+    def _write(self, prefix: str, text: str):
+        path = os.path.join(self.dir, prefix + time.strftime("%Y%m%d-%H%M%S") + ".txt")
+        with open(path + ".tmp", "w") as f:
+            f.write(text)
+        os.replace(path + ".tmp", path)
+        old = sorted(n for n in os.listdir(self.dir) if n.startswith(prefix))
+        for name in old[:-PROFILE_KEEP_FILES]:
+            os.unlink(os.path.join(self.dir, name))
+
+    def flush(self):
+        """Write the stacks sampled since the last flush, plus run totals."""
+        with self._lock:
+            stacks, self._stacks = self._stacks, {}
+        try:
+            if stacks:
+                self._write("stacks-", "".join(
+                    f"{key} {count}\n" for key, count in sorted(stacks.items(), key=lambda kv: -kv[1])
+                ))
+            elapsed = max(time.monotonic() - self._started, 1e-9)
+            traced = self.traced
+            if self._trace_since is not None:
+                traced += time.monotonic() - self._trace_since
+            info = {
+                "version": self.version, "pid": os.getpid(), "argv": sys.argv,
+                "interval": self.interval, "samples": self.samples,
+                "overhead": round(self.cost / elapsed, 5),
+            }
+            if self.allocations:
+                info["allocations"] = {
+                    "window": self.window,
+                    "traced_share": round(traced / elapsed, 5),
+                    "slowdown_while_traced": self.slowdown,
+                    "overhead": round(self.alloc_cost / elapsed, 5),
+                    "tracemalloc_kib": round(self.trace_memory / 1024),
+                }
+            with open(os.path.join(self.dir, "profile.json"), "w") as f:
+                json.dump(info, f, indent=1)
+        except OSError as e:
+            print(f"{self.prog}: profile write failed: {e}", file=sys.stderr)
+
+    def snapshot(self):
+        """Write the largest allocation sites of the window and the change since the last one."""
+        if not tracemalloc.is_tracing():
+            return
+        start = time.perf_counter()
+        snap = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ))
+        self.trace_memory = max(self.trace_memory, tracemalloc.get_tracemalloc_memory())
+        current, peak = tracemalloc.get_traced_memory()
+        since = f"the last {self.window:.0f}s" if self._trace_since is not None else "tracing started"
+        lines = [f"# allocated since {since} and still live: {current / 1024:.0f} KiB, "
+                 f"peak {peak / 1024:.0f} KiB",
+                 "", "# largest allocation sites"]
+        lines += [str(s) for s in snap.statistics("lineno")[:PROFILE_TOP]]
+        if self._previous is not None:
+            lines += ["", "# change since the previous report"]
+            lines += [str(s) for s in snap.compare_to(self._previous, "lineno")[:PROFILE_TOP] if s.size_diff]
+        self._previous = snap
+        self.alloc_cost += time.perf_counter() - start
+        try:
+            self._write("alloc-", "\n".join(lines) + "\n")
+        except OSError as e:
+            print(f"{self.prog}: profile write failed: {e}", file=sys.stderr)
@@ -29,14 +29,17 @@ systemctl daemon-reload
 echo "  ✓ Systemd units removed"
 
 # Remove scripts
-for script in tl-check-updates tl-notify-updates tl-updater-gui tl-run-updates; do
+for script in tl-check-updates tl-notify-updates tl-updater-gui tl-run-updates tl-update-tools tl-hud-facts; do
     rm -f "/usr/local/bin/$script"
 done
+rm -f /usr/local/lib/tracelabs/tl_profile.py
+rmdir /usr/local/lib/tracelabs 2>/dev/null || true
 echo "  ✓ Scripts removed"
 
 # Remove desktop/autostart entries
 rm -f /etc/xdg/autostart/tracelabs-updater-autostart.desktop
 rm -f /usr/share/polkit-1/actions/org.tracelabs.vm.update.policy
+rm -f /usr/share/polkit-1/actions/org.tracelabs.vm.hud-facts.policy
 echo "  ✓ Desktop and polkit entries removed"
 
 # Remove state/cache files